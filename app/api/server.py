@@ -0,0 +1,482 @@
+# app/api/server.py
+"""Servidor HTTP/JSON local sobre o ``MediaService``.
+
+Só usa a biblioteca padrão: ``http.server`` com um pool fixo de
+threads. Cada thread do pool mantém a sua conexão persistente com o
+SQLite (veja ``Database.get_connection``), então o pool de threads é
+também o pool de conexões. As conexões HTTP/1.1 ficam abertas entre
+requisições (keep-alive) até ``KEEPALIVE_TIMEOUT`` segundos sem uso.
+
+As respostas de leitura levam um ``ETag``; com ``If-None-Match`` igual
+o servidor responde ``304`` sem corpo. O JSON já codificado (e a versão
+gzip, quando o cliente aceita) fica guardado até a próxima escrita no
+serviço, então leituras repetidas não refazem consulta nem ``json.dumps``.
+
+Rotas:
+    GET  /api/movies, /api/series    ?after=&limit=&order=&desc=
+    POST /api/movies, /api/series    (JSON com os campos da mídia)
+    GET  /api/media/<id>
+    PUT  /api/media/<id>/rating      {"rating": 4.5, "comment": "..."}
+    PUT  /api/series/<id>/progress   {"season": 2, "episode": 5}
+    GET  /api/search                 ?q=&limit=&type=&fuzzy=
+    GET  /api/stats, /api/stats/detailed
+    GET  /api/recent                 ?days=
+"""
+import gzip
+import hashlib
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from enum import Enum
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from app.models.media import Media, MediaStatus, Movie, Series
+from app.services.cache import LRUCache
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 16
+
+# Segundos que uma conexão keep-alive ociosa segura uma thread do pool
+KEEPALIVE_TIMEOUT = 5
+
+# Corpos menores que isso não compensam o gzip
+GZIP_MIN_SIZE = 1024
+
+MAX_BODY_SIZE = 1024 * 1024
+MAX_PAGE_SIZE = 500
+
+# Respostas codificadas guardadas (por caminho + query string)
+RESPONSE_CACHE_SIZE = 512
+
+
+class ApiError(Exception):
+    """Erro com status HTTP, devolvido ao cliente como ``{"error": ...}``."""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_default(value):
+    """Tipos que o ``json`` não conhece: mídias, datas, enums e escalares do NumPy."""
+    if isinstance(value, Media):
+        return value.to_dict()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if hasattr(value, 'item'):
+        return value.item()
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} não é serializável em JSON")
+
+
+def encode_json(payload) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':'),
+                      default=_json_default).encode('utf-8')
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+class _Encoded:
+    """Resposta pronta: corpo, ETag e a versão gzip (criada na primeira vez)."""
+
+    __slots__ = ('generation', 'body', 'etag', '_gzipped')
+
+    def __init__(self, body: bytes, generation: Optional[int]):
+        self.generation = generation
+        self.body = body
+        self.etag = _etag(body)
+        self._gzipped = None
+
+    def gzipped(self) -> bytes:
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6, mtime=0)
+        return self._gzipped
+
+
+def _int_param(query: Dict[str, str], name: str, default: int,
+               minimum: int, maximum: Optional[int] = None) -> int:
+    value = query.get(name)
+    if value in (None, ''):
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"'{name}' deve ser um número inteiro")
+    if number < minimum or (maximum is not None and number > maximum):
+        limits = f"entre {minimum} e {maximum}" if maximum is not None else f"≥ {minimum}"
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"'{name}' deve ser {limits}")
+    return number
+
+
+def _field(body: Dict[str, Any], name: str, kind, required: bool = True, default=None):
+    value = body.get(name)
+    if value is None:
+        if required:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Campo obrigatório: '{name}'")
+        return default
+    # bool é subclasse de int, mas não é um número válido aqui
+    if isinstance(value, bool) or not isinstance(value, kind):
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"Campo '{name}' com tipo inválido")
+    return value
+
+
+class TrackFlixAPI:
+    """Rotas da API; independente do transporte HTTP.
+
+    Cada rota recebe a query string (um valor por nome), o corpo JSON
+    (ou ``None``) e os grupos da URL, e retorna ``(status, payload)``.
+    """
+
+    ROUTES = (
+        ('GET', r'/api/movies', 'list_movies'),
+        ('POST', r'/api/movies', 'add_movie'),
+        ('GET', r'/api/series', 'list_series'),
+        ('POST', r'/api/series', 'add_series'),
+        ('GET', r'/api/media/(\d+)', 'get_media'),
+        ('PUT', r'/api/media/(\d+)/rating', 'rate'),
+        ('PUT', r'/api/series/(\d+)/progress', 'progress'),
+        ('GET', r'/api/search', 'search'),
+        ('GET', r'/api/stats', 'stats'),
+        ('GET', r'/api/stats/detailed', 'detailed_stats'),
+        ('GET', r'/api/recent', 'recent'),
+    )
+
+    def __init__(self, service, response_cache_size: int = RESPONSE_CACHE_SIZE):
+        self.service = service
+        self.responses = LRUCache(response_cache_size)
+        self._routes = [(method, re.compile(pattern + '$'), getattr(self, name))
+                        for method, pattern, name in self.ROUTES]
+
+    def resolve(self, method: str, path: str):
+        """Retorna ``(rota, grupos)``; levanta 404/405 se não houver."""
+        allowed = False
+        for route_method, pattern, handler in self._routes:
+            match = pattern.match(path)
+            if match:
+                if route_method == method:
+                    return handler, match.groups()
+                allowed = True
+        if allowed:
+            raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED, "Método não permitido")
+        raise ApiError(HTTPStatus.NOT_FOUND, f"Rota não encontrada: {path}")
+
+    def cached_get(self, handler, key: Tuple[str, str], query: Dict[str, str],
+                   groups: tuple) -> _Encoded:
+        """Executa uma rota GET reaproveitando a resposta codificada.
+
+        A resposta guardada vale enquanto o cache do serviço não for
+        invalidado por uma escrita, inclusive de outro processo (veja
+        ``MediaService.refresh_cache``). Sem cache no serviço, toda
+        requisição é atendida de novo (o ETag continua valendo).
+        """
+        cache = self.service.cache
+        if cache is None:
+            _, payload = handler(query, None, *groups)
+            return _Encoded(encode_json(payload), None)
+
+        self.service.refresh_cache()
+        generation = cache.generation
+        encoded = self.responses.get(key)
+        if encoded is not None and encoded.generation == generation:
+            return encoded
+
+        _, payload = handler(query, None, *groups)
+        encoded = _Encoded(encode_json(payload), generation)
+        self.responses.put(key, encoded)
+        return encoded
+
+    # Leituras
+
+    def _page(self, load, query):
+        order = query.get('order', 'title')
+        if order not in self.service.PAGE_ORDERS:
+            raise ApiError(HTTPStatus.BAD_REQUEST,
+                           f"'order' deve ser um de: {', '.join(self.service.PAGE_ORDERS)}")
+        limit = _int_param(query, 'limit', self.service.PAGE_SIZE, 1, MAX_PAGE_SIZE)
+        descending = query.get('desc', '').lower() in ('1', 'true', 'yes')
+        return HTTPStatus.OK, load(query.get('after') or None, limit, order, descending)
+
+    def list_movies(self, query, body):
+        return self._page(self.service.list_movies_page, query)
+
+    def list_series(self, query, body):
+        return self._page(self.service.list_series_page, query)
+
+    def _existing_media(self, media_id: str) -> Media:
+        media = self.service.get_media(int(media_id))
+        if media is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Mídia {media_id} não encontrada")
+        return media
+
+    def get_media(self, query, body, media_id):
+        return HTTPStatus.OK, self._existing_media(media_id)
+
+    def search(self, query, body):
+        term = query.get('q', '').strip()
+        if not term:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Informe o termo em 'q'")
+        media_type = query.get('type') or None
+        if media_type not in (None, 'movie', 'series'):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "'type' deve ser movie ou series")
+        limit = _int_param(query, 'limit', 50, 1, MAX_PAGE_SIZE)
+        fuzzy = query.get('fuzzy', '').lower() in ('1', 'true', 'yes')
+        search = self.service.fuzzy_search if fuzzy else self.service.search
+        return HTTPStatus.OK, {'items': search(term, limit, media_type)}
+
+    def stats(self, query, body):
+        return HTTPStatus.OK, self.service.get_statistics()
+
+    def detailed_stats(self, query, body):
+        return HTTPStatus.OK, self.service.get_detailed_statistics()
+
+    def recent(self, query, body):
+        days = _int_param(query, 'days', 7, 0)
+        return HTTPStatus.OK, {'items': self.service.get_recently_watched(days)}
+
+    # Escritas
+
+    @staticmethod
+    def _fill_common(media, body: Dict[str, Any]):
+        rating = _field(body, 'rating', (int, float), required=False, default=0.0)
+        if not 0 <= rating <= 5:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Avaliação deve ser entre 0 e 5")
+        media.rating = float(rating)
+        media.comment = _field(body, 'comment', str, required=False, default="")
+
+        status = _field(body, 'status', str, required=False)
+        if status is not None:
+            try:
+                media.status = MediaStatus(status)
+            except ValueError:
+                choices = ', '.join(item.value for item in MediaStatus)
+                raise ApiError(HTTPStatus.BAD_REQUEST, f"'status' deve ser um de: {choices}")
+        return media
+
+    @staticmethod
+    def _common_args(body: Dict[str, Any]) -> tuple:
+        title = _field(body, 'title', str).strip()
+        if not title:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Título é obrigatório")
+        year = _field(body, 'year', int)
+        genres = _field(body, 'genres', (list, str), required=False, default=[])
+        if isinstance(genres, str):
+            genres = genres.split(',')
+        return title, year, [str(genre).strip() for genre in genres if str(genre).strip()]
+
+    @staticmethod
+    def _positive(body: Dict[str, Any], name: str, required: bool = True,
+                  default: Optional[int] = None) -> Optional[int]:
+        value = _field(body, name, int, required, default)
+        if value is not None and value < 1:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"'{name}' deve ser ≥ 1")
+        return value
+
+    def _created(self, media, added: bool, kind: str):
+        if not added:
+            raise ApiError(HTTPStatus.INTERNAL_SERVER_ERROR, f"Erro ao adicionar {kind}")
+        return HTTPStatus.CREATED, self.service.get_media(media.id)
+
+    def add_movie(self, query, body):
+        title, year, genres = self._common_args(body)
+        movie = Movie(title, year, genres, self._positive(body, 'duration'),
+                      _field(body, 'director', str, required=False))
+        self._fill_common(movie, body)
+        return self._created(movie, self.service.add_movie(movie), "filme")
+
+    def add_series(self, query, body):
+        title, year, genres = self._common_args(body)
+        series = Series(title, year, genres,
+                        self._positive(body, 'total_seasons'),
+                        self._positive(body, 'total_episodes'),
+                        self._positive(body, 'episode_duration', required=False))
+        self._fill_common(series, body)
+        return self._created(series, self.service.add_series(series), "série")
+
+    def rate(self, query, body, media_id):
+        media = self._existing_media(media_id)
+        rating = _field(body, 'rating', (int, float))
+        if not 0 <= rating <= 5:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Avaliação deve ser entre 0 e 5")
+        comment = _field(body, 'comment', str, required=False)
+
+        if isinstance(media, Movie):
+            updated = self.service.update_movie_rating(media.id, rating, comment)
+        else:
+            updated = self.service.update_series_rating(media.id, rating, comment)
+        if not updated:
+            raise ApiError(HTTPStatus.INTERNAL_SERVER_ERROR, "Erro ao avaliar")
+        return HTTPStatus.OK, self.service.get_media(media.id)
+
+    def progress(self, query, body, media_id):
+        media = self._existing_media(media_id)
+        if not isinstance(media, Series):
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Série {media_id} não encontrada")
+        season = _field(body, 'season', int)
+        episode = _field(body, 'episode', int)
+        if not self.service.update_progress(media.id, season, episode):
+            raise ApiError(HTTPStatus.BAD_REQUEST,
+                           f"Episódio fora da série: T{season}E{episode}")
+        return HTTPStatus.OK, self.service.get_media(media.id)
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """Traduz HTTP para as rotas de ``TrackFlixAPI`` (``server.api``)."""
+
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    server_version = 'TrackFlix'
+    timeout = KEEPALIVE_TIMEOUT
+    # Cabeçalhos e corpo saem em escritas separadas; com o Nagle ligado a
+    # segunda espera o ACK atrasado do cliente (~40 ms por resposta)
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_HEAD(self):
+        self._dispatch('HEAD')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PUT(self):
+        self._dispatch('PUT')
+
+    def _dispatch(self, method: str):
+        try:
+            # O corpo é lido antes de tudo para não sobrar na conexão keep-alive
+            raw = self._read_body() if method in ('POST', 'PUT') else b''
+            url = urlsplit(self.path)
+            path = url.path.rstrip('/') or '/'
+            query = {name: values[-1] for name, values
+                     in parse_qs(url.query, keep_blank_values=True).items()}
+            handler, groups = self.server.api.resolve(
+                'GET' if method == 'HEAD' else method, path)
+
+            if method in ('GET', 'HEAD'):
+                encoded = self.server.api.cached_get(handler, (path, url.query),
+                                                     query, groups)
+                self._send_encoded(encoded, head=method == 'HEAD')
+            else:
+                status, payload = handler(query, self._parse_json(raw), *groups)
+                self._send_encoded(_Encoded(encode_json(payload), None), status)
+
+        except ApiError as e:
+            self._send_error(e.status, str(e))
+        except ValueError as e:
+            # Validações do serviço (cursor inválido, ordenação...)
+            self._send_error(HTTPStatus.BAD_REQUEST, str(e))
+        except Exception as e:
+            self.log_error("Erro em %s %s: %r", method, self.path, e)
+            self._send_error(HTTPStatus.INTERNAL_SERVER_ERROR, "Erro interno")
+
+    def _read_body(self) -> bytes:
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            self.close_connection = True
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Content-Length inválido")
+        if length > MAX_BODY_SIZE:
+            self.close_connection = True  # O corpo não será lido
+            raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Corpo grande demais")
+        return self.rfile.read(length) if length > 0 else b''
+
+    @staticmethod
+    def _parse_json(raw: bytes) -> Dict[str, Any]:
+        try:
+            body = json.loads(raw or b'{}')
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Corpo não é um JSON válido")
+        if not isinstance(body, dict):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "O corpo deve ser um objeto JSON")
+        return body
+
+    def _send_encoded(self, encoded: _Encoded, status: HTTPStatus = HTTPStatus.OK,
+                      head: bool = False):
+        body = encoded.body
+        etag = encoded.etag
+        use_gzip = (len(body) >= GZIP_MIN_SIZE
+                    and 'gzip' in self.headers.get('Accept-Encoding', ''))
+        if use_gzip:
+            # A versão comprimida é outra representação: precisa de outro ETag
+            body = encoded.gzipped()
+            etag = etag[:-1] + '-gz"'
+
+        if status == HTTPStatus.OK and self._not_modified(etag):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', etag)
+            self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if status == HTTPStatus.OK:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def _not_modified(self, etag: str) -> bool:
+        header = self.headers.get('If-None-Match')
+        if not header:
+            return False
+        return header.strip() == '*' or etag in (tag.strip() for tag in header.split(','))
+
+    def _send_error(self, status: HTTPStatus, message: str):
+        self._send_encoded(_Encoded(encode_json({'error': message}), None), status)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class TrackFlixServer(HTTPServer):
+    """``HTTPServer`` que atende cada conexão em um pool fixo de threads.
+
+    Diferente do ``ThreadingHTTPServer`` (uma thread nova por conexão),
+    as threads do pool são reaproveitadas e com elas as conexões do
+    SQLite. Conexões além do tamanho do pool esperam na fila.
+    """
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, service, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 workers: int = DEFAULT_WORKERS, verbose: bool = False):
+        self.api = TrackFlixAPI(service)
+        self.verbose = verbose
+        self._pool = ThreadPoolExecutor(max_workers=workers,
+                                        thread_name_prefix="trackflix-api")
+        super().__init__((host, port), RequestHandler)
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._process_in_pool, request, client_address)
+
+    def _process_in_pool(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        """Fecha o socket e espera as requisições em andamento terminarem."""
+        super().server_close()
+        self._pool.shutdown(wait=True)
+        self.api.service.flush_watch_events()
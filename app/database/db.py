@@ -1,89 +1,246 @@
 # app/database/db.py
+import atexit
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
+from typing import TYPE_CHECKING, Optional
+from app.database.migrations import run_migrations
+
+if TYPE_CHECKING:
+    from app.database.profiler import QueryProfiler
 
 class Database:
-    """Gerencia conexões com o banco de dados SQLite."""
-    
-    def __init__(self, db_path="trackflix.db"):
+    """Gerencia conexões com o banco de dados SQLite.
+
+    Cada thread recebe uma conexão persistente, aberta uma única vez com
+    os pragmas de desempenho abaixo, e reutilizada por todas as queries
+    até ``close()``. As conexões operam em modo autocommit; escritas com
+    mais de um comando devem ser agrupadas em ``transaction()``.
+    """
+
+    def __init__(self, db_path="trackflix.db", cache_size_kb: int = 16384,
+                 mmap_size: int = 256 * 1024 * 1024, busy_timeout_ms: int = 5000):
         self.db_path = db_path
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size = mmap_size
+        self.busy_timeout_ms = busy_timeout_ms
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._generation = 0
+        self.profiler: Optional['QueryProfiler'] = None  # Veja enable_profiling()
+
         self._init_database()
-    
+
     def _init_database(self):
-        """Inicializa o banco de dados criando as tabelas."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Tabela de mídias
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS media (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                year INTEGER NOT NULL,
-                genres TEXT,
-                rating REAL DEFAULT 0,
-                comment TEXT,
-                status TEXT DEFAULT 'Planejado',
-                media_type TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Tabela de filmes
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS movies (
-                media_id INTEGER PRIMARY KEY,
-                duration INTEGER,
-                director TEXT,
-                watched_date TIMESTAMP,
-                FOREIGN KEY (media_id) REFERENCES media(id)
-            )
-        ''')
-        
-        # Tabela de séries
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS series (
-                media_id INTEGER PRIMARY KEY,
-                total_seasons INTEGER,
-                total_episodes INTEGER,
-                current_season INTEGER DEFAULT 1,
-                current_episode INTEGER DEFAULT 1,
-                episode_duration INTEGER,
-                FOREIGN KEY (media_id) REFERENCES media(id)
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
-        print("✅ Banco de dados inicializado!")
-    
+        """Inicializa o banco de dados aplicando as migrações pendentes.
+
+        Com o esquema já na versão atual nenhum DDL é executado.
+        """
+        if run_migrations(self):
+            print("✅ Banco de dados inicializado!")
+
+    def _open_connection(self):
+        """Abre uma nova conexão e aplica os pragmas de desempenho."""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                               isolation_level=None)
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_kb)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
     def get_connection(self):
-        """Retorna uma conexão com o banco."""
-        return sqlite3.connect(self.db_path)
-    
-    def execute_query(self, query: str, params: tuple = ()):
-        """Executa uma query e retorna o cursor."""
+        """Retorna a conexão persistente da thread atual.
+
+        A conexão pertence ao ``Database``: não deve ser fechada por quem
+        a recebe. Use ``close()`` para encerrar todas as conexões.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.generation == self._generation:
+            return conn
+
+        conn = self._open_connection()
+        with self._lock:
+            self._connections.append(conn)
+            self._local.conn = conn
+            self._local.generation = self._generation
+            self._local.depth = 0
+        return conn
+
+    @contextmanager
+    def transaction(self, mode: str = "IMMEDIATE"):
+        """Agrupa vários comandos em uma única transação.
+
+        Abre ``BEGIN <mode>`` na conexão da thread atual e faz um único
+        commit ao final do bloco, ou rollback se ocorrer uma exceção.
+        Chamadas aninhadas viram SAVEPOINTs: uma falha interna desfaz só
+        o bloco interno, e a transação externa pode continuar.
+
+            with db.transaction() as conn:
+                conn.execute(...)
+                conn.execute(...)
+        """
         conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        conn.commit()
-        conn.close()
+        depth = self._local.depth
+        savepoint = f"sp_{depth}"
+
+        if depth == 0:
+            conn.execute(f"BEGIN {mode}")
+        else:
+            conn.execute(f"SAVEPOINT {savepoint}")
+        self._local.depth = depth + 1
+
+        try:
+            yield conn
+        except BaseException:
+            self._local.depth = depth
+            if depth == 0:
+                conn.rollback()
+            else:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+            raise
+
+        self._local.depth = depth
+        if depth == 0:
+            conn.commit()
+        else:
+            conn.execute(f"RELEASE {savepoint}")
+
+    def in_transaction(self) -> bool:
+        """Indica se a thread atual está dentro de ``transaction()``."""
+        return getattr(self._local, 'depth', 0) > 0
+
+    def close(self):
+        """Fecha todas as conexões abertas por este banco.
+
+        O objeto continua utilizável: a próxima query reabre a conexão
+        da thread que a executar.
+        """
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._generation += 1
+
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def enable_profiling(self, slow_ms: float = 100.0,
+                         report_path: Optional[str] = None) -> 'QueryProfiler':
+        """Liga a medição de ``execute_query``/``fetch_all``/``fetch_one``/``iter_rows``.
+
+        Comandos acima de ``slow_ms`` são logados com o plano da consulta.
+        Com ``report_path``, o relatório é gravado nesse arquivo ao sair
+        do programa. Desligada (o padrão), a medição custa uma checagem
+        de atributo por chamada.
+        """
+        # Importado só aqui: sem medição, a partida não carrega o logging
+        from app.database.profiler import QueryProfiler
+
+        if self.profiler is None:
+            self.profiler = QueryProfiler(slow_ms)
+        else:
+            self.profiler.slow_ms = slow_ms
+        if report_path:
+            atexit.register(self.profiler.write_report, report_path)
+        return self.profiler
+
+    def disable_profiling(self):
+        self.profiler = None
+
+    def execute_query(self, query: str, params: tuple = ()):
+        """Executa uma query e retorna o cursor.
+
+        Fora de ``transaction()`` o comando é confirmado imediatamente;
+        dentro dela, faz parte da transação em andamento.
+        """
+        cursor = self.get_connection().cursor()
+        profiler = self.profiler
+        if profiler is None:
+            cursor.execute(query, params)
+        else:
+            start = time.perf_counter()
+            cursor.execute(query, params)
+            elapsed = (time.perf_counter() - start) * 1000
+            profiler.record(cursor.connection, query, params, elapsed, cursor.rowcount)
         return cursor
-    
+
     def fetch_all(self, query: str, params: tuple = ()):
         """Executa uma query e retorna todos os resultados."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        cursor = self.get_connection().cursor()
+        profiler = self.profiler
+        if profiler is None:
+            cursor.execute(query, params)
+            return cursor.fetchall()
+
+        start = time.perf_counter()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        elapsed = (time.perf_counter() - start) * 1000
+        profiler.record(cursor.connection, query, params, elapsed, len(rows))
+        return rows
+
+    def iter_rows(self, query: str, params: tuple = (), chunk_size: int = 500,
+                  row_factory=None):
+        """Executa uma query e entrega as linhas aos poucos.
+
+        As linhas são lidas do cursor em blocos de ``chunk_size`` com
+        ``fetchmany``, sem materializar o resultado inteiro.
+        ``row_factory`` (por exemplo ``sqlite3.Row``) vale só para este
+        cursor, sem alterar a conexão compartilhada.
+        """
+        cursor = self.get_connection().cursor()
+        if row_factory is not None:
+            cursor.row_factory = row_factory
+        profiler = self.profiler
+
+        # Conta só o tempo gasto no banco, não o de quem consome as linhas
+        start = time.perf_counter()
         cursor.execute(query, params)
-        results = cursor.fetchall()
-        conn.close()
-        return results
-    
+        elapsed = time.perf_counter() - start
+        count = 0
+
+        try:
+            while True:
+                start = time.perf_counter()
+                rows = cursor.fetchmany(chunk_size)
+                elapsed += time.perf_counter() - start
+                if not rows:
+                    break
+                count += len(rows)
+                yield from rows
+        finally:
+            if profiler is not None:
+                profiler.record(cursor.connection, query, params, elapsed * 1000, count)
+            cursor.close()
+
     def fetch_one(self, query: str, params: tuple = ()):
         """Executa uma query e retorna um resultado."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        cursor = self.get_connection().cursor()
+        profiler = self.profiler
+        if profiler is None:
+            cursor.execute(query, params)
+            return cursor.fetchone()
+
+        start = time.perf_counter()
         cursor.execute(query, params)
-        result = cursor.fetchone()
-        conn.close()
-        return result
\ No newline at end of file
+        row = cursor.fetchone()
+        elapsed = (time.perf_counter() - start) * 1000
+        profiler.record(cursor.connection, query, params, elapsed, row is not None)
+        return row
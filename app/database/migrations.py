@@ -0,0 +1,598 @@
+# app/database/migrations.py
+"""Migrações versionadas do esquema do banco.
+
+A versão aplicada fica em ``PRAGMA user_version``. Cada migração roda
+uma única vez, em sua própria transação, e deve ser idempotente para
+que bancos criados antes deste controle (versão 0) possam ser
+atualizados sem perder dados.
+"""
+from app.models.media import split_genres
+
+
+class Migration:
+    """Um passo do esquema: versão, descrição e função que o aplica."""
+
+    def __init__(self, version: int, description: str, apply, analyze: bool = False):
+        self.version = version
+        self.description = description
+        self.apply = apply
+        self.analyze = analyze  # rodar ANALYZE depois (passos que criam índices)
+
+
+def create_base_tables(cursor):
+    """Cria as tabelas base, se ainda não existirem."""
+    # Tabela de mídias
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS media (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            year INTEGER NOT NULL,
+            genres TEXT,
+            rating REAL DEFAULT 0,
+            comment TEXT,
+            status TEXT DEFAULT 'Planejado',
+            media_type TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Tabela de filmes
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS movies (
+            media_id INTEGER PRIMARY KEY,
+            duration INTEGER,
+            director TEXT,
+            watched_date TIMESTAMP,
+            FOREIGN KEY (media_id) REFERENCES media(id)
+        )
+    ''')
+
+    # Tabela de séries
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS series (
+            media_id INTEGER PRIMARY KEY,
+            total_seasons INTEGER,
+            total_episodes INTEGER,
+            current_season INTEGER DEFAULT 1,
+            current_episode INTEGER DEFAULT 1,
+            episode_duration INTEGER,
+            FOREIGN KEY (media_id) REFERENCES media(id)
+        )
+    ''')
+
+
+def create_search_index(cursor):
+    """Cria o índice FTS5 de busca e os triggers que o mantêm.
+
+    ``media_fts`` usa o mesmo rowid de ``media`` e indexa título,
+    diretor, gêneros e comentário. Na primeira criação, as mídias
+    já existentes são indexadas.
+    """
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'media_fts'"
+    )
+    exists = cursor.fetchone() is not None
+
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS media_fts USING fts5(
+            title, director, genres, comment,
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    ''')
+
+    create_search_triggers(cursor)
+
+    # Mídias: alteração e remoção
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS media_fts_update
+        AFTER UPDATE OF title, genres, comment ON media
+        BEGIN
+            UPDATE media_fts
+            SET title = new.title, genres = new.genres, comment = new.comment
+            WHERE rowid = new.id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS media_fts_delete AFTER DELETE ON media
+        BEGIN
+            DELETE FROM media_fts WHERE rowid = old.id;
+        END
+    ''')
+
+    if not exists:
+        cursor.execute('''
+            INSERT INTO media_fts (rowid, title, director, genres, comment)
+            SELECT m.id, m.title, COALESCE(mv.director, ''), m.genres, m.comment
+            FROM media m
+            LEFT JOIN movies mv ON m.id = mv.media_id
+        ''')
+
+
+def create_search_triggers(cursor):
+    """Cria os triggers de movies/series que alimentam o ``media_fts``.
+
+    Separados de ``create_search_index`` porque precisam ser recriados
+    sempre que as tabelas movies/series forem reconstruídas.
+    """
+    # A linha do índice nasce junto com a linha de movies/series, já
+    # com o diretor, para não reescrever o documento FTS logo depois
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS movies_fts_insert AFTER INSERT ON movies
+        BEGIN
+            INSERT INTO media_fts (rowid, title, director, genres, comment)
+            SELECT id, title, new.director, genres, comment
+            FROM media WHERE id = new.media_id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS series_fts_insert AFTER INSERT ON series
+        BEGIN
+            INSERT INTO media_fts (rowid, title, director, genres, comment)
+            SELECT id, title, '', genres, comment
+            FROM media WHERE id = new.media_id;
+        END
+    ''')
+
+    # Filmes: o diretor fica na tabela movies
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS movies_fts_update AFTER UPDATE OF director ON movies
+        BEGIN
+            UPDATE media_fts SET director = new.director WHERE rowid = new.media_id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS movies_fts_delete AFTER DELETE ON movies
+        BEGIN
+            UPDATE media_fts SET director = '' WHERE rowid = old.media_id;
+        END
+    ''')
+
+
+def create_genre_tables(cursor):
+    """Cria as tabelas normalizadas de gêneros.
+
+    ``media.genres`` continua guardando o texto para exibição;
+    ``genres``/``media_genres`` servem aos filtros e contagens.
+    Na primeira criação, os textos existentes são separados e
+    migrados para as novas tabelas.
+    """
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'genres'"
+    )
+    exists = cursor.fetchone() is not None
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS genres (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE COLLATE NOCASE
+        )
+    ''')
+
+    # Chave (genre_id, media_id) atende os filtros por gênero;
+    # o índice por media_id atende leituras e remoções por mídia
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS media_genres (
+            genre_id INTEGER NOT NULL,
+            media_id INTEGER NOT NULL,
+            PRIMARY KEY (genre_id, media_id),
+            FOREIGN KEY (genre_id) REFERENCES genres(id),
+            FOREIGN KEY (media_id) REFERENCES media(id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_media_genres_media
+        ON media_genres (media_id)
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS media_genres_delete AFTER DELETE ON media
+        BEGIN
+            DELETE FROM media_genres WHERE media_id = old.id;
+        END
+    ''')
+
+    if not exists:
+        cursor.execute("SELECT id, genres FROM media WHERE genres <> ''")
+        links = [
+            (name, media_id)
+            for media_id, text in cursor.fetchall()
+            for name in split_genres(text)
+        ]
+        cursor.executemany(
+            "INSERT OR IGNORE INTO genres (name) VALUES (?)",
+            [(name,) for name, _ in links]
+        )
+        cursor.executemany('''
+            INSERT OR IGNORE INTO media_genres (genre_id, media_id)
+            SELECT id, ? FROM genres WHERE name = ?
+        ''', [(media_id, name) for name, media_id in links])
+
+
+def create_media_indexes(cursor):
+    """Índices para listagens, filtros e estatísticas de ``media``."""
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_media_type_status ON media (media_type, status)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_media_type_title ON media (media_type, title)
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_media_year ON media (year)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_media_rating ON media (rating)")
+
+
+def add_cascade_foreign_keys(cursor):
+    """Reconstrói movies/series com ``ON DELETE CASCADE`` para media.
+
+    O SQLite não altera chaves estrangeiras com ALTER TABLE: as tabelas
+    são recriadas, os dados copiados e os triggers de busca refeitos.
+    Linhas órfãs (sem mídia correspondente) são descartadas.
+    """
+    cursor.execute('''
+        CREATE TABLE movies_new (
+            media_id INTEGER PRIMARY KEY,
+            duration INTEGER,
+            director TEXT,
+            watched_date TIMESTAMP,
+            FOREIGN KEY (media_id) REFERENCES media(id) ON DELETE CASCADE
+        )
+    ''')
+    cursor.execute('''
+        INSERT INTO movies_new (media_id, duration, director, watched_date)
+        SELECT media_id, duration, director, watched_date
+        FROM movies WHERE media_id IN (SELECT id FROM media)
+    ''')
+    cursor.execute("DROP TABLE movies")
+    cursor.execute("ALTER TABLE movies_new RENAME TO movies")
+
+    cursor.execute('''
+        CREATE TABLE series_new (
+            media_id INTEGER PRIMARY KEY,
+            total_seasons INTEGER,
+            total_episodes INTEGER,
+            current_season INTEGER DEFAULT 1,
+            current_episode INTEGER DEFAULT 1,
+            episode_duration INTEGER,
+            FOREIGN KEY (media_id) REFERENCES media(id) ON DELETE CASCADE
+        )
+    ''')
+    cursor.execute('''
+        INSERT INTO series_new (media_id, total_seasons, total_episodes,
+                                current_season, current_episode, episode_duration)
+        SELECT media_id, total_seasons, total_episodes,
+               current_season, current_episode, episode_duration
+        FROM series WHERE media_id IN (SELECT id FROM media)
+    ''')
+    cursor.execute("DROP TABLE series")
+    cursor.execute("ALTER TABLE series_new RENAME TO series")
+
+    create_search_triggers(cursor)
+
+
+def create_media_stats(cursor):
+    """Cria a tabela agregada ``media_stats`` e os triggers que a mantêm.
+
+    A tabela tem uma única linha (id = 1) com as contagens por tipo e
+    status, a soma/quantidade das avaliações (> 0) e a duração total do
+    acervo em minutos: filmes pela duração, séries por temporadas ×
+    episódios × duração do episódio.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS media_stats (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            movies INTEGER NOT NULL DEFAULT 0,
+            series INTEGER NOT NULL DEFAULT 0,
+            concluido INTEGER NOT NULL DEFAULT 0,
+            assistindo INTEGER NOT NULL DEFAULT 0,
+            planejado INTEGER NOT NULL DEFAULT 0,
+            rating_sum REAL NOT NULL DEFAULT 0,
+            rating_count INTEGER NOT NULL DEFAULT 0,
+            total_minutes INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+    # Contribuição de uma linha de media; sign = +1 (new) ou -1 (old)
+    def media_delta(row: str, sign: str) -> str:
+        return f'''
+            movies = movies {sign} ({row}.media_type = 'movie'),
+            series = series {sign} ({row}.media_type = 'series'),
+            concluido = concluido {sign} ({row}.status = 'Concluído'),
+            assistindo = assistindo {sign} ({row}.status = 'Assistindo'),
+            planejado = planejado {sign} ({row}.status = 'Planejado'),
+            rating_sum = rating_sum {sign} (CASE WHEN {row}.rating > 0 THEN {row}.rating ELSE 0 END),
+            rating_count = rating_count {sign} ({row}.rating > 0)
+        '''
+
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS media_stats_insert AFTER INSERT ON media
+        BEGIN
+            UPDATE media_stats SET {media_delta('new', '+')} WHERE id = 1;
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS media_stats_delete AFTER DELETE ON media
+        BEGIN
+            UPDATE media_stats SET {media_delta('old', '-')} WHERE id = 1;
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS media_stats_update
+        AFTER UPDATE OF media_type, status, rating ON media
+        BEGIN
+            UPDATE media_stats SET {media_delta('old', '-')} WHERE id = 1;
+            UPDATE media_stats SET {media_delta('new', '+')} WHERE id = 1;
+        END
+    ''')
+
+    create_stats_duration_triggers(cursor)
+    rebuild_media_stats(cursor)
+
+
+def create_stats_duration_triggers(cursor):
+    """Triggers de movies/series que mantêm ``media_stats.total_minutes``."""
+    movie_minutes = "COALESCE({row}.duration, 0)"
+    series_minutes = ("COALESCE({row}.total_seasons * {row}.total_episodes"
+                      " * {row}.episode_duration, 0)")
+
+    for table, minutes, columns in (
+        ('movies', movie_minutes, 'duration'),
+        ('series', series_minutes, 'total_seasons, total_episodes, episode_duration'),
+    ):
+        new = minutes.format(row='new')
+        old = minutes.format(row='old')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_stats_insert AFTER INSERT ON {table}
+            BEGIN
+                UPDATE media_stats SET total_minutes = total_minutes + {new} WHERE id = 1;
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_stats_delete AFTER DELETE ON {table}
+            BEGIN
+                UPDATE media_stats SET total_minutes = total_minutes - {old} WHERE id = 1;
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_stats_update
+            AFTER UPDATE OF {columns} ON {table}
+            BEGIN
+                UPDATE media_stats SET total_minutes = total_minutes - {old} + {new}
+                WHERE id = 1;
+            END
+        ''')
+
+
+def rebuild_media_stats(cursor):
+    """Recalcula ``media_stats`` do zero a partir das tabelas de mídia.
+
+    Usado na criação da tabela e como reparo caso os contadores
+    divirjam dos dados (por exemplo, após edições manuais no banco).
+    """
+    cursor.execute("DELETE FROM media_stats")
+    cursor.execute('''
+        INSERT INTO media_stats (id, movies, series, concluido, assistindo, planejado,
+                                 rating_sum, rating_count, total_minutes)
+        SELECT 1,
+               COALESCE(SUM(media_type = 'movie'), 0),
+               COALESCE(SUM(media_type = 'series'), 0),
+               COALESCE(SUM(status = 'Concluído'), 0),
+               COALESCE(SUM(status = 'Assistindo'), 0),
+               COALESCE(SUM(status = 'Planejado'), 0),
+               COALESCE(SUM(CASE WHEN rating > 0 THEN rating ELSE 0 END), 0),
+               COALESCE(SUM(rating > 0), 0),
+               (SELECT COALESCE(SUM(duration), 0) FROM movies)
+               + (SELECT COALESCE(SUM(total_seasons * total_episodes * episode_duration), 0)
+                  FROM series)
+        FROM media
+    ''')
+
+
+def create_watch_log(cursor):
+    """Cria o histórico de episódios assistidos.
+
+    ``watch_events`` recebe um evento por episódio assistido, só com
+    INSERTs; o trigger mantém ``series.current_season/current_episode``
+    (e o status da mídia) iguais ao evento mais recente da série.
+    ``watch_daily`` guarda o resumo por dia dos eventos compactados.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS watch_events (
+            id INTEGER PRIMARY KEY,
+            media_id INTEGER NOT NULL,
+            season INTEGER NOT NULL,
+            episode INTEGER NOT NULL,
+            watched_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (media_id) REFERENCES media(id) ON DELETE CASCADE
+        )
+    ''')
+    # "Assistidos nos últimos N dias" e a compactação leem por data;
+    # o histórico de uma série e o trigger leem por (media_id, data)
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_watch_events_watched_at
+        ON watch_events (watched_at)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_watch_events_media
+        ON watch_events (media_id, watched_at)
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS watch_daily (
+            media_id INTEGER NOT NULL,
+            day DATE NOT NULL,
+            episodes INTEGER NOT NULL,
+            last_season INTEGER NOT NULL,
+            last_episode INTEGER NOT NULL,
+            last_watched_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (media_id, day),
+            FOREIGN KEY (media_id) REFERENCES media(id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_watch_daily_day ON watch_daily (day)")
+
+    create_watch_progress_trigger(cursor)
+
+
+def create_watch_progress_trigger(cursor):
+    """Cria o trigger que leva o evento mais recente para ``series``.
+
+    Eventos antigos inseridos fora de ordem não fazem o progresso voltar:
+    o trigger compara com os eventos mais novos em ``watch_events`` e
+    também com os já compactados em ``watch_daily``.
+    """
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS watch_events_progress AFTER INSERT ON watch_events
+        WHEN NOT EXISTS (
+            SELECT 1 FROM watch_events
+            WHERE media_id = new.media_id AND watched_at > new.watched_at
+        ) AND NOT EXISTS (
+            SELECT 1 FROM watch_daily
+            WHERE media_id = new.media_id AND day >= date(new.watched_at)
+              AND last_watched_at > new.watched_at
+        )
+        BEGIN
+            UPDATE series SET current_season = new.season, current_episode = new.episode
+            WHERE media_id = new.media_id;
+            UPDATE media SET status = (
+                SELECT CASE WHEN new.season = total_seasons AND new.episode = total_episodes
+                            THEN 'Concluído' ELSE 'Assistindo' END
+                FROM series WHERE media_id = new.media_id
+            )
+            WHERE id = new.media_id;
+        END
+    ''')
+
+
+def create_trigram_index(cursor):
+    """Cria o índice de trigramas de título e diretor e os triggers que o mantêm.
+
+    ``media_trigram`` (tokenizador ``trigram`` do FTS5) usa o mesmo rowid
+    de ``media`` e serve à busca por trecho e tolerante a erros de
+    digitação. Na primeira criação, as mídias existentes são indexadas.
+    """
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'media_trigram'"
+    )
+    exists = cursor.fetchone() is not None
+
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS media_trigram USING fts5(
+            title, director, tokenize = 'trigram'
+        )
+    ''')
+
+    create_trigram_triggers(cursor)
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS media_trigram_update AFTER UPDATE OF title ON media
+        BEGIN
+            UPDATE media_trigram SET title = new.title WHERE rowid = new.id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS media_trigram_delete AFTER DELETE ON media
+        BEGIN
+            DELETE FROM media_trigram WHERE rowid = old.id;
+        END
+    ''')
+
+    if not exists:
+        cursor.execute('''
+            INSERT INTO media_trigram (rowid, title, director)
+            SELECT m.id, m.title, COALESCE(mv.director, '')
+            FROM media m
+            LEFT JOIN movies mv ON m.id = mv.media_id
+        ''')
+
+
+def create_trigram_triggers(cursor):
+    """Cria os triggers de movies/series que alimentam o ``media_trigram``.
+
+    Como em ``create_search_triggers``, precisam ser recriados sempre
+    que as tabelas movies/series forem reconstruídas.
+    """
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS movies_trigram_insert AFTER INSERT ON movies
+        BEGIN
+            INSERT INTO media_trigram (rowid, title, director)
+            SELECT id, title, new.director FROM media WHERE id = new.media_id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS series_trigram_insert AFTER INSERT ON series
+        BEGIN
+            INSERT INTO media_trigram (rowid, title, director)
+            SELECT id, title, '' FROM media WHERE id = new.media_id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS movies_trigram_update AFTER UPDATE OF director ON movies
+        BEGIN
+            UPDATE media_trigram SET director = new.director WHERE rowid = new.media_id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS movies_trigram_delete AFTER DELETE ON movies
+        BEGIN
+            UPDATE media_trigram SET director = '' WHERE rowid = old.media_id;
+        END
+    ''')
+
+
+def recreate_watch_progress_trigger(cursor):
+    """Recria o trigger de progresso com a checagem de ``watch_daily``.
+
+    Na versão 7 o trigger só olhava ``watch_events``: depois da
+    compactação, um evento retroativo fazia o progresso voltar.
+    """
+    cursor.execute("DROP TRIGGER IF EXISTS watch_events_progress")
+    create_watch_progress_trigger(cursor)
+
+
+MIGRATIONS = [
+    Migration(1, "Tabelas media, movies e series", create_base_tables),
+    Migration(2, "Índice de busca FTS5", create_search_index),
+    Migration(3, "Gêneros normalizados", create_genre_tables),
+    Migration(4, "Índices de media", create_media_indexes, analyze=True),
+    Migration(5, "Chaves estrangeiras com ON DELETE CASCADE", add_cascade_foreign_keys),
+    Migration(6, "Estatísticas agregadas mantidas por triggers", create_media_stats),
+    Migration(7, "Histórico de episódios assistidos", create_watch_log),
+    Migration(8, "Índice de trigramas de título e diretor", create_trigram_index),
+    Migration(9, "Progresso de séries confere o histórico compactado",
+              recreate_watch_progress_trigger),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def get_version(conn) -> int:
+    """Versão do esquema gravada no banco."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def run_migrations(db) -> list:
+    """Aplica, em ordem, as migrações pendentes de ``db``.
+
+    Retorna as versões aplicadas; lista vazia quando o esquema já está
+    atualizado, caso em que nenhum DDL é executado.
+    """
+    if get_version(db.get_connection()) >= LATEST_VERSION:
+        return []
+
+    applied = []
+    needs_analyze = False
+
+    for migration in MIGRATIONS:
+        with db.transaction() as conn:
+            # Relê a versão dentro da transação: outro processo pode ter
+            # aplicado a migração enquanto esperávamos o lock de escrita
+            if get_version(conn) >= migration.version:
+                continue
+            migration.apply(conn.cursor())
+            conn.execute(f"PRAGMA user_version = {int(migration.version)}")
+
+        applied.append(migration.version)
+        needs_analyze = needs_analyze or migration.analyze
+
+    if needs_analyze:
+        db.get_connection().execute("ANALYZE")
+
+    return applied
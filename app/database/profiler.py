@@ -0,0 +1,188 @@
+# app/database/profiler.py
+"""Medição de tempo das consultas do ``Database`` (opcional).
+
+Cada comando é agrupado pelo SQL normalizado (espaços colapsados,
+literais e listas ``IN (?, ?, ...)`` trocados por ``?``), com contagem
+de chamadas, linhas, tempo total/mínimo/máximo e um histograma de
+latência. Comandos acima de ``slow_ms`` vão para o log
+``app.database.profiler`` junto com o ``EXPLAIN QUERY PLAN``.
+
+Para ligar ao iniciar o app, use ``TRACKFLIX_PROFILE`` (veja
+``configure_from_env``).
+"""
+import logging
+import os
+import re
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Limites superiores (ms) das faixas do histograma; a última é "acima de 1 s"
+BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+
+_WHITESPACE = re.compile(r'\s+')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDERS = re.compile(r'\?(?:\s*,\s*\?)+')
+
+# Comandos para os quais EXPLAIN QUERY PLAN faz sentido
+_EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+def normalize_sql(sql: str) -> str:
+    """Forma canônica do SQL, para agrupar execuções do mesmo comando."""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _PLACEHOLDERS.sub('?, ...', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class StatementStats:
+    """Números acumulados de um comando normalizado."""
+
+    __slots__ = ('sql', 'calls', 'rows', 'total_ms', 'min_ms', 'max_ms',
+                 'histogram', 'plan')
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.calls = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.min_ms = float('inf')
+        self.max_ms = 0.0
+        self.histogram = [0] * (len(BUCKETS_MS) + 1)
+        self.plan: Optional[List[str]] = None
+
+    def add(self, elapsed_ms: float, rows: int):
+        self.calls += 1
+        self.rows += max(rows, 0)
+        self.total_ms += elapsed_ms
+        self.min_ms = min(self.min_ms, elapsed_ms)
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        for i, limit in enumerate(BUCKETS_MS):
+            if elapsed_ms < limit:
+                self.histogram[i] += 1
+                break
+        else:
+            self.histogram[-1] += 1
+
+    def to_dict(self) -> Dict:
+        return {
+            'sql': self.sql,
+            'calls': self.calls,
+            'rows': self.rows,
+            'total_ms': round(self.total_ms, 3),
+            'avg_ms': round(self.total_ms / self.calls, 3) if self.calls else 0,
+            'min_ms': round(self.min_ms, 3) if self.calls else 0,
+            'max_ms': round(self.max_ms, 3),
+            'histogram': dict(zip([f"<{limit}ms" for limit in BUCKETS_MS] + ['≥1000ms'],
+                                  self.histogram)),
+            'plan': self.plan,
+        }
+
+
+class QueryProfiler:
+    """Acumula as medições das consultas; seguro para uso entre threads."""
+
+    def __init__(self, slow_ms: float = 100.0, max_slow_entries: int = 100):
+        self.slow_ms = slow_ms
+        self.started_at = datetime.now()
+        self.slow_queries = deque(maxlen=max_slow_entries)
+        self._stats: Dict[str, StatementStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, conn, sql: str, params, elapsed_ms: float, rows: int):
+        """Registra uma execução; se for lenta, loga com o plano da consulta."""
+        key = normalize_sql(sql)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = StatementStats(key)
+            stats.add(elapsed_ms, rows)
+            needs_plan = elapsed_ms >= self.slow_ms and stats.plan is None
+
+        if elapsed_ms < self.slow_ms:
+            return
+
+        # O plano é lido uma vez por comando, na primeira execução lenta
+        if needs_plan:
+            stats.plan = self.explain(conn, sql, params)
+        self.slow_queries.append({
+            'at': datetime.now().isoformat(timespec='seconds'),
+            'sql': key,
+            'elapsed_ms': round(elapsed_ms, 3),
+            'rows': rows,
+        })
+        logger.warning("Consulta lenta (%.1f ms, %d linhas): %s\n  %s",
+                       elapsed_ms, rows, key, '\n  '.join(stats.plan or []))
+
+    @staticmethod
+    def explain(conn, sql: str, params) -> List[str]:
+        """Linhas do ``EXPLAIN QUERY PLAN`` de ``sql`` (vazio se não se aplica)."""
+        if not sql.lstrip().upper().startswith(_EXPLAINABLE):
+            return []
+        try:
+            rows = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+        except Exception as e:
+            return [f"(plano indisponível: {e})"]
+        return [row[-1] for row in rows]
+
+    def statements(self) -> List[Dict]:
+        """Estatísticas por comando, do maior tempo total para o menor."""
+        with self._lock:
+            stats = [item.to_dict() for item in self._stats.values()]
+        return sorted(stats, key=lambda item: item['total_ms'], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.slow_queries.clear()
+            self.started_at = datetime.now()
+
+    def report(self, limit: Optional[int] = 20) -> str:
+        """Relatório em texto: comandos mais custosos e consultas lentas."""
+        statements = self.statements()
+        lines = [
+            f"Consultas desde {self.started_at:%Y-%m-%d %H:%M:%S}: "
+            f"{sum(item['calls'] for item in statements)} execuções, "
+            f"{len(statements)} comandos distintos, limite lento {self.slow_ms} ms",
+            "",
+            f"{'total ms':>10} {'chamadas':>9} {'média ms':>9} {'máx ms':>9} {'linhas':>9}  SQL",
+        ]
+        for item in statements[:limit]:
+            sql = item['sql'] if len(item['sql']) <= 100 else item['sql'][:97] + '...'
+            lines.append(f"{item['total_ms']:>10.1f} {item['calls']:>9} {item['avg_ms']:>9.2f} "
+                         f"{item['max_ms']:>9.1f} {item['rows']:>9}  {sql}")
+            histogram = ' '.join(f"{bucket}:{count}"
+                                 for bucket, count in item['histogram'].items() if count)
+            lines.append(f"{'':>50}  {histogram}")
+            for step in item['plan'] or []:
+                lines.append(f"{'':>50}  plano: {step}")
+
+        if self.slow_queries:
+            lines += ["", f"Consultas lentas (últimas {len(self.slow_queries)}):"]
+            for entry in self.slow_queries:
+                lines.append(f"  {entry['at']} {entry['elapsed_ms']:>9.1f} ms  {entry['sql'][:100]}")
+        return '\n'.join(lines)
+
+    def write_report(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.report(limit=None) + '\n')
+
+
+def configure_from_env(db, environ=os.environ) -> Optional[QueryProfiler]:
+    """Liga a medição de ``db`` conforme as variáveis de ambiente.
+
+    ``TRACKFLIX_PROFILE`` liga a medição; se não for ``1``, é o arquivo
+    onde o relatório é gravado ao sair. ``TRACKFLIX_SLOW_MS`` define o
+    limite das consultas lentas (padrão 100 ms).
+    """
+    setting = environ.get('TRACKFLIX_PROFILE', '').strip()
+    if not setting or setting == '0':
+        return None
+    slow_ms = float(environ.get('TRACKFLIX_SLOW_MS', 100))
+    report_path = None if setting.lower() in ('1', 'true', 'yes') else setting
+    return db.enable_profiling(slow_ms, report_path)
@@ -1,9 +1,19 @@
 # app/main.py
+import sys
 from app.database.db import Database
 from app.services.media_service import MediaService
 
-def main():
-    """Ponto de entrada principal da aplicação."""
+def main(argv=None):
+    """Ponto de entrada principal da aplicação.
+    
+    Com argumentos (``python -m app stats --json``) executa o comando
+    direto, sem menu (veja ``app.ui.commands``).
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        from app.ui.commands import main as run_command
+        return run_command(argv)
+    
     print("\n" + "=" * 70)
     print("🎬 TRACKFLIX - Movie & Series Tracker")
     print("=" * 70)
@@ -11,7 +21,10 @@ def main():
     
     try:
         # Inicializar componentes
+        from app.database.profiler import configure_from_env
+        
         db = Database()
+        configure_from_env(db)
         media_service = MediaService(db)
         
         # Perguntar qual interface usar
@@ -45,4 +58,4 @@ def main():
         input("\nPressione Enter para sair...")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
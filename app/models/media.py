@@ -1,6 +1,7 @@
 # app/models/media.py
+from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Mapping, Optional, Sequence
 from enum import Enum
 
 class MediaType(Enum):
@@ -12,10 +13,44 @@ class MediaStatus(Enum):
     WATCHING = "Assistindo"
     COMPLETED = "Concluído"
 
-class Media:
-    """Classe base para todas as mídias."""
+def split_genres(text: str) -> list:
+    """Separa o texto de gêneros ('Ação, Drama') em nomes únicos."""
+    names = []
+    seen = set()
+    for name in (text or '').split(','):
+        name = name.strip()
+        if name and name.lower() not in seen:
+            seen.add(name.lower())
+            names.append(name)
+    return names
+
+def _parse_datetime(value) -> Optional[datetime]:
+    """Converte um TIMESTAMP do SQLite ('2024-01-31 20:15:00') em datetime."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+_STATUS_BY_VALUE = {status.value: status for status in MediaStatus}
+
+def _parse_status(value) -> MediaStatus:
+    """Converte o status gravado no banco; valores desconhecidos viram 'Planejado'."""
+    return _STATUS_BY_VALUE.get(value, MediaStatus.PLAN_TO_WATCH)
+
+class Media(ABC):
+    """Classe base para todas as mídias.
+    
+    As mídias usam ``__slots__``: sem ``__dict__`` por instância, cada
+    objeto ocupa bem menos memória em listagens grandes.
+    """
+    
+    __slots__ = ('id', 'title', 'year', 'genres', 'rating', 'comment',
+                 'status', 'created_at', 'type')
     
     def __init__(self, title: str, year: int, genres: List[str]):
+        self.id = None  # Definido ao salvar ou ao ler do banco
         self.title = title
         self.year = year
         self.genres = genres
@@ -25,6 +60,45 @@ class Media:
         self.created_at = datetime.now()
         self.type = None  # Será definido nas subclasses
     
+    @classmethod
+    def from_row(cls, row: Sequence[Any], columns: Mapping[str, int]):
+        """Cria a mídia a partir da tupla de uma linha do banco.
+        
+        ``columns`` dá a posição de cada coluna na tupla (montado uma vez
+        por consulta a partir de ``cursor.description``). Não passa pelo
+        ``__init__``: os campos vêm prontos da linha, sem validação nem
+        ``datetime.now()`` por objeto.
+        """
+        media = cls.__new__(cls)
+        media.id = row[columns['id']]
+        media.title = row[columns['title']]
+        media.year = row[columns['year']]
+        media.genres = split_genres(row[columns['genres']])
+        media.rating = row[columns['rating']] or 0.0
+        media.comment = row[columns['comment']] or ""
+        media.status = _parse_status(row[columns['status']])
+        media.created_at = _parse_datetime(row[columns['created_at']])
+        media._fill_from_row(row, columns)
+        return media
+    
+    @abstractmethod
+    def _fill_from_row(self, row: Sequence[Any], columns: Mapping[str, int]):
+        """Preenche os campos específicos da subclasse."""
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Campos da mídia com os nomes e formatos das colunas do banco (para JSON)."""
+        return {
+            'id': self.id,
+            'title': self.title,
+            'year': self.year,
+            'genres': ', '.join(self.genres),
+            'rating': self.rating,
+            'comment': self.comment,
+            'status': self.status.value,
+            'media_type': self.type.value,
+            'created_at': self.created_at.isoformat(' ') if self.created_at else None,
+        }
+    
     def validate(self):
         """Valida os dados da mídia."""
         if not self.title.strip():
@@ -40,6 +114,8 @@ class Media:
 class Movie(Media):
     """Classe para filmes."""
     
+    __slots__ = ('duration', 'director', 'watched_date')
+    
     def __init__(self, title: str, year: int, genres: List[str], 
                  duration: int, director: Optional[str] = None):
         super().__init__(title, year, genres)
@@ -48,6 +124,19 @@ class Movie(Media):
         self.watched_date = None
         self.type = MediaType.MOVIE
     
+    def _fill_from_row(self, row: Sequence[Any], columns: Mapping[str, int]):
+        self.duration = row[columns['duration']]
+        self.director = row[columns['director']]
+        self.watched_date = _parse_datetime(row[columns['watched_date']])
+        self.type = MediaType.MOVIE
+    
+    def to_dict(self) -> Dict[str, Any]:
+        data = super().to_dict()
+        data['duration'] = self.duration
+        data['director'] = self.director
+        data['watched_date'] = self.watched_date.isoformat() if self.watched_date else None
+        return data
+    
     def mark_as_watched(self):
         """Marca o filme como assistido."""
         self.status = MediaStatus.COMPLETED
@@ -59,6 +148,9 @@ class Movie(Media):
 class Series(Media):
     """Classe para séries."""
     
+    __slots__ = ('total_seasons', 'total_episodes', 'episode_duration',
+                 'current_season', 'current_episode')
+    
     def __init__(self, title: str, year: int, genres: List[str],
                  total_seasons: int, total_episodes: int,
                  episode_duration: Optional[int] = None):
@@ -70,6 +162,23 @@ class Series(Media):
         self.current_episode = 1
         self.type = MediaType.SERIES
     
+    def _fill_from_row(self, row: Sequence[Any], columns: Mapping[str, int]):
+        self.total_seasons = row[columns['total_seasons']]
+        self.total_episodes = row[columns['total_episodes']]
+        self.episode_duration = row[columns['episode_duration']]
+        self.current_season = row[columns['current_season']]
+        self.current_episode = row[columns['current_episode']]
+        self.type = MediaType.SERIES
+    
+    def to_dict(self) -> Dict[str, Any]:
+        data = super().to_dict()
+        data['total_seasons'] = self.total_seasons
+        data['total_episodes'] = self.total_episodes
+        data['current_season'] = self.current_season
+        data['current_episode'] = self.current_episode
+        data['episode_duration'] = self.episode_duration
+        return data
+    
     @property
     def progress_percentage(self):
         """Calcula o progresso em porcentagem."""
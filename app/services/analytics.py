@@ -0,0 +1,258 @@
+# app/services/analytics.py
+"""Estatísticas detalhadas do acervo calculadas com NumPy.
+
+As colunas numéricas de ``media``/``movies``/``series`` são lidas uma
+única vez, em blocos, para arrays; todos os totais e agrupamentos
+(por ano, década, gênero, faixa de nota...) saem de operações
+vetorizadas sobre esses arrays, sem laço Python por mídia.
+"""
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.models.media import MediaStatus
+
+# Índice de cada status na coluna ``status`` dos arrays
+STATUSES = list(MediaStatus)
+PLANNED, WATCHING, COMPLETED = (STATUSES.index(status) for status in (
+    MediaStatus.PLAN_TO_WATCH, MediaStatus.WATCHING, MediaStatus.COMPLETED))
+
+COLUMNS = ('id', 'is_movie', 'year', 'rating', 'status', 'duration',
+           'total_seasons', 'total_episodes', 'current_season',
+           'current_episode', 'episode_duration')
+
+_status_case = ' '.join(f"WHEN '{status.value}' THEN {index}"
+                        for index, status in enumerate(STATUSES))
+
+COLUMNS_QUERY = f'''
+    SELECT m.id, m.media_type = 'movie', m.year, COALESCE(m.rating, 0),
+           CASE m.status {_status_case} ELSE {PLANNED} END,
+           mv.duration, s.total_seasons, s.total_episodes,
+           s.current_season, s.current_episode, s.episode_duration
+    FROM media m
+    LEFT JOIN movies mv ON m.id = mv.media_id
+    LEFT JOIN series s ON m.id = s.media_id
+'''
+
+GENRES_QUERY = '''
+    SELECT mg.media_id, mg.genre_id FROM media_genres mg
+'''
+
+
+def _in_range(query: str, column: str, id_range: Optional[Tuple[int, int]]):
+    """``query`` restrita a ``id_range`` (início incluso, fim não), ordenada."""
+    if id_range is None:
+        return query + f" ORDER BY {column}", ()
+    return query + f" WHERE {column} >= ? AND {column} < ? ORDER BY {column}", tuple(id_range)
+
+
+@contextmanager
+def read_snapshot(db):
+    """Faz as leituras do bloco na mesma transação de leitura.
+
+    Em modo WAL, todas as consultas entre o ``BEGIN`` e o ``COMMIT`` veem
+    o mesmo estado do banco, mesmo com escritas de outras conexões no
+    meio. Dentro de uma transação já aberta, só a reaproveita.
+    """
+    conn = db.get_connection()
+    if conn.in_transaction:
+        yield
+        return
+    conn.execute("BEGIN")
+    try:
+        yield
+    finally:
+        conn.execute("COMMIT")
+
+
+def _load_matrix(db, query: str, width: int, chunk_size: int,
+                 params: tuple = ()) -> np.ndarray:
+    """Lê ``query`` em blocos de ``chunk_size`` para uma matriz float64.
+
+    ``NULL`` vira ``nan``. Só um bloco de tuplas existe por vez; os
+    blocos já convertidos são juntados no final.
+    """
+    cursor = db.get_connection().cursor()
+    cursor.execute(query, params)
+    blocks = []
+    try:
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            blocks.append(np.array(rows, dtype=np.float64))
+    finally:
+        cursor.close()
+
+    if not blocks:
+        return np.empty((0, width), dtype=np.float64)
+    return np.concatenate(blocks)
+
+
+def load_columns(db, chunk_size: int = 50_000,
+                 id_range: Optional[Tuple[int, int]] = None) -> Dict[str, np.ndarray]:
+    """Carrega as colunas usadas nas estatísticas, uma por array.
+
+    Retorna um dict com um array por nome de ``COLUMNS`` (ordenados por
+    id), mais ``genre_media``/``genre_ids`` (pares de ``media_genres``)
+    e ``genre_names`` (nome de cada ``genres.id``). Com ``id_range``
+    carrega só as mídias com ids nesse intervalo (veja ``merge_columns``).
+
+    As três leituras usam um só snapshot: uma escrita no meio não deixa
+    ligações de gênero para mídias (ou gêneros) que as colunas não têm.
+    """
+    with read_snapshot(db):
+        query, params = _in_range(COLUMNS_QUERY, 'm.id', id_range)
+        matrix = _load_matrix(db, query, len(COLUMNS), chunk_size, params)
+        columns = {name: matrix[:, i] for i, name in enumerate(COLUMNS)}
+
+        query, params = _in_range(GENRES_QUERY, 'mg.media_id', id_range)
+        links = _load_matrix(db, query, 2, chunk_size, params).astype(np.int64)
+        columns['genre_media'] = links[:, 0]
+        columns['genre_ids'] = links[:, 1]
+        columns['genre_names'] = dict(db.fetch_all("SELECT id, name FROM genres"))
+    return columns
+
+
+def merge_columns(parts: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """Junta ``load_columns`` de intervalos de id consecutivos, em ordem."""
+    merged = {name: np.concatenate([part[name] for part in parts])
+              for name in COLUMNS + ('genre_media', 'genre_ids')}
+    merged['genre_names'] = {}
+    for part in parts:
+        merged['genre_names'].update(part['genre_names'])
+    return merged
+
+
+def _ratio(part, whole) -> float:
+    return round(float(part) / float(whole), 4) if whole else 0
+
+
+def _mean(total, count) -> float:
+    return round(float(total) / float(count), 2) if count else 0
+
+
+def _group(keys: np.ndarray, rating: np.ndarray, rated: np.ndarray,
+           completed: np.ndarray) -> List[Dict[str, Any]]:
+    """Contagem, nota média e taxa de conclusão por valor de ``keys``."""
+    if not len(keys):
+        return []
+    # As chaves (anos, ids de gênero) são inteiros próximos: contar por
+    # deslocamento com bincount evita ordenar como np.unique faria
+    first = keys.min()
+    offsets = keys - first
+    counts = np.bincount(offsets)
+    rated_counts = np.bincount(offsets, weights=rated)
+    rating_sums = np.bincount(offsets, weights=rating * rated)
+    done = np.bincount(offsets, weights=completed)
+
+    return [
+        {
+            'key': int(first + offset),
+            'count': int(counts[offset]),
+            'average_rating': _mean(rating_sums[offset], rated_counts[offset]),
+            'completion_rate': _ratio(done[offset], counts[offset]),
+        }
+        for offset in np.flatnonzero(counts)
+    ]
+
+
+def compute_statistics(columns: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """Calcula as estatísticas detalhadas a partir de ``load_columns``."""
+    is_movie = columns['is_movie'] == 1
+    is_series = ~is_movie
+    status = columns['status']
+    completed = status == COMPLETED
+    planned = status == PLANNED
+    rating = columns['rating']
+    rated = rating > 0
+
+    # Tempo de tela: filmes contam inteiros quando concluídos; séries
+    # contam os episódios até o atual (todos se concluídas)
+    duration = np.nan_to_num(columns['duration'])
+    seasons = np.nan_to_num(columns['total_seasons'])
+    per_season = np.nan_to_num(columns['total_episodes'])
+    episode_minutes = np.nan_to_num(columns['episode_duration'])
+    episodes = np.where(is_series, seasons * per_season, 0)
+    progress = ((np.nan_to_num(columns['current_season']) - 1) * per_season
+                + np.nan_to_num(columns['current_episode']))
+    watched_episodes = np.select(
+        [is_movie, completed, planned],
+        [0, episodes, 0],
+        np.clip(progress, 0, episodes),
+    )
+
+    movie_minutes = np.where(is_movie, duration, 0)
+    series_minutes = episodes * episode_minutes
+    watched_movie_minutes = movie_minutes * completed
+    watched_series_minutes = watched_episodes * episode_minutes
+    library_minutes = movie_minutes.sum() + series_minutes.sum()
+    watched_minutes = watched_movie_minutes.sum() + watched_series_minutes.sum()
+
+    # Notas de 0,5 a 5 caem nas faixas 1★..5★ (arredondando para cima)
+    stars = np.ceil(rating[rated]).astype(np.int64)
+    distribution = np.bincount(stars, minlength=6)[1:6]
+
+    total = len(status)
+    years = columns['year'].astype(np.int64)
+
+    by_genre = []
+    ids = columns['id']
+    genre_media = columns['genre_media']
+    media_index = np.searchsorted(ids, genre_media)
+    # Ligações para mídias que não estão nas colunas (chaves estrangeiras
+    # desligadas, remoção entre leituras em partes) ficam de fora
+    linked = media_index < len(ids)
+    linked[linked] = ids[media_index[linked]] == genre_media[linked]
+    media_index = media_index[linked]
+    names = columns['genre_names']
+    for group in _group(columns['genre_ids'][linked], rating[media_index],
+                        rated[media_index], completed[media_index]):
+        group['genre'] = names.get(group.pop('key'), '')
+        by_genre.append(group)
+    by_genre.sort(key=lambda group: (-group['count'], group['genre'].lower()))
+
+    by_year = _group(years, rating, rated, completed)
+    for group in by_year:
+        group['year'] = group.pop('key')
+    by_decade = _group(years // 10 * 10, rating, rated, completed)
+    for group in by_decade:
+        group['decade'] = group.pop('key')
+
+    return {
+        'total': total,
+        'movies': int(is_movie.sum()),
+        'series': int(is_series.sum()),
+        'status': {
+            media_status.value: int((status == index).sum())
+            for index, media_status in enumerate(STATUSES)
+        },
+        'completion_rate': _ratio(completed.sum(), total),
+        'movie_completion_rate': _ratio((completed & is_movie).sum(), is_movie.sum()),
+        'series_completion_rate': _ratio((completed & is_series).sum(), is_series.sum()),
+        'watch_time': {
+            'library_minutes': int(library_minutes),
+            'watched_minutes': int(watched_minutes),
+            'remaining_minutes': int(library_minutes - watched_minutes),
+            'movie_minutes': int(watched_movie_minutes.sum()),
+            'series_minutes': int(watched_series_minutes.sum()),
+            'episodes': int(episodes.sum()),
+            'watched_episodes': int(watched_episodes.sum()),
+        },
+        'ratings': {
+            'rated': int(rated.sum()),
+            'average': _mean(rating[rated].sum(), rated.sum()),
+            'median': round(float(np.median(rating[rated])), 2) if rated.any() else 0,
+            'distribution': {star: int(count) for star, count
+                             in enumerate(distribution, start=1)},
+        },
+        'by_year': by_year,
+        'by_decade': by_decade,
+        'by_genre': by_genre,
+    }
+
+
+def detailed_statistics(db, chunk_size: int = 50_000) -> Dict[str, Any]:
+    """Carrega as colunas do banco e calcula as estatísticas detalhadas."""
+    return compute_statistics(load_columns(db, chunk_size))
@@ -0,0 +1,243 @@
+# app/services/async_service.py
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from app.models.media import Media, Movie, Series
+from app.services.media_service import MediaService
+from app.services.query import MediaQuery
+
+class AsyncMediaService:
+    """Fachada asyncio do ``MediaService``: o event loop nunca espera o SQLite.
+
+    Leituras rodam em ``readers`` threads fixas, cada uma com a sua
+    conexão (veja ``Database.get_connection``); a leitura vai para a
+    thread com menos trabalho pendente. Escritas entram em uma fila e são
+    executadas uma de cada vez por uma única tarefa, em uma thread só
+    delas, então nunca disputam o lock de escrita do banco entre si.
+
+    ``aiter_movies``/``aiter_series`` percorrem acervos grandes em blocos,
+    sem montar a lista inteira; o cursor fica preso a uma thread.
+
+        async with AsyncMediaService(service) as service:
+            stats, page = await asyncio.gather(service.get_statistics(),
+                                               service.list_movies_page())
+            await service.add_movie(movie)
+    """
+
+    READERS = 4
+
+    def __init__(self, service: MediaService, readers: int = READERS):
+        if readers < 1:
+            raise ValueError("readers deve ser ≥ 1")
+        self.service = service
+        # Uma thread por executor: cada uma mantém a própria conexão e os
+        # cursores dos iteradores continuam sempre na thread que os abriu
+        self._readers = [ThreadPoolExecutor(1, thread_name_prefix=f"trackflix-read{i}")
+                         for i in range(readers)]
+        self._pending = [0] * readers
+        self._writer_pool = ThreadPoolExecutor(1, thread_name_prefix="trackflix-write")
+        self._writes: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def aclose(self):
+        """Espera as escritas pendentes, grava o histórico e libera as threads."""
+        if self._closed:
+            return
+        if self._writes is not None:
+            await self._writes.join()
+        await self._write(self.service.flush_watch_events)
+        self._closed = True
+        if self._writer is not None:
+            self._writer.cancel()
+        for executor in self._readers + [self._writer_pool]:
+            executor.shutdown(wait=False)
+
+    # Execução
+
+    async def _read_on(self, lane: int, func: Callable, *args, **kwargs):
+        """Roda ``func`` na thread de leitura ``lane``."""
+        loop = asyncio.get_running_loop()
+        self._pending[lane] += 1
+        try:
+            return await loop.run_in_executor(self._readers[lane],
+                                              functools.partial(func, *args, **kwargs))
+        finally:
+            self._pending[lane] -= 1
+
+    def _idle_lane(self) -> int:
+        return min(range(len(self._readers)), key=self._pending.__getitem__)
+
+    async def _read(self, func: Callable, *args, **kwargs):
+        return await self._read_on(self._idle_lane(), func, *args, **kwargs)
+
+    async def _write(self, func: Callable, *args, **kwargs):
+        """Põe ``func`` na fila de escrita e espera o resultado."""
+        if self._closed:
+            raise RuntimeError("AsyncMediaService já foi fechado")
+        if self._writer is None or self._writer.done():
+            self._writes = asyncio.Queue()
+            self._writer = asyncio.get_running_loop().create_task(self._write_loop())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._writes.put((functools.partial(func, *args, **kwargs), future))
+        return await future
+
+    async def _write_loop(self):
+        """Tarefa única que executa as escritas na ordem de chegada."""
+        loop = asyncio.get_running_loop()
+        while True:
+            call, future = await self._writes.get()
+            try:
+                # Quem desistiu de esperar antes da vez não escreve nada
+                if not future.cancelled():
+                    result = await loop.run_in_executor(self._writer_pool, call)
+                    if not future.cancelled():
+                        future.set_result(result)
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            finally:
+                self._writes.task_done()
+
+    async def _aiter(self, make_iterator: Callable, chunk_size: int) -> AsyncIterator:
+        lane = self._idle_lane()
+        iterator = make_iterator()
+        try:
+            while True:
+                chunk = await self._read_on(lane, lambda: list(islice(iterator, chunk_size)))
+                if not chunk:
+                    break
+                for item in chunk:
+                    yield item
+        finally:
+            # Fecha o cursor na thread dona da conexão
+            await self._read_on(lane, iterator.close)
+
+    # Leituras
+
+    def aiter_movies(self, chunk_size: int = 500) -> AsyncIterator[Movie]:
+        """Percorre todos os filmes em blocos de ``chunk_size`` (``async for``)."""
+        return self._aiter(lambda: self.service.iter_movies(chunk_size), chunk_size)
+
+    def aiter_series(self, chunk_size: int = 500) -> AsyncIterator[Series]:
+        """Percorre todas as séries em blocos de ``chunk_size`` (``async for``)."""
+        return self._aiter(lambda: self.service.iter_series(chunk_size), chunk_size)
+
+    async def get_all_movies(self) -> List[Movie]:
+        return await self._read(self.service.get_all_movies)
+
+    async def get_all_series(self) -> List[Series]:
+        return await self._read(self.service.get_all_series)
+
+    async def list_movies_page(self, after: Optional[str] = None,
+                               limit: int = MediaService.PAGE_SIZE,
+                               order_by: str = 'title', descending: bool = False) -> Dict[str, Any]:
+        return await self._read(self.service.list_movies_page, after, limit, order_by, descending)
+
+    async def list_series_page(self, after: Optional[str] = None,
+                               limit: int = MediaService.PAGE_SIZE,
+                               order_by: str = 'title', descending: bool = False) -> Dict[str, Any]:
+        return await self._read(self.service.list_series_page, after, limit, order_by, descending)
+
+    async def find(self, query: MediaQuery) -> List[Media]:
+        return await self._read(self.service.find, query)
+
+    async def find_page(self, query: MediaQuery, after: Optional[str] = None,
+                        limit: int = MediaService.PAGE_SIZE) -> Dict[str, Any]:
+        return await self._read(self.service.find_page, query, after, limit)
+
+    async def get_media(self, media_id: int) -> Optional[Media]:
+        return await self._read(self.service.get_media, media_id)
+
+    async def search(self, term: str, limit: int = 50,
+                     media_type: Optional[str] = None) -> List[Media]:
+        return await self._read(self.service.search, term, limit, media_type)
+
+    async def fuzzy_search(self, term: str, limit: int = 20,
+                           media_type: Optional[str] = None) -> List[Media]:
+        return await self._read(self.service.fuzzy_search, term, limit, media_type)
+
+    async def get_media_by_genres(self, genres: List[str], match_all: bool = False,
+                                  media_type: Optional[str] = None) -> List[Media]:
+        return await self._read(self.service.get_media_by_genres, genres, match_all, media_type)
+
+    async def get_genre_counts(self, media_type: Optional[str] = None) -> Dict[str, int]:
+        return await self._read(self.service.get_genre_counts, media_type)
+
+    async def get_statistics(self) -> Dict[str, Any]:
+        return await self._read(self.service.get_statistics)
+
+    async def get_detailed_statistics(self) -> Dict[str, Any]:
+        return await self._read(self.service.get_detailed_statistics)
+
+    # O histórico lê depois de gravar os eventos pendentes; a gravação
+    # passa pela fila de escrita e a consulta pelas threads de leitura
+
+    async def get_recently_watched(self, days: int = 7) -> List[Dict[str, Any]]:
+        await self.flush_watch_events()
+        return await self._read(self.service.get_recently_watched, days)
+
+    async def get_watch_history(self, media_id: int,
+                                days: Optional[int] = None) -> List[Dict[str, Any]]:
+        await self.flush_watch_events()
+        return await self._read(self.service.get_watch_history, media_id, days)
+
+    async def export(self, path: str, fmt: Optional[str] = None,
+                     compress: Optional[bool] = None, media_type: Optional[str] = None,
+                     progress=None, cancelled=None) -> int:
+        """Exporta em uma thread de leitura; ``progress`` é chamado nessa thread."""
+        await self.flush_watch_events()
+        return await self._read(self.service.export, path, fmt, compress, media_type,
+                                progress, cancelled)
+
+    # Escritas
+
+    async def add_movie(self, movie: Movie) -> bool:
+        return await self._write(self.service.add_movie, movie)
+
+    async def add_series(self, series: Series) -> bool:
+        return await self._write(self.service.add_series, series)
+
+    async def add_movies_bulk(self, movies, **kwargs) -> Dict[str, Any]:
+        return await self._write(self.service.add_movies_bulk, movies, **kwargs)
+
+    async def add_series_bulk(self, series_list, **kwargs) -> Dict[str, Any]:
+        return await self._write(self.service.add_series_bulk, series_list, **kwargs)
+
+    async def update_movie_rating(self, media_id: int, rating: float,
+                                  comment: Optional[str] = None) -> bool:
+        return await self._write(self.service.update_movie_rating, media_id, rating, comment)
+
+    async def update_series_rating(self, media_id: int, rating: float,
+                                   comment: Optional[str] = None) -> bool:
+        return await self._write(self.service.update_series_rating, media_id, rating, comment)
+
+    async def update_progress(self, media_id: int, season: int, episode: int) -> bool:
+        return await self._write(self.service.update_progress, media_id, season, episode)
+
+    async def record_watch(self, media_id: int, season: int, episode: int,
+                           watched_at: Optional[datetime] = None):
+        await self._write(self.service.record_watch, media_id, season, episode, watched_at)
+
+    async def flush_watch_events(self) -> Dict[str, Any]:
+        return await self._write(self.service.flush_watch_events)
+
+    async def compact_watch_events(self, older_than_days: int = 90) -> Dict[str, int]:
+        return await self._write(self.service.compact_watch_events, older_than_days)
+
+    async def delete_media(self, media_id: int) -> bool:
+        return await self._write(self.service.delete_media, media_id)
+
+    async def rebuild_statistics(self) -> Dict[str, Any]:
+        return await self._write(self.service.rebuild_statistics)
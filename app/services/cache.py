@@ -0,0 +1,109 @@
+# app/services/cache.py
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable
+
+_MISSING = object()
+
+class LRUCache:
+    """Cache LRU de tamanho limitado com invalidação por etiquetas (tags).
+
+    Cada valor é guardado com um conjunto de tags (por exemplo
+    ``'movie'`` ou ``'item:42'``); ``invalidate('movie')`` descarta todas
+    as entradas que dependem de filmes. Seguro para uso entre threads.
+    """
+
+    def __init__(self, max_size: int = 256):
+        if max_size < 1:
+            raise ValueError("max_size deve ser ≥ 1")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries = OrderedDict()  # chave -> (valor, tags)
+        self._keys_by_tag = {}         # tag -> chaves que dependem dela
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        """Contador incrementado a cada invalidação.
+
+        Leia antes de carregar um valor e passe para ``put``: se houve
+        uma escrita no meio do caminho, o valor (possivelmente velho)
+        não é guardado.
+        """
+        return self._generation
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Retorna o valor da chave, marcando-o como usado recentemente."""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, tags: Iterable[str] = (),
+            generation: int = None):
+        """Guarda um valor, descartando o menos usado se o cache estiver cheio."""
+        tags = frozenset(tags)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+
+            if key in self._entries:
+                self._discard(key)
+            self._entries[key] = (value, tags)
+            for tag in tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self.evictions += 1
+
+    def invalidate(self, *tags: str):
+        """Descarta todas as entradas marcadas com qualquer uma das tags."""
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                for key in self._keys_by_tag.pop(tag, ()):
+                    if key in self._entries:
+                        self._discard(key)
+
+    def clear(self):
+        """Esvazia o cache (os contadores são mantidos)."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._keys_by_tag.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Tamanho atual e contadores de acertos, falhas e descartes."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+    def _discard(self, key: Hashable):
+        """Remove uma entrada e suas referências nas tags (com o lock)."""
+        _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,165 @@
+# app/services/exporter.py
+import csv
+import gzip
+import os
+from typing import Callable, Optional, Tuple
+
+FORMATS = ('csv', 'jsonl')
+
+# Coluna exportada -> expressão no SELECT
+FIELDS = (
+    ('id', 'm.id'),
+    ('media_type', 'm.media_type'),
+    ('title', 'm.title'),
+    ('year', 'm.year'),
+    ('genres', 'm.genres'),
+    ('rating', 'm.rating'),
+    ('comment', 'm.comment'),
+    ('status', 'm.status'),
+    ('created_at', 'm.created_at'),
+    ('duration', 'mv.duration'),
+    ('director', 'mv.director'),
+    ('watched_date', 'mv.watched_date'),
+    ('total_seasons', 's.total_seasons'),
+    ('total_episodes', 's.total_episodes'),
+    ('current_season', 's.current_season'),
+    ('current_episode', 's.current_episode'),
+    ('episode_duration', 's.episode_duration'),
+)
+
+COLUMNS = tuple(name for name, _ in FIELDS)
+
+EXPORT_FROM = '''
+    FROM media m
+    LEFT JOIN movies mv ON m.id = mv.media_id
+    LEFT JOIN series s ON m.id = s.media_id
+'''
+
+# CSV: uma tupla por linha, escrita pelo módulo csv
+CSV_QUERY = "SELECT " + ", ".join(expr for _, expr in FIELDS) + EXPORT_FROM
+
+# JSON Lines: o próprio SQLite monta o objeto de cada linha com
+# json_object(), evitando um dict e um json.dumps por linha no Python
+JSONL_QUERY = ("SELECT json_object("
+               + ", ".join(f"'{name}', {expr}" for name, expr in FIELDS)
+               + ")" + EXPORT_FROM)
+
+class ExportCancelled(Exception):
+    """A exportação foi cancelada antes do fim; nenhum arquivo foi criado."""
+
+def detect_format(path: str):
+    """Formato e compressão pelo nome do arquivo.
+
+    ``.jsonl``/``.ndjson`` viram JSON Lines, o resto CSV; ``.gz`` no
+    final liga a compressão gzip. Retorna ``(formato, gzip)``.
+    """
+    name = path.lower()
+    compress = name.endswith('.gz')
+    if compress:
+        name = name[:-3]
+    fmt = 'jsonl' if name.endswith(('.jsonl', '.ndjson')) else 'csv'
+    return fmt, compress
+
+def build_query(fmt: str, media_type: Optional[str] = None,
+                id_range: Optional[Tuple[int, int]] = None) -> Tuple[str, tuple]:
+    """SELECT da exportação, opcionalmente restrito a um tipo e a ids em ``[início, fim)``."""
+    query = CSV_QUERY if fmt == 'csv' else JSONL_QUERY
+    conditions, params = [], []
+    if media_type:
+        conditions.append("m.media_type = ?")
+        params.append(media_type)
+    if id_range is not None:
+        conditions.append("m.id >= ? AND m.id < ?")
+        params.extend(id_range)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    return query + " ORDER BY m.id", tuple(params)
+
+def open_output(path: str, compress: bool):
+    """Arquivo de texto para as linhas exportadas (gzip se ``compress``)."""
+    if compress:
+        return gzip.open(path, 'wt', encoding='utf-8', newline='', compresslevel=6)
+    return open(path, 'w', encoding='utf-8', newline='')
+
+def write_rows(db, out, fmt: str, query: str, params: tuple, chunk_size: int,
+               after_chunk: Optional[Callable[[int], None]] = None) -> int:
+    """Escreve as linhas de ``query`` em ``out`` (sem o cabeçalho do CSV).
+
+    Chama ``after_chunk(linhas_até_agora)`` a cada bloco; ela pode
+    interromper a escrita levantando ``ExportCancelled``.
+    """
+    if fmt == 'csv':
+        write = csv.writer(out).writerows
+    else:
+        def write(rows):
+            out.writelines(line + '\n' for (line,) in rows)
+
+    count = 0
+    cursor = db.get_connection().cursor()
+    try:
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            write(rows)
+            count += len(rows)
+            if after_chunk is not None:
+                after_chunk(count)
+    finally:
+        cursor.close()
+    return count
+
+def resolve_format(path: str, fmt: Optional[str], compress: Optional[bool]):
+    """Formato e compressão pedidos, ou os deduzidos do nome do arquivo."""
+    detected_fmt, detected_compress = detect_format(path)
+    fmt = fmt or detected_fmt
+    compress = detected_compress if compress is None else compress
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato inválido: {fmt} (use {', '.join(FORMATS)})")
+    return fmt, compress
+
+def export_media(db, path: str, fmt: Optional[str] = None,
+                 compress: Optional[bool] = None,
+                 media_type: Optional[str] = None,
+                 total: Optional[int] = None,
+                 progress: Optional[Callable[[int, Optional[int]], None]] = None,
+                 cancelled: Optional[Callable[[], bool]] = None,
+                 chunk_size: int = 5000) -> int:
+    """Exporta as mídias para ``path`` em CSV ou JSON Lines.
+
+    As linhas saem do cursor em blocos de ``chunk_size`` direto para o
+    arquivo, então a memória não cresce com o acervo. ``fmt`` e
+    ``compress`` omitidos seguem o nome do arquivo (``detect_format``).
+
+    A cada bloco chama ``progress(exportadas, total)`` e consulta
+    ``cancelled()``; se ela retornar verdadeiro, levanta
+    ``ExportCancelled``. O arquivo é escrito em ``path + '.part'`` e só
+    toma o lugar do destino no fim, então nunca fica pela metade.
+    Retorna a quantidade de linhas exportadas.
+    """
+    fmt, compress = resolve_format(path, fmt, compress)
+    query, params = build_query(fmt, media_type)
+
+    def after_chunk(count):
+        if progress is not None:
+            progress(count, total)
+        if cancelled is not None and cancelled():
+            raise ExportCancelled()
+
+    if cancelled is not None and cancelled():
+        raise ExportCancelled()
+
+    temp_path = path + '.part'
+    try:
+        with open_output(temp_path, compress) as out:
+            if fmt == 'csv':
+                csv.writer(out).writerow(COLUMNS)
+            count = write_rows(db, out, fmt, query, params, chunk_size, after_chunk)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+    return count
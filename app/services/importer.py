@@ -0,0 +1,74 @@
+# app/services/importer.py
+import csv
+import gzip
+import json
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from app.models.media import MediaStatus, Movie, Series, _parse_datetime, split_genres
+from app.services.exporter import detect_format
+
+def _open_input(path: str, compress: bool):
+    if compress:
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, encoding='utf-8', newline='')
+
+def read_records(path: str, fmt: Optional[str] = None,
+                 on_error: Optional[Callable[[int, str], None]] = None
+                 ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Lê um arquivo no formato da exportação (CSV ou JSON Lines, com ou sem gzip).
+
+    Entrega ``(linha, registro)`` sob demanda, com a linha do arquivo
+    onde o registro começa (no CSV, o cabeçalho é a linha 1); no CSV,
+    campos vazios viram ``None``. O formato segue a extensão quando
+    ``fmt`` é omitido. Uma linha que não é JSON válido levanta
+    ``ValueError``; com ``on_error(linha, mensagem)`` ela é informada
+    e pulada, e a leitura continua.
+    """
+    detected_fmt, compress = detect_format(path)
+    fmt = fmt or detected_fmt
+    with _open_input(path, compress) as f:
+        if fmt == 'csv':
+            reader = csv.DictReader(f)
+            start = 2
+            for row in reader:
+                yield start, {key: (value if value != '' else None) for key, value in row.items()}
+                start = reader.line_num + 1
+        else:
+            for number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    if on_error is None:
+                        raise ValueError(f"Linha {number} não é um JSON válido: {e}") from e
+                    on_error(number, f"JSON inválido: {e}")
+                    continue
+                yield number, record
+
+def _int(value) -> Optional[int]:
+    return int(float(value)) if value not in (None, '') else None
+
+def media_from_record(record: Dict[str, Any]):
+    """Cria o ``Movie``/``Series`` de uma linha exportada (o id é ignorado)."""
+    title = (record.get('title') or '').strip()
+    year = _int(record.get('year')) or 0  # Sem ano: recusado por validate()
+    genres = split_genres(record.get('genres') or '')
+
+    if record.get('media_type') == 'series':
+        media = Series(title, year, genres,
+                       _int(record.get('total_seasons')) or 1,
+                       _int(record.get('total_episodes')) or 1,
+                       _int(record.get('episode_duration')))
+        media.current_season = _int(record.get('current_season')) or 1
+        media.current_episode = _int(record.get('current_episode')) or 1
+    else:
+        media = Movie(title, year, genres, _int(record.get('duration')) or 0,
+                      record.get('director') or None)
+        media.watched_date = _parse_datetime(record.get('watched_date'))
+
+    media.rating = float(record.get('rating') or 0)
+    media.comment = record.get('comment') or ""
+    if record.get('status'):
+        media.status = MediaStatus(record['status'])
+    return media
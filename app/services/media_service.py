@@ -1,48 +1,265 @@
 # app/services/media_service.py
-from typing import List, Dict, Any
-from app.models.media import Movie, Series, MediaStatus
+import base64
+import json
+import re
+import sqlite3
+import threading
+import unicodedata
+from datetime import datetime
+from itertools import count, islice
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+from app.models.media import Media, Movie, Series, MediaStatus, split_genres
 from app.database.db import Database
+from app.database.migrations import rebuild_media_stats
+from app.services import exporter
+from app.services.cache import LRUCache
+from app.services.query import (MediaQuery, fold_text, fts_prefix_query,
+                                fts_substring_query, fts_typo_query,
+                                trigram_similarity, trigrams)
+from app.services.watch_log import WatchLog
+
+_NOT_CACHED = object()
 
 class MediaService:
     """Serviço para gerenciar operações com mídias."""
     
-    def __init__(self, db: Database):
+    MEDIA_INSERT = '''
+        INSERT INTO media (title, year, genres, rating, comment, status, media_type)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    '''
+    
+    MOVIE_INSERT = '''
+        INSERT INTO movies (media_id, duration, director, watched_date)
+        VALUES (?, ?, ?, ?)
+    '''
+    
+    SERIES_INSERT = '''
+        INSERT INTO series (media_id, total_seasons, total_episodes, 
+                          current_season, current_episode, episode_duration)
+        VALUES (?, ?, ?, ?, ?, ?)
+    '''
+    
+    GENRE_INSERT = "INSERT OR IGNORE INTO genres (name) VALUES (?)"
+    
+    MEDIA_GENRE_INSERT = '''
+        INSERT OR IGNORE INTO media_genres (genre_id, media_id) VALUES (?, ?)
+    '''
+    
+    # Mídias com os campos de filme e de série (NULL quando não se aplicam)
+    MEDIA_SELECT = MediaQuery.SELECTS[None]
+    MOVIE_SELECT = MediaQuery.SELECTS['movie']
+    SERIES_SELECT = MediaQuery.SELECTS['series']
+    
+    # Chaves de ordenação aceitas na paginação
+    PAGE_ORDERS = MediaQuery.ORDERS
+    
+    PAGE_SIZE = 50
+    
+    BULK_CHUNK_SIZE = 1000
+    
+    # Linhas por INSERT com vários VALUES na importação em lote
+    MULTI_ROW_BATCH = 500
+    
+    # Pesos do bm25 por coluna do media_fts: título, diretor, gêneros, comentário
+    SEARCH_WEIGHTS = (10.0, 4.0, 2.0, 1.0)
+    
+    # Busca aproximada: candidatos lidos do índice por etapa e cobertura
+    # mínima dos trigramas do termo para entrar no resultado
+    FUZZY_CANDIDATES = 200
+    FUZZY_MIN_SIMILARITY = 0.3
+    
+    CACHE_SIZE = 256
+    
+    # Eventos de episódio assistido guardados antes de gravar o lote
+    WATCH_BATCH_SIZE = 100
+    
+    # Abaixo disso, subir os processos das leituras pesadas custa mais do
+    # que ler em um só (veja ``app.services.parallel``)
+    PARALLEL_MIN_ROWS = 200_000
+    
+    def __init__(self, db: Database, cache_size: Optional[int] = CACHE_SIZE,
+                 watch_batch_size: int = WATCH_BATCH_SIZE,
+                 parallel_workers: Optional[int] = None):
+        """``cache_size`` = 0 ou ``None`` desliga o cache de leituras.
+        
+        ``parallel_workers`` é o número de processos das leituras pesadas
+        em acervos grandes (padrão: um por núcleo; 1 desliga).
+        """
         self.db = db
+        self.cache = LRUCache(cache_size) if cache_size else None
+        self._seen_version = threading.local()  # (conexão, data_version, escritas) por thread
+        self._write_count = count(1)
+        self._own_writes = 0  # Escritas do próprio serviço (veja ``refresh_cache``)
+        self.watch_log = WatchLog(db, watch_batch_size)
+        self.parallel_workers = parallel_workers
+    
+    def _cached(self, key: tuple, tags: Iterable[str], loader):
+        """Lê do cache ou carrega com ``loader`` e guarda o resultado.
+        
+        As tags dizem de quais dados o valor depende (``'movie'``,
+        ``'series'``, ``'stats'``, ``'item:<id>'``); as escritas do serviço
+        invalidam só as tags que afetam. Valores devolvidos pelo cache são
+        compartilhados: não devem ser alterados por quem os recebe.
+        """
+        if self.cache is None:
+            return loader()
+        
+        self.refresh_cache()
+        value = self.cache.get(key, _NOT_CACHED)
+        if value is _NOT_CACHED:
+            generation = self.cache.generation
+            value = loader()
+            self.cache.put(key, value, tags, generation)
+        return value
+    
+    def refresh_cache(self):
+        """Esvazia o cache se o banco foi alterado por outra conexão.
+        
+        Escritas de outro processo (um comando do CLI, uma importação
+        agendada, outra janela, o servidor HTTP) não passam por
+        ``_invalidate``. ``PRAGMA data_version`` muda quando outra conexão
+        grava no arquivo; o valor só é comparável dentro de uma mesma
+        conexão, então cada thread guarda o seu. Na primeira leitura de
+        uma conexão não há como saber o que mudou antes: o cache é
+        esvaziado por segurança.
+        
+        As escritas do próprio serviço feitas em outra thread (outra
+        conexão) também mudam o ``data_version``, mas já invalidaram só
+        as tags que afetam: se houve escrita do serviço desde a última
+        conferência da thread, a mudança é atribuída a ela e o cache
+        fica. A conexão que escreve confere antes (em ``_invalidate``),
+        e lá as próprias escritas não contam. Uma escrita de fora que
+        caia entre uma escrita do serviço e a próxima leitura de outra
+        thread só é notada na mudança seguinte.
+        """
+        if self.cache is None:
+            return
+        conn = self.db.get_connection()
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        own_writes = self._own_writes
+        seen = getattr(self._seen_version, 'value', None)
+        if seen is not None and seen[0] is conn and seen[1] == version:
+            return
+        self._seen_version.value = (conn, version, own_writes)
+        if seen is None or seen[0] is not conn:
+            if seen is not None or len(self.cache):
+                self.cache.clear()
+        elif seen[2] == own_writes:
+            self.cache.clear()
+    
+    def _invalidate(self, *tags: str):
+        """Descarta do cache as leituras que dependem das tags.
+        
+        Chamado depois de cada escrita do serviço, que fica registrada
+        para ``refresh_cache`` não esvaziar o cache por causa dela.
+        """
+        if self.cache is not None:
+            self.refresh_cache()
+            self._own_writes = next(self._write_count)
+            # A escrita não muda o data_version da própria conexão: a thread
+            # já a viu, e a próxima mudança só pode vir de outra conexão
+            conn, version, _ = self._seen_version.value
+            self._seen_version.value = (conn, version, self._own_writes)
+            self.cache.invalidate(*tags)
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Acertos, falhas e tamanho do cache (vazio se desligado)."""
+        return self.cache.stats() if self.cache is not None else {}
+    
+    def unit_of_work(self):
+        """Agrupa várias operações do serviço em uma única transação.
+
+        Todas as escritas feitas dentro do bloco compartilham a mesma
+        conexão e um único commit. Blocos aninhados (inclusive os usados
+        internamente por ``add_movie``/``add_series``) viram SAVEPOINTs.
+
+            with service.unit_of_work():
+                service.add_movie(movie)
+                service.add_series(series)
+        """
+        return self.db.transaction()
+    
+    @staticmethod
+    def _media_params(media, media_type: str) -> tuple:
+        """Parâmetros da tabela media para um filme ou série."""
+        return (
+            media.title,
+            media.year,
+            ', '.join(media.genres),
+            media.rating,
+            media.comment,
+            media.status.value,
+            media_type
+        )
+    
+    @staticmethod
+    def _movie_params(movie_id: int, movie: Movie) -> tuple:
+        """Parâmetros da tabela movies."""
+        return (
+            movie_id,
+            movie.duration,
+            movie.director,
+            movie.watched_date.isoformat() if movie.watched_date else None
+        )
+    
+    @staticmethod
+    def _series_params(series_id: int, series: Series) -> tuple:
+        """Parâmetros da tabela series."""
+        return (
+            series_id,
+            series.total_seasons,
+            series.total_episodes,
+            series.current_season,
+            series.current_episode,
+            series.episode_duration
+        )
+    
+    def _insert_media(self, media, media_type: str) -> int:
+        """Insere a parte comum na tabela media e retorna o id gerado."""
+        cursor = self.db.execute_query(self.MEDIA_INSERT,
+                                       self._media_params(media, media_type))
+        self._link_genres(cursor.connection, [(cursor.lastrowid, media.genres)])
+        return cursor.lastrowid
+    
+    def _link_genres(self, conn, items: List[Tuple[int, List[str]]]):
+        """Liga cada mídia aos seus gêneros em genres/media_genres."""
+        links = [
+            (media_id, name)
+            for media_id, genres in items
+            for name in split_genres(', '.join(genres))
+        ]
+        if not links:
+            return
+        
+        # Resolve cada nome uma única vez por bloco
+        names = list({name.lower(): name for _, name in links}.values())
+        conn.executemany(self.GENRE_INSERT, [(name,) for name in names])
+        
+        genre_ids = {}
+        for start in range(0, len(names), 500):
+            batch = names[start:start + 500]
+            placeholders = ', '.join('?' for _ in batch)
+            rows = conn.execute(
+                f"SELECT id, name FROM genres WHERE name IN ({placeholders})", batch
+            )
+            genre_ids.update((name.lower(), genre_id) for genre_id, name in rows)
+        
+        conn.executemany(self.MEDIA_GENRE_INSERT, [
+            (genre_ids[name.lower()], media_id) for media_id, name in links
+        ])
     
     def add_movie(self, movie: Movie) -> bool:
         """Adiciona um filme ao banco."""
         try:
-            # Primeiro insere na tabela media
-            query = '''
-                INSERT INTO media (title, year, genres, rating, comment, status, media_type)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            '''
-            params = (
-                movie.title,
-                movie.year,
-                ', '.join(movie.genres),
-                movie.rating,
-                movie.comment,
-                movie.status.value,
-                'movie'
-            )
-            
-            cursor = self.db.execute_query(query, params)
-            movie_id = cursor.lastrowid
-            
-            # Depois insere na tabela movies
-            query = '''
-                INSERT INTO movies (media_id, duration, director, watched_date)
-                VALUES (?, ?, ?, ?)
-            '''
-            params = (
-                movie_id,
-                movie.duration,
-                movie.director,
-                movie.watched_date.isoformat() if movie.watched_date else None
-            )
-            
-            self.db.execute_query(query, params)
+            with self.unit_of_work():
+                # Primeiro insere na tabela media
+                movie_id = self._insert_media(movie, 'movie')
+                
+                # Depois insere na tabela movies
+                self.db.execute_query(self.MOVIE_INSERT,
+                                      self._movie_params(movie_id, movie))
+            movie.id = movie_id
+            self._invalidate('movie', 'stats')
             return True
             
         except Exception as e:
@@ -52,128 +269,661 @@ class MediaService:
     def add_series(self, series: Series) -> bool:
         """Adiciona uma série ao banco."""
         try:
-            # Primeiro insere na tabela media
-            query = '''
-                INSERT INTO media (title, year, genres, rating, comment, status, media_type)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            '''
-            params = (
-                series.title,
-                series.year,
-                ', '.join(series.genres),
-                series.rating,
-                series.comment,
-                series.status.value,
-                'series'
-            )
+            with self.unit_of_work():
+                # Primeiro insere na tabela media
+                series_id = self._insert_media(series, 'series')
+                
+                # Depois insere na tabela series
+                self.db.execute_query(self.SERIES_INSERT,
+                                      self._series_params(series_id, series))
+            series.id = series_id
+            self._invalidate('series', 'stats')
+            return True
+            
+        except Exception as e:
+            print(f"❌ Erro ao adicionar série: {e}")
+            return False
+    
+    def add_movies_bulk(self, movies: Iterable[Movie],
+                        chunk_size: int = BULK_CHUNK_SIZE) -> Dict[str, Any]:
+        """Importa muitos filmes de uma vez.
+        
+        Aceita qualquer iterável (inclusive geradores) e grava em blocos
+        de ``chunk_size`` itens, cada bloco em uma única transação com
+        ``executemany``. Itens inválidos não interrompem a importação:
+        são devolvidos em ``errors`` como ``(posição, mensagem)``.
+        """
+        return self._add_bulk(movies, 'movie', self.MOVIE_INSERT,
+                              self._movie_params, chunk_size)
+    
+    def add_series_bulk(self, series_list: Iterable[Series],
+                        chunk_size: int = BULK_CHUNK_SIZE) -> Dict[str, Any]:
+        """Importa muitas séries de uma vez (veja ``add_movies_bulk``)."""
+        return self._add_bulk(series_list, 'series', self.SERIES_INSERT,
+                              self._series_params, chunk_size)
+    
+    def _add_bulk(self, items: Iterable, media_type: str, subtype_insert: str,
+                  subtype_params, chunk_size: int) -> Dict[str, Any]:
+        """Validação e gravação em blocos comum aos dois tipos de mídia."""
+        if chunk_size < 1:
+            raise ValueError("chunk_size deve ser ≥ 1")
+        
+        inserted = 0
+        errors: List[Tuple[int, str]] = []
+        numbered = enumerate(items)
+        
+        while True:
+            chunk = list(islice(numbered, chunk_size))
+            if not chunk:
+                break
+            
+            # Validar e preparar parâmetros fora da transação
+            valid = []
+            for index, media in chunk:
+                try:
+                    media.validate()
+                    valid.append((index, media, self._media_params(media, media_type)))
+                except Exception as e:
+                    errors.append((index, str(e)))
+            
+            if not valid:
+                continue
+            
+            try:
+                inserted += self._write_chunk(valid, subtype_insert, subtype_params)
+            except sqlite3.Error:
+                # Algum item do bloco foi rejeitado pelo banco: regrava um a um
+                # para isolar as linhas com problema
+                for index, media, params in valid:
+                    try:
+                        self._write_chunk([(index, media, params)],
+                                          subtype_insert, subtype_params)
+                        inserted += 1
+                    except sqlite3.Error as e:
+                        errors.append((index, str(e)))
+        
+        if inserted:
+            self._invalidate(media_type, 'stats')
+        
+        errors.sort()
+        return {'inserted': inserted, 'errors': errors}
+    
+    def _write_chunk(self, rows: list, subtype_insert: str, subtype_params) -> int:
+        """Grava um bloco já validado em uma única transação."""
+        with self.db.transaction() as conn:
+            self._insert_rows(conn, self.MEDIA_INSERT, [params for _, _, params in rows])
             
-            cursor = self.db.execute_query(query, params)
-            series_id = cursor.lastrowid
+            # Dentro da transação ninguém mais escreve e o AUTOINCREMENT
+            # gera ids consecutivos: o bloco ocupa [last - n + 1, last]
+            last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            first_id = last_id - len(rows) + 1
+            
+            self._insert_rows(conn, subtype_insert, [
+                subtype_params(first_id + offset, media)
+                for offset, (_, media, _) in enumerate(rows)
+            ])
+            self._link_genres(conn, [
+                (first_id + offset, media.genres)
+                for offset, (_, media, _) in enumerate(rows)
+            ])
+        return len(rows)
+    
+    def _insert_rows(self, conn, insert: str, rows: List[tuple]):
+        """``executemany`` de ``insert`` com até ``MULTI_ROW_BATCH`` linhas por comando.
+        
+        Os índices FTS5 gravam o que receberam a cada comando que dispara
+        os seus triggers; com uma linha por comando, cada mídia viraria
+        um segmento novo no índice, a ser fundido depois.
+        """
+        values = insert[insert.rindex('VALUES') + len('VALUES'):].strip()
+        for start in range(0, len(rows), self.MULTI_ROW_BATCH):
+            batch = rows[start:start + self.MULTI_ROW_BATCH]
+            conn.execute(insert.rstrip() + (', ' + values) * (len(batch) - 1),
+                         [value for row in batch for value in row])
+    
+    @staticmethod
+    def _model_factory():
+        """``row_factory`` que cria ``Movie``/``Series`` direto da tupla da linha.
+        
+        A posição de cada coluna sai de ``cursor.description`` na primeira
+        linha e vale para a consulta inteira; o tipo de cada linha segue a
+        coluna ``media_type``. Nenhum dict nem ``sqlite3.Row`` é criado
+        por linha. Crie uma fábrica por consulta.
+        """
+        columns = {}
+        
+        def factory(cursor, row):
+            if not columns:
+                columns.update((column[0], index)
+                               for index, column in enumerate(cursor.description))
+            model = Series if row[columns['media_type']] == 'series' else Movie
+            return model.from_row(row, columns)
+        return factory
+    
+    def _iter_models(self, query: str, params=(), chunk_size: int = 500) -> Iterator[Media]:
+        """Executa uma consulta de mídias e entrega os modelos sob demanda."""
+        return self.db.iter_rows(query, params, chunk_size=chunk_size,
+                                 row_factory=self._model_factory())
+    
+    def _fetch_models(self, query: str, params=()) -> List[Media]:
+        """Executa uma consulta de mídias e devolve a lista de ``Movie``/``Series``."""
+        return list(self._iter_models(query, params))
+    
+    def iter_movies(self, chunk_size: int = 500) -> Iterator[Movie]:
+        """Percorre todos os filmes, ordenados por título, sob demanda.
+        
+        Executa a consulta uma única vez e entrega objetos ``Movie``
+        lidos em blocos de ``chunk_size``, sem manter a lista completa
+        em memória.
+        """
+        return self._iter_models(self.MOVIE_SELECT + " ORDER BY m.title, m.id",
+                                 chunk_size=chunk_size)
+    
+    def iter_series(self, chunk_size: int = 500) -> Iterator[Series]:
+        """Percorre todas as séries, ordenadas por título, sob demanda."""
+        return self._iter_models(self.SERIES_SELECT + " ORDER BY m.title, m.id",
+                                 chunk_size=chunk_size)
+    
+    def get_all_movies(self) -> List[Movie]:
+        """Retorna todos os filmes."""
+        return list(self.iter_movies())
+    
+    def get_all_series(self) -> List[Series]:
+        """Retorna todas as séries."""
+        return list(self.iter_series())
+    
+    def list_movies_page(self, after: Optional[str] = None, limit: int = PAGE_SIZE,
+                         order_by: str = 'title', descending: bool = False) -> Dict[str, Any]:
+        """Retorna uma página de filmes (``Movie``) em ``items``.
+        
+        Usa paginação por chave (seek): a página seguinte começa depois
+        da última linha da anterior, sem OFFSET, então o custo de cada
+        página não cresce com a posição na lista. Passe o ``next`` de
+        uma página como ``after`` para obter a próxima; ``next`` é
+        ``None`` na última página.
+        """
+        key = ('page', 'movie', after, limit, order_by, descending)
+        return self._cached(key, ('movie',), lambda: self._list_page(
+            'movie', after, limit, order_by, descending))
+    
+    def list_series_page(self, after: Optional[str] = None, limit: int = PAGE_SIZE,
+                         order_by: str = 'title', descending: bool = False) -> Dict[str, Any]:
+        """Retorna uma página de séries (veja ``list_movies_page``)."""
+        key = ('page', 'series', after, limit, order_by, descending)
+        return self._cached(key, ('series',), lambda: self._list_page(
+            'series', after, limit, order_by, descending))
+    
+    def _list_page(self, media_type: str, after: Optional[str],
+                   limit: int, order_by: str, descending: bool) -> Dict[str, Any]:
+        """Paginação por chave comum a filmes e séries."""
+        query = MediaQuery(media_type).order_by(order_by, descending)
+        return self._find_page(query, after, limit)
+    
+    def find(self, query: MediaQuery) -> List[Media]:
+        """Retorna as mídias que atendem a ``query``, já filtradas no SQLite."""
+        sql, params = query.compile()
+        tags = (query.media_type,) if query.media_type else ('movie', 'series')
+        return self._cached(('find', sql, tuple(params)), tags,
+                            lambda: self._fetch_models(sql, params))
+    
+    def find_page(self, query: MediaQuery, after: Optional[str] = None,
+                  limit: int = PAGE_SIZE) -> Dict[str, Any]:
+        """Retorna uma página de ``query`` (veja ``list_movies_page``).
+        
+        O ``limit()`` da consulta é ignorado: cada página tem ``limit``
+        linhas. O cursor vale para a mesma consulta e ordenação.
+        """
+        sql, params = query.compile()
+        tags = (query.media_type,) if query.media_type else ('movie', 'series')
+        key = ('find_page', sql, tuple(params), after, limit)
+        return self._cached(key, tags, lambda: self._find_page(query, after, limit))
+    
+    def _find_page(self, query: MediaQuery, after: Optional[str],
+                   limit: int) -> Dict[str, Any]:
+        """Busca uma página de ``query`` (sem cache)."""
+        if limit < 1:
+            raise ValueError("limit deve ser ≥ 1")
+        
+        last = None
+        if after:
+            last = self._decode_cursor(after, query.order, query.descending)
+        
+        # Uma linha a mais indica se existe próxima página
+        sql, params = query.compile(after=last, limit=limit + 1)
+        items = self._fetch_models(sql, params)
+        
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            last_item = items[-1]
+            next_cursor = self._encode_cursor(query.order, query.descending,
+                                              getattr(last_item, query.order), last_item.id)
+        
+        return {'items': items, 'next': next_cursor}
+    
+    @staticmethod
+    def _encode_cursor(order_by: str, descending: bool, value, last_id: int) -> str:
+        """Gera o cursor opaco de continuação de uma página."""
+        payload = json.dumps([order_by, descending, value, last_id],
+                             separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+    
+    @staticmethod
+    def _decode_cursor(cursor: str, order_by: str, descending: bool) -> Tuple[Any, int]:
+        """Lê um cursor de ``_encode_cursor`` e confere a ordenação."""
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            cursor_order, cursor_desc, value, last_id = payload
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Cursor de paginação inválido: {e}") from e
+        
+        if cursor_order != order_by or cursor_desc != descending:
+            raise ValueError("Cursor gerado para outra ordenação")
+        return value, last_id
+    
+    def get_media(self, media_id: int) -> Optional[Media]:
+        """Retorna um filme ou série pelo id (``None`` se não existir)."""
+        def load():
+            rows = self._fetch_models(self.MEDIA_SELECT + " WHERE m.id = ?", (media_id,))
+            return rows[0] if rows else None
+        
+        return self._cached(('item', media_id), (f'item:{media_id}',), load)
+    
+    def update_movie_rating(self, media_id: int, rating: float,
+                            comment: Optional[str] = None) -> bool:
+        """Atualiza avaliação (e comentário, se informado) de um filme."""
+        return self._update_rating(media_id, 'movie', rating, comment)
+    
+    def update_series_rating(self, media_id: int, rating: float,
+                             comment: Optional[str] = None) -> bool:
+        """Atualiza avaliação (e comentário, se informado) de uma série."""
+        return self._update_rating(media_id, 'series', rating, comment)
+    
+    def _update_rating(self, media_id: int, media_type: str, rating: float,
+                       comment: Optional[str]) -> bool:
+        """Atualização de avaliação comum a filmes e séries."""
+        try:
+            if rating < 0 or rating > 5:
+                raise ValueError("Avaliação deve ser entre 0 e 5")
             
-            # Depois insere na tabela series
             query = '''
-                INSERT INTO series (media_id, total_seasons, total_episodes, 
-                                  current_season, current_episode, episode_duration)
-                VALUES (?, ?, ?, ?, ?, ?)
+                UPDATE media SET rating = ?, comment = COALESCE(?, comment)
+                WHERE id = ? AND media_type = ?
             '''
-            params = (
-                series_id,
-                series.total_seasons,
-                series.total_episodes,
-                series.current_season,
-                series.current_episode,
-                series.episode_duration
-            )
+            cursor = self.db.execute_query(query, (rating, comment, media_id, media_type))
+            if cursor.rowcount == 0:
+                return False
             
-            self.db.execute_query(query, params)
+            self._invalidate(media_type, 'stats', f'item:{media_id}')
             return True
             
         except Exception as e:
-            print(f"❌ Erro ao adicionar série: {e}")
+            print(f"❌ Erro ao avaliar: {e}")
             return False
     
-    def get_all_movies(self) -> List[Dict[str, Any]]:
-        """Retorna todos os filmes."""
-        query = '''
-            SELECT m.*, mv.duration, mv.director, mv.watched_date
-            FROM media m
-            JOIN movies mv ON m.id = mv.media_id
-            ORDER BY m.title
-        '''
+    def update_progress(self, media_id: int, season: int, episode: int) -> bool:
+        """Registra o episódio como assistido agora e grava na hora.
         
-        rows = self.db.fetch_all(query)
-        if not rows:
+        O progresso e o status da série são derivados do histórico
+        (veja ``record_watch``).
+        """
+        try:
+            row = self.db.fetch_one('''
+                SELECT m.title, m.year, s.total_seasons, s.total_episodes,
+                       s.episode_duration
+                FROM media m
+                JOIN series s ON m.id = s.media_id
+                WHERE m.id = ?
+            ''', (media_id,))
+            if row is None:
+                return False
+            
+            title, year, total_seasons, total_episodes, episode_duration = row
+            series = Series(title, year, [], total_seasons, total_episodes,
+                            episode_duration)
+            series.update_progress(season, episode)
+            if (series.current_season, series.current_episode) != (season, episode):
+                raise ValueError(f"Episódio fora da série: T{season}E{episode}")
+            
+            self.watch_log.append(media_id, season, episode)
+            result = self.flush_watch_events()
+            return not any(event[0] == media_id for event, _ in result['errors'])
+            
+        except Exception as e:
+            print(f"❌ Erro ao atualizar progresso: {e}")
+            return False
+    
+    def record_watch(self, media_id: int, season: int, episode: int,
+                     watched_at: Optional[datetime] = None):
+        """Registra que um episódio foi assistido (agora, se ``watched_at`` for omitido).
+        
+        O evento fica no buffer e é gravado em lote com os demais a cada
+        ``WATCH_BATCH_SIZE`` eventos, em ``flush_watch_events`` ou antes
+        das consultas de histórico. Ao ser gravado, o evento mais recente
+        de cada série define ``current_season``/``current_episode`` e o
+        status (Concluído no último episódio, Assistindo nos demais).
+        """
+        if self.watch_log.append(media_id, season, episode, watched_at):
+            self.flush_watch_events()
+    
+    def flush_watch_events(self) -> Dict[str, Any]:
+        """Grava os eventos pendentes em uma única transação.
+        
+        Retorna ``inserted`` e ``errors`` (eventos rejeitados, como
+        ``((media_id, temporada, episódio, horário), mensagem)``).
+        """
+        result = self.watch_log.flush()
+        if result['media_ids']:
+            self._invalidate('series', 'stats', 'watch',
+                             *(f'item:{media_id}' for media_id in result['media_ids']))
+        for event, message in result['errors']:
+            print(f"❌ Evento descartado {event}: {message}")
+        return {'inserted': result['inserted'], 'errors': result['errors']}
+    
+    def compact_watch_events(self, older_than_days: int = 90) -> Dict[str, int]:
+        """Resume em ``watch_daily`` os eventos com mais de ``older_than_days`` dias."""
+        self.flush_watch_events()
+        result = self.watch_log.compact(older_than_days)
+        self._invalidate('watch')
+        return result
+    
+    def get_recently_watched(self, days: int = 7) -> List[Dict[str, Any]]:
+        """Séries com episódios assistidos nos últimos ``days`` dias.
+        
+        Cada item traz ``episodes`` (assistidos na janela),
+        ``last_watched_at`` (UTC) e o episódio atual da série.
+        """
+        self.flush_watch_events()
+        return self._cached(('recent', days), ('watch', 'series'),
+                            lambda: self.watch_log.recently_watched(days))
+    
+    def get_watch_history(self, media_id: int,
+                          days: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Episódios assistidos de uma série por dia, do mais recente ao mais antigo."""
+        self.flush_watch_events()
+        return self._cached(('history', media_id, days), ('watch', f'item:{media_id}'),
+                            lambda: self.watch_log.daily_history(media_id, days))
+    
+    def delete_media(self, media_id: int) -> bool:
+        """Remove um filme ou série (e seus dados relacionados)."""
+        try:
+            with self.unit_of_work():
+                row = self.db.fetch_one("SELECT media_type FROM media WHERE id = ?",
+                                        (media_id,))
+                if row is None:
+                    return False
+                self.db.execute_query("DELETE FROM media WHERE id = ?", (media_id,))
+            
+            self._invalidate(row[0], 'stats', f'item:{media_id}')
+            return True
+            
+        except Exception as e:
+            print(f"❌ Erro ao remover: {e}")
+            return False
+    
+    @staticmethod
+    def _fts_query(term: str) -> str:
+        """Converte o texto digitado em uma expressão MATCH do FTS5."""
+        return fts_prefix_query(term)
+    
+    @staticmethod
+    def _search_words(text: str) -> List[str]:
+        """Palavras de ``text`` sem maiúsculas nem acentos, como no índice."""
+        decomposed = unicodedata.normalize('NFKD', text.casefold())
+        plain = ''.join(c for c in decomposed if not unicodedata.combining(c))
+        return re.findall(r'\w+', plain)
+    
+    @classmethod
+    def matches_search(cls, item: Media, term: str) -> bool:
+        """Indica se ``item`` (um resultado de ``search``) casa com ``term``.
+        
+        Reproduz em Python a regra do índice FTS5: cada palavra do termo
+        precisa ser prefixo de alguma palavra do título, diretor, gêneros
+        ou comentário. Permite refinar resultados já carregados sem
+        consultar o banco de novo.
+        """
+        words = cls._search_words(' '.join((
+            item.title, getattr(item, 'director', None) or '',
+            ', '.join(item.genres), item.comment or '',
+        )))
+        return all(any(word.startswith(token) for word in words)
+                   for token in cls._search_words(term))
+    
+    def search(self, term: str, limit: int = 50,
+               media_type: Optional[str] = None) -> List[Media]:
+        """Busca mídias por título, diretor, gêneros e comentário.
+        
+        Usa o índice FTS5 e ordena por relevância (bm25). ``media_type``
+        restringe a busca a ``'movie'`` ou ``'series'``.
+        """
+        match = self._fts_query(term)
+        if not match:
             return []
         
-        # Obter nomes das colunas
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute(query)
-        columns = [desc[0] for desc in cursor.description]
-        conn.close()
+        key = ('search', match, limit, media_type)
+        return self._cached(key, ('movie', 'series'),
+                            lambda: self._search(match, limit, media_type))
+    
+    def _search(self, match: str, limit: int,
+                media_type: Optional[str]) -> List[Media]:
+        """Executa a busca FTS5 de ``search`` (sem cache)."""
+        weights = ', '.join(str(w) for w in self.SEARCH_WEIGHTS)
+        query = self.MEDIA_SELECT + '''
+            JOIN media_fts ON media_fts.rowid = m.id
+            WHERE media_fts MATCH ?
+        '''
+        params: list = [match]
+        
+        if media_type:
+            query += " AND m.media_type = ?"
+            params.append(media_type)
         
-        movies = []
-        for row in rows:
-            movies.append(dict(zip(columns, row)))
+        query += f" ORDER BY bm25(media_fts, {weights}) LIMIT ?"
+        params.append(limit)
         
-        return movies
+        return self._fetch_models(query, params)
     
-    def get_all_series(self) -> List[Dict[str, Any]]:
-        """Retorna todas as séries."""
-        query = '''
-            SELECT m.*, s.total_seasons, s.total_episodes, 
-                   s.current_season, s.current_episode, s.episode_duration
-            FROM media m
-            JOIN series s ON m.id = s.media_id
-            ORDER BY m.title
+    def fuzzy_search(self, term: str, limit: int = 20,
+                     media_type: Optional[str] = None) -> List[Media]:
+        """Busca mídias por trecho do título ou do diretor, tolerando erros de digitação.
+        
+        Os candidatos saem do índice de trigramas (``media_trigram``):
+        primeiro as mídias que contêm o termo inteiro e, se não bastarem,
+        as que contêm quase todos os pedaços dele. São ordenados pela
+        fração dos trigramas do termo encontrada no título ou no diretor
+        (1,0 quando o termo aparece inteiro; veja ``trigram_similarity``).
+        Termos com menos de três caracteres não têm trigramas e usam a
+        busca por prefixo de ``search``.
+        """
+        grams = trigrams(term)
+        if not grams:
+            return self.search(term, limit, media_type)
+        
+        key = ('fuzzy', fold_text(term), limit, media_type)
+        return self._cached(key, ('movie', 'series'),
+                            lambda: self._fuzzy_search(term, grams, limit, media_type))
+    
+    def _fuzzy_search(self, term: str, grams: set, limit: int,
+                      media_type: Optional[str]) -> List[Media]:
+        """Executa a busca de ``fuzzy_search`` (sem cache)."""
+        query = self.MEDIA_SELECT + '''
+            JOIN media_trigram ON media_trigram.rowid = m.id
+            WHERE media_trigram MATCH ?
         '''
+        if media_type:
+            query += " AND m.media_type = ?"
+        query += " LIMIT ?"
         
-        rows = self.db.fetch_all(query)
-        if not rows:
+        candidates = {}
+        for match in (fts_substring_query(term), fts_typo_query(term)):
+            # Com o termo inteiro em ``limit`` mídias, nenhum erro de
+            # digitação passaria na frente delas
+            if len(candidates) >= limit or not match:
+                break
+            params = [match, media_type] if media_type else [match]
+            for item in self._iter_models(query, params + [self.FUZZY_CANDIDATES]):
+                candidates.setdefault(item.id, item)
+        
+        scored = []
+        for item in candidates.values():
+            similarity = max(trigram_similarity(grams, item.title),
+                             trigram_similarity(grams, getattr(item, 'director', None) or ''))
+            if similarity[0] >= self.FUZZY_MIN_SIMILARITY:
+                scored.append((similarity, item))
+        
+        scored.sort(key=lambda pair: (-pair[0][0], -pair[0][1], pair[1].title))
+        return [item for _, item in scored[:limit]]
+    
+    def get_media_by_genres(self, genres: List[str], match_all: bool = False,
+                            media_type: Optional[str] = None) -> List[Media]:
+        """Retorna as mídias de um ou mais gêneros.
+        
+        Com ``match_all=False`` basta ter qualquer um dos gêneros (OU);
+        com ``match_all=True`` a mídia precisa ter todos (E).
+        """
+        names = split_genres(', '.join(genres))
+        if not names:
             return []
         
-        # Obter nomes das colunas
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute(query)
-        columns = [desc[0] for desc in cursor.description]
-        conn.close()
+        key = ('genres', tuple(name.lower() for name in names), match_all, media_type)
+        return self._cached(key, ('movie', 'series'), lambda: self._media_by_genres(
+            names, match_all, media_type))
+    
+    def _media_by_genres(self, names: List[str], match_all: bool,
+                         media_type: Optional[str]) -> List[Media]:
+        """Consulta de ``get_media_by_genres`` (sem cache)."""
+        placeholders = ', '.join('?' for _ in names)
+        subquery = f'''
+            SELECT mg.media_id
+            FROM genres g
+            JOIN media_genres mg ON mg.genre_id = g.id
+            WHERE g.name IN ({placeholders})
+        '''
+        params: list = list(names)
+        
+        if match_all:
+            subquery += " GROUP BY mg.media_id HAVING COUNT(*) = ?"
+            params.append(len(names))
         
-        series_list = []
-        for row in rows:
-            series_list.append(dict(zip(columns, row)))
+        query = self.MEDIA_SELECT + f" WHERE m.id IN ({subquery})"
+        if media_type:
+            query += " AND m.media_type = ?"
+            params.append(media_type)
+        query += " ORDER BY m.title"
         
-        return series_list
+        return self._fetch_models(query, params)
+    
+    def get_genre_counts(self, media_type: Optional[str] = None) -> Dict[str, int]:
+        """Retorna quantas mídias existem por gênero, do maior para o menor."""
+        return self._cached(('genre_counts', media_type), ('movie', 'series'),
+                            lambda: self._genre_counts(media_type))
+    
+    def _genre_counts(self, media_type: Optional[str]) -> Dict[str, int]:
+        """Consulta agrupada de ``get_genre_counts`` (sem cache)."""
+        query = '''
+            SELECT g.name, COUNT(*) AS total
+            FROM media_genres mg
+            JOIN genres g ON g.id = mg.genre_id
+        '''
+        params: tuple = ()
+        
+        if media_type:
+            query += " JOIN media m ON m.id = mg.media_id WHERE m.media_type = ?"
+            params = (media_type,)
+        
+        query += " GROUP BY g.id ORDER BY total DESC, g.name"
+        return {name: total for name, total in self.db.fetch_all(query, params)}
     
     def get_statistics(self) -> Dict[str, Any]:
-        """Retorna estatísticas do sistema."""
-        stats = {}
-        
-        # Total de filmes
-        query = "SELECT COUNT(*) FROM media WHERE media_type = 'movie'"
-        result = self.db.fetch_one(query)
-        stats['movies'] = result[0] if result else 0
-        
-        # Total de séries
-        query = "SELECT COUNT(*) FROM media WHERE media_type = 'series'"
-        result = self.db.fetch_one(query)
-        stats['series'] = result[0] if result else 0
-        
-        # Status
-        stats['concluido'] = 0
-        stats['assistindo'] = 0
-        stats['planejado'] = 0
-        
-        query = "SELECT status, COUNT(*) FROM media GROUP BY status"
-        results = self.db.fetch_all(query)
-        for status, count in results:
-            if status == 'Concluído':
-                stats['concluido'] = count
-            elif status == 'Assistindo':
-                stats['assistindo'] = count
-            elif status == 'Planejado':
-                stats['planejado'] = count
-        
-        stats['total'] = stats['movies'] + stats['series']
-        
-        return stats
\ No newline at end of file
+        """Retorna estatísticas do sistema.
+        
+        Lê a linha única de ``media_stats``, mantida pelos triggers do
+        banco, então o custo não depende do tamanho do acervo.
+        """
+        return self._cached(('stats',), ('stats',), self._load_statistics)
+    
+    def _load_statistics(self) -> Dict[str, Any]:
+        """Lê ``media_stats`` (sem cache)."""
+        query = '''
+            SELECT movies, series, concluido, assistindo, planejado,
+                   rating_sum, rating_count, total_minutes
+            FROM media_stats WHERE id = 1
+        '''
+        row = self.db.fetch_one(query) or (0, 0, 0, 0, 0, 0, 0, 0)
+        movies, series, concluido, assistindo, planejado, rating_sum, rating_count, minutes = row
+        
+        return {
+            'movies': movies,
+            'series': series,
+            'concluido': concluido,
+            'assistindo': assistindo,
+            'planejado': planejado,
+            'total': movies + series,
+            'average_rating': round(rating_sum / rating_count, 2) if rating_count else 0,
+            'rated': rating_count,
+            'total_minutes': minutes,
+        }
+    
+    def get_detailed_statistics(self) -> Dict[str, Any]:
+        """Retorna estatísticas detalhadas do acervo.
+        
+        Tempo assistido e restante, distribuição e mediana das notas,
+        contagens, notas médias e taxas de conclusão por ano, década e
+        gênero. Calculadas com NumPy sobre as colunas lidas uma única
+        vez do banco (veja ``app.services.analytics``); em acervos
+        grandes a leitura é dividida entre processos.
+        """
+        return self._cached(('detailed_stats',), ('stats',), self._detailed_statistics)
+    
+    def _parallel_workers(self, rows: int) -> int:
+        """Processos para ler ``rows`` linhas do acervo (1 = leitura serial).
+        
+        ``parallel`` (NumPy, multiprocessing) só é importado quando
+        ``rows`` chega a ``PARALLEL_MIN_ROWS``: a exportação de um acervo
+        pequeno não paga essa importação na partida.
+        """
+        if self.parallel_workers == 1 or rows < self.PARALLEL_MIN_ROWS:
+            return 1
+        
+        from app.services import parallel
+        return self.parallel_workers or parallel.default_workers()
+    
+    def _detailed_statistics(self) -> Dict[str, Any]:
+        from app.services import analytics
+        
+        workers = self._parallel_workers(self.get_statistics()['total'])
+        if workers > 1:
+            from app.services import parallel
+            return parallel.detailed_statistics(self.db, workers)
+        return analytics.detailed_statistics(self.db)
+    
+    def export(self, path: str, fmt: Optional[str] = None,
+               compress: Optional[bool] = None, media_type: Optional[str] = None,
+               progress=None, cancelled=None) -> int:
+        """Exporta o acervo (ou só ``media_type``) para CSV ou JSON Lines.
+        
+        Grava direto do cursor, com memória constante; o formato e o gzip
+        seguem a extensão (``.csv``, ``.jsonl``, ``.gz``) quando omitidos.
+        Veja ``app.services.exporter.export_media`` para ``progress`` e
+        ``cancelled``. Em acervos grandes os intervalos de id são
+        escritos em paralelo (``app.services.parallel``). Retorna a
+        quantidade de linhas exportadas.
+        """
+        self.flush_watch_events()
+        stats = self.get_statistics()
+        total = stats[{'movie': 'movies', 'series': 'series'}.get(media_type, 'total')]
+        workers = self._parallel_workers(total)
+        if workers > 1:
+            from app.services import parallel
+            return parallel.export_media(self.db, path, fmt, compress, media_type,
+                                         total=total, progress=progress,
+                                         cancelled=cancelled, workers=workers)
+        return exporter.export_media(self.db, path, fmt, compress, media_type,
+                                     total=total, progress=progress, cancelled=cancelled)
+    
+    def rebuild_statistics(self) -> Dict[str, Any]:
+        """Recalcula as estatísticas agregadas a partir dos dados (reparo)."""
+        with self.db.transaction() as conn:
+            rebuild_media_stats(conn.cursor())
+        self._invalidate('stats')
+        return self.get_statistics()
@@ -0,0 +1,227 @@
+# app/services/parallel.py
+"""Leituras pesadas em paralelo, em um pool de processos.
+
+O acervo é dividido em intervalos de ``media.id`` e cada intervalo é
+lido por um processo do pool com a sua própria conexão somente
+leitura (URI ``file:...?mode=ro``). O processo pai junta os resultados:
+as colunas das estatísticas são concatenadas antes do cálculo e os
+pedaços da exportação são emendados em ordem no arquivo final.
+
+Os intervalos vão até o ``MAX(id)`` lido pelo pai antes de começar:
+mídias inseridas depois (o AUTOINCREMENT nunca reaproveita ids) ficam
+de fora de todos eles. Cada processo lê o seu intervalo em uma
+transação de leitura própria, então cada intervalo é coerente; mas os
+snapshots são de momentos diferentes, e uma alteração ou remoção feita
+por outra conexão durante a leitura pode aparecer em alguns intervalos
+e não em outros, desviando um pouco os totais.
+
+Os processos são criados com ``forkserver`` (ou ``spawn``, onde não
+existe), nunca com ``fork``: o app tem threads com conexões abertas.
+Por isso os scripts de entrada precisam do ``if __name__ == "__main__"``.
+"""
+import csv
+import io
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.services import analytics, exporter
+from app.services.exporter import ExportCancelled
+
+# Intervalos por processo: pedaços menores equilibram melhor a carga
+# e deixam o progresso da exportação mais fluido
+PARTS_PER_WORKER = 4
+
+POLL_SECONDS = 0.1
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def _context():
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+    if context.get_start_method() == 'forkserver':
+        # O servidor já carrega este módulo (e o NumPy); cada processo
+        # do pool nasce com eles importados
+        context.set_forkserver_preload([__name__])
+    return context
+
+
+def id_ranges(db, parts: int) -> List[Tuple[int, int]]:
+    """Divide ``media.id`` em até ``parts`` intervalos ``[início, fim)`` de mesmo tamanho.
+
+    O último intervalo termina no ``MAX(id)`` atual: fixa o fim da leitura
+    para todos os processos.
+    """
+    low, high = db.fetch_one("SELECT MIN(id), MAX(id) FROM media")
+    if low is None:
+        return []
+    step = max(1, -(-(high - low + 1) // parts))
+    return [(start, min(start + step, high + 1)) for start in range(low, high + 1, step)]
+
+
+class ReadOnlyDatabase:
+    """Conexão somente leitura de um processo do pool.
+
+    Oferece o pouco da interface do ``Database`` que as leituras usam
+    (``get_connection``/``fetch_all``/``fetch_one``), sem migrações.
+    """
+
+    def __init__(self, db_path: str):
+        uri = Path(os.path.abspath(db_path)).as_uri() + '?mode=ro'
+        self.conn = sqlite3.connect(uri, uri=True, isolation_level=None)
+        self.conn.execute("PRAGMA query_only = ON")
+        self.conn.execute("PRAGMA cache_size = -65536")
+        self.conn.execute("PRAGMA mmap_size = 268435456")
+        self.conn.execute("PRAGMA temp_store = MEMORY")
+
+    def get_connection(self):
+        return self.conn
+
+    def fetch_all(self, query: str, params: tuple = ()):
+        return self.conn.execute(query, params).fetchall()
+
+    def fetch_one(self, query: str, params: tuple = ()):
+        return self.conn.execute(query, params).fetchone()
+
+
+# Estado de cada processo do pool, preenchido por _init_worker
+_worker_db: Optional[ReadOnlyDatabase] = None
+_worker_stop = None
+
+
+def _init_worker(db_path: str, stop):
+    global _worker_db, _worker_stop
+    _worker_db = ReadOnlyDatabase(db_path)
+    _worker_stop = stop
+
+
+def _pool(db_path: str, workers: int, stop=None) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=workers, mp_context=_context(),
+                               initializer=_init_worker, initargs=(db_path, stop))
+
+
+def _can_parallelize(db, workers: int) -> bool:
+    return workers > 1 and db.db_path != ':memory:' and os.path.exists(db.db_path)
+
+
+# Estatísticas
+
+def _load_columns_part(id_range: Tuple[int, int]) -> Dict[str, Any]:
+    return analytics.load_columns(_worker_db, id_range=id_range)
+
+
+def detailed_statistics(db, workers: Optional[int] = None) -> Dict[str, Any]:
+    """``analytics.detailed_statistics`` com a leitura dividida entre processos.
+
+    Os processos devolvem as colunas já em arrays NumPy; o cálculo,
+    vetorizado e rápido, é feito uma vez no processo pai.
+    """
+    workers = workers or default_workers()
+    if not _can_parallelize(db, workers):
+        return analytics.detailed_statistics(db)
+
+    ranges = id_ranges(db, workers * PARTS_PER_WORKER)
+    if not ranges:
+        return analytics.detailed_statistics(db)
+    with _pool(db.db_path, workers) as pool:
+        parts = list(pool.map(_load_columns_part, ranges))
+    return analytics.compute_statistics(analytics.merge_columns(parts))
+
+
+# Exportação
+
+def _export_part(fmt: str, compress: bool, media_type: Optional[str],
+                 id_range: Tuple[int, int], part_path: str, chunk_size: int) -> int:
+    def after_chunk(count):
+        if _worker_stop is not None and _worker_stop.is_set():
+            raise ExportCancelled()
+
+    query, params = exporter.build_query(fmt, media_type, id_range)
+    # Com gzip, cada pedaço é um membro gzip completo; membros
+    # concatenados formam um arquivo gzip válido
+    with exporter.open_output(part_path, compress) as out, analytics.read_snapshot(_worker_db):
+        return exporter.write_rows(_worker_db, out, fmt, query, params,
+                                   chunk_size, after_chunk)
+
+
+def _header(compress: bool) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(exporter.COLUMNS)
+    line = buffer.getvalue()
+    if not compress:
+        return line.encode('utf-8')
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31: cabeçalho gzip
+    return compressor.compress(line.encode('utf-8')) + compressor.flush()
+
+
+def export_media(db, path: str, fmt: Optional[str] = None,
+                 compress: Optional[bool] = None,
+                 media_type: Optional[str] = None,
+                 total: Optional[int] = None,
+                 progress: Optional[Callable[[int, Optional[int]], None]] = None,
+                 cancelled: Optional[Callable[[], bool]] = None,
+                 workers: Optional[int] = None,
+                 chunk_size: int = 5000) -> int:
+    """``exporter.export_media`` com os intervalos de id escritos em paralelo.
+
+    Cada processo grava o seu intervalo em ``path + '.partN'``; o pai
+    emenda os pedaços em ordem em ``path + '.part'`` e só então o
+    renomeia para ``path``. ``progress`` é chamado a cada intervalo
+    concluído e ``cancelled`` consultado a cada ``POLL_SECONDS``.
+    """
+    workers = workers or default_workers()
+    if not _can_parallelize(db, workers):
+        return exporter.export_media(db, path, fmt, compress, media_type, total,
+                                     progress, cancelled, chunk_size)
+
+    fmt, compress = exporter.resolve_format(path, fmt, compress)
+    ranges = id_ranges(db, workers * PARTS_PER_WORKER)
+    part_paths = [f"{path}.part{i}" for i in range(len(ranges))]
+    temp_path = path + '.part'
+    stop = _context().Event()
+    count = 0
+
+    try:
+        with _pool(db.db_path, workers, stop) as pool:
+            futures = [pool.submit(_export_part, fmt, compress, media_type,
+                                   id_range, part_path, chunk_size)
+                       for id_range, part_path in zip(ranges, part_paths)]
+            pending = set(futures)
+            while pending:
+                if cancelled is not None and cancelled():
+                    stop.set()
+                    for future in pending:
+                        future.cancel()
+                    raise ExportCancelled()
+                done, pending = wait(pending, timeout=POLL_SECONDS,
+                                     return_when=FIRST_COMPLETED)
+                for future in done:
+                    count += future.result()
+                if done and progress is not None:
+                    progress(count, total)
+
+        with open(temp_path, 'wb') as out:
+            if fmt == 'csv':
+                out.write(_header(compress))
+            for part_path in part_paths:
+                with open(part_path, 'rb') as part:
+                    shutil.copyfileobj(part, out, 1024 * 1024)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    finally:
+        for part_path in part_paths:
+            if os.path.exists(part_path):
+                os.unlink(part_path)
+
+    return count
@@ -0,0 +1,340 @@
+# app/services/query.py
+import re
+from itertools import combinations
+from typing import Any, List, Optional, Tuple
+from app.models.media import MediaStatus, split_genres
+from app.services.cache import LRUCache
+
+def fts_prefix_query(term: str) -> str:
+    """Converte o texto digitado em uma expressão MATCH do FTS5.
+
+    Cada palavra vira um prefixo entre aspas (``"pal"*``), então a
+    busca funciona enquanto o usuário digita e caracteres especiais
+    do FTS5 não quebram a consulta.
+    """
+    tokens = re.findall(r'\w+', term)
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+# Busca tolerante a erros: o termo vira no máximo TYPO_MAX_CHUNKS pedaços
+# de pelo menos TYPO_CHUNK_SIZE caracteres
+TYPO_CHUNK_SIZE = 3
+TYPO_MAX_CHUNKS = 6
+
+def fold_text(text: str) -> str:
+    """``text`` sem maiúsculas e com os espaços normalizados."""
+    return ' '.join(text.casefold().split())
+
+def trigrams(text: str) -> set:
+    """Trigramas de ``text`` sem maiúsculas, como no índice ``media_trigram``.
+
+    Como no tokenizador ``trigram`` do FTS5, os espaços fazem parte dos
+    trigramas; espaços repetidos e nas pontas são descartados antes.
+    """
+    folded = fold_text(text)
+    return {folded[i:i + 3] for i in range(len(folded) - 2)}
+
+def trigram_similarity(term_grams: set, text: str) -> Tuple[float, float]:
+    """Semelhança entre o termo (já em trigramas) e ``text``.
+
+    Retorna ``(cobertura, jaccard)``: a fração dos trigramas do termo
+    presentes em ``text`` (1,0 quando o termo é um trecho do texto) e
+    a semelhança de Jaccard entre os dois, que favorece textos de
+    tamanho parecido com o do termo.
+    """
+    text_grams = trigrams(text)
+    shared = len(term_grams & text_grams)
+    if not shared:
+        return 0.0, 0.0
+    return shared / len(term_grams), shared / len(term_grams | text_grams)
+
+def _fts_phrase(text: str) -> str:
+    return '"{}"'.format(text.replace('"', '""'))
+
+def fts_substring_query(term: str) -> str:
+    """Expressão MATCH do ``media_trigram`` que casa ``term`` como trecho."""
+    return _fts_phrase(fold_text(term))
+
+def fts_typo_query(term: str) -> str:
+    """Expressão MATCH do ``media_trigram`` tolerante a erros de digitação.
+
+    O termo é dividido em pedaços (nos seus trigramas, se for curto). Um
+    erro de digitação só estraga os pedaços em que cai, então a expressão
+    aceita quem tem todos os pedaços menos um, ou menos dois quando há
+    quatro ou mais:
+
+        "labirnto selvagem" -> ("lab" AND "irnt" AND "o s") OR ("lab" AND "irnt" AND "elva")
+                               OR ... OR ("o s" AND "elva" AND "gem")
+
+    O FTS5 resolve cada grupo cruzando as listas de ocorrências, sem ler
+    todas as mídias que têm os trigramas mais comuns. Vazia quando o
+    termo tem um só pedaço.
+    """
+    folded = fold_text(term)
+    count = min(len(folded) // TYPO_CHUNK_SIZE, TYPO_MAX_CHUNKS)
+    if count >= 2:
+        bounds = [round(i * len(folded) / count) for i in range(count + 1)]
+        chunks = [folded[start:end] for start, end in zip(bounds, bounds[1:])]
+    else:
+        chunks = [folded[i:i + 3] for i in range(len(folded) - 2)]
+
+    # Quem tem todos os pedaços também tem cada grupo com um ou dois a menos
+    keep = len(chunks) - (1 if len(chunks) <= 3 else 2)
+    if keep < 1:
+        return ''
+    groups = ('(' + ' AND '.join(_fts_phrase(chunk) for chunk in kept) + ')'
+              for kept in combinations(chunks, keep))
+    return ' OR '.join(dict.fromkeys(groups))
+
+class MediaQuery:
+    """Consulta de mídias montada por partes e executada em um só SELECT.
+
+    Cada filtro vira uma condição parametrizada que usa os índices do
+    banco, então só as linhas que passam nos filtros saem do SQLite:
+
+        query = (MediaQuery('movie')
+                 .with_status(MediaStatus.WATCHING)
+                 .year_between(1990, 1999)
+                 .rating_between(4)
+                 .order_by('rating', descending=True)
+                 .limit(20))
+        service.find(query)
+
+    O SQL depende só da forma da consulta (quais filtros estão ativos,
+    a ordenação...), não dos valores; por isso é montado uma vez por
+    forma e guardado em cache.
+    """
+
+    # Mídias com os campos de filme e de série (NULL quando não se aplicam)
+    SELECTS = {
+        None: '''
+        SELECT m.*, mv.duration, mv.director, mv.watched_date,
+               s.total_seasons, s.total_episodes,
+               s.current_season, s.current_episode, s.episode_duration
+        FROM media m
+        LEFT JOIN movies mv ON m.id = mv.media_id
+        LEFT JOIN series s ON m.id = s.media_id
+    ''',
+        'movie': '''
+        SELECT m.*, mv.duration, mv.director, mv.watched_date
+        FROM media m
+        JOIN movies mv ON m.id = mv.media_id
+    ''',
+        'series': '''
+        SELECT m.*, s.total_seasons, s.total_episodes,
+               s.current_season, s.current_episode, s.episode_duration
+        FROM media m
+        JOIN series s ON m.id = s.media_id
+    ''',
+    }
+
+    # Chaves de ordenação aceitas. Todas têm índice que termina no id
+    # (rowid), o desempate usado pela paginação por chave.
+    ORDERS = {
+        'title': 'm.title',
+        'year': 'm.year',
+        'rating': 'm.rating',
+        'id': 'm.id',
+    }
+
+    GENRE_FILTER = '''m.id IN (
+            SELECT mg.media_id
+            FROM genres g
+            JOIN media_genres mg ON mg.genre_id = g.id
+            WHERE g.name = ?
+        )'''
+
+    SEARCH_FILTER = "m.id IN (SELECT rowid FROM media_fts WHERE media_fts MATCH ?)"
+
+    # SQL já montado, por forma da consulta
+    _sql_cache = LRUCache(max_size=128)
+
+    def __init__(self, media_type: Optional[str] = None):
+        self.media_type = None
+        self.statuses: List[str] = []
+        self.year_min: Optional[int] = None
+        self.year_max: Optional[int] = None
+        self.rating_min: Optional[float] = None
+        self.rating_max: Optional[float] = None
+        self.genres: List[str] = []
+        self.director: Optional[str] = None
+        self.text: Optional[str] = None
+        self.order = 'title'
+        self.descending = False
+        self.max_rows: Optional[int] = None
+
+        if media_type is not None:
+            self.of_type(media_type)
+
+    def of_type(self, media_type: Optional[str]) -> 'MediaQuery':
+        """Restringe a ``'movie'`` ou ``'series'`` (``None`` = ambos)."""
+        if media_type not in self.SELECTS:
+            raise ValueError(f"Tipo de mídia inválido: {media_type}")
+        self.media_type = media_type
+        return self
+
+    def with_status(self, *statuses) -> 'MediaQuery':
+        """Aceita qualquer um dos status (``MediaStatus`` ou seu valor)."""
+        for status in statuses:
+            value = MediaStatus(status).value
+            if value not in self.statuses:
+                self.statuses.append(value)
+        return self
+
+    def year_between(self, minimum: Optional[int] = None,
+                     maximum: Optional[int] = None) -> 'MediaQuery':
+        """Ano de lançamento entre os limites (inclusivos; ``None`` = aberto)."""
+        self.year_min = minimum
+        self.year_max = maximum
+        return self
+
+    def rating_between(self, minimum: Optional[float] = None,
+                       maximum: Optional[float] = None) -> 'MediaQuery':
+        """Avaliação entre os limites (inclusivos; ``None`` = aberto)."""
+        self.rating_min = minimum
+        self.rating_max = maximum
+        return self
+
+    def with_genre(self, *names: str) -> 'MediaQuery':
+        """Exige cada um dos gêneros (E); maiúsculas não importam."""
+        for name in split_genres(', '.join(names)):
+            if name.lower() not in (genre.lower() for genre in self.genres):
+                self.genres.append(name)
+        return self
+
+    def directed_by(self, director: Optional[str]) -> 'MediaQuery':
+        """Diretor cujas palavras começam com as digitadas (só filmes)."""
+        self.director = director or None
+        return self
+
+    def matching(self, text: Optional[str]) -> 'MediaQuery':
+        """Texto em título, diretor, gêneros ou comentário (como em ``search``)."""
+        self.text = text or None
+        return self
+
+    def order_by(self, key: str, descending: bool = False) -> 'MediaQuery':
+        """Ordena por ``'title'``, ``'year'``, ``'rating'`` ou ``'id'``."""
+        if key not in self.ORDERS:
+            raise ValueError(f"Ordenação inválida: {key}")
+        self.order = key
+        self.descending = descending
+        return self
+
+    def limit(self, max_rows: Optional[int]) -> 'MediaQuery':
+        """Número máximo de linhas (``None`` = sem limite)."""
+        if max_rows is not None and max_rows < 1:
+            raise ValueError("limit deve ser ≥ 1")
+        self.max_rows = max_rows
+        return self
+
+    def _match(self) -> str:
+        """Expressão MATCH do FTS5 para texto e diretor ('' se nenhum)."""
+        parts = []
+        text = fts_prefix_query(self.text or '')
+        if text:
+            parts.append(text)
+        director = fts_prefix_query(self.director or '')
+        if director:
+            parts.append(f"director : ({director})")
+        return ' AND '.join(parts)
+
+    def shape(self, after: bool = False, limit: Optional[int] = None) -> Tuple:
+        """Forma da consulta: tudo o que muda o SQL, sem os valores."""
+        return (
+            self.media_type,
+            len(self.statuses),
+            self.year_min is not None,
+            self.year_max is not None,
+            self.rating_min is not None,
+            self.rating_max is not None,
+            len(self.genres),
+            bool(self._match()),
+            self.order,
+            self.descending,
+            after,
+            (limit or self.max_rows) is not None,
+        )
+
+    def compile(self, after: Optional[Tuple[Any, int]] = None,
+                limit: Optional[int] = None) -> Tuple[str, List[Any]]:
+        """Retorna o SQL e os parâmetros da consulta.
+
+        ``after`` é o par (valor da ordenação, id) da última linha já
+        lida: a consulta continua depois dela (paginação por chave).
+        ``limit`` substitui o ``limit()`` da consulta.
+        """
+        limit = limit or self.max_rows
+        shape = self.shape(after is not None, limit)
+
+        sql = self._sql_cache.get(shape)
+        if sql is None:
+            sql = self._build_sql(after is not None, limit is not None)
+            self._sql_cache.put(shape, sql)
+
+        return sql, self._params(after, limit)
+
+    def _build_sql(self, after: bool, limit: bool) -> str:
+        """Monta o SQL da forma atual (na mesma ordem de ``_params``)."""
+        conditions = []
+        if self.media_type:
+            conditions.append("m.media_type = ?")
+        if self.statuses:
+            placeholders = ', '.join('?' for _ in self.statuses)
+            conditions.append(f"m.status IN ({placeholders})")
+        if self.year_min is not None:
+            conditions.append("m.year >= ?")
+        if self.year_max is not None:
+            conditions.append("m.year <= ?")
+        if self.rating_min is not None:
+            conditions.append("m.rating >= ?")
+        if self.rating_max is not None:
+            conditions.append("m.rating <= ?")
+        conditions.extend(self.GENRE_FILTER for _ in self.genres)
+        if self._match():
+            conditions.append(self.SEARCH_FILTER)
+
+        column = self.ORDERS[self.order]
+        direction = "DESC" if self.descending else "ASC"
+        if after:
+            operator = "<" if self.descending else ">"
+            if self.order == 'id':
+                conditions.append(f"m.id {operator} ?")
+            else:
+                conditions.append(f"({column}, m.id) {operator} (?, ?)")
+
+        sql = self.SELECTS[self.media_type]
+        if conditions:
+            sql += " WHERE " + "\n          AND ".join(conditions)
+
+        if self.order == 'id':
+            sql += f" ORDER BY m.id {direction}"
+        else:
+            sql += f" ORDER BY {column} {direction}, m.id {direction}"
+
+        if limit:
+            sql += " LIMIT ?"
+        return sql
+
+    def _params(self, after: Optional[Tuple[Any, int]],
+                limit: Optional[int]) -> List[Any]:
+        """Parâmetros na ordem dos ``?`` de ``_build_sql``."""
+        params: List[Any] = []
+        if self.media_type:
+            params.append(self.media_type)
+        params.extend(self.statuses)
+        for bound in (self.year_min, self.year_max, self.rating_min, self.rating_max):
+            if bound is not None:
+                params.append(bound)
+        params.extend(self.genres)
+        match = self._match()
+        if match:
+            params.append(match)
+
+        if after is not None:
+            value, last_id = after
+            if self.order != 'id':
+                params.append(value)
+            params.append(last_id)
+
+        if limit:
+            params.append(limit)
+        return params
@@ -0,0 +1,194 @@
+# app/services/watch_log.py
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+# Mesmo formato do CURRENT_TIMESTAMP do SQLite (UTC)
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def utc_timestamp(moment: Optional[datetime] = None) -> str:
+    """Texto UTC de ``moment`` (agora, se omitido) no formato do banco."""
+    if moment is None:
+        moment = datetime.now(timezone.utc)
+    elif moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return moment.strftime(TIMESTAMP_FORMAT)
+
+def days_ago(days: int) -> str:
+    """Timestamp UTC de ``days`` dias atrás."""
+    return utc_timestamp(datetime.now(timezone.utc) - timedelta(days=days))
+
+class WatchLog:
+    """Histórico de episódios assistidos com escrita em lotes.
+
+    ``append`` só guarda o evento na memória; os eventos vão para
+    ``watch_events`` em uma única transação com ``executemany`` quando o
+    buffer chega a ``batch_size`` ou em ``flush``. O horário é o do
+    ``append``, não o da gravação. Seguro para uso entre threads.
+
+    ``compact`` troca os eventos antigos pelo resumo diário em
+    ``watch_daily``; as consultas juntam as duas tabelas.
+    """
+
+    INSERT = '''
+        INSERT INTO watch_events (media_id, season, episode, watched_at)
+        VALUES (?, ?, ?, ?)
+    '''
+
+    # Colunas "soltas" com um único MAX(): o SQLite as preenche com a
+    # linha do evento mais recente do grupo (temporada/episódio do fim do
+    # dia). No mesmo segundo vence o maior id, como no trigger de progresso
+    DAILY_FROM_EVENTS = '''
+        SELECT media_id, date(watched_at) AS day, COUNT(*) AS episodes,
+               season AS last_season, episode AS last_episode,
+               substr(MAX(watched_at || printf('%012d', id)), 1, 19) AS last_watched_at
+        FROM watch_events
+    '''
+
+    def __init__(self, db, batch_size: int = 100):
+        if batch_size < 1:
+            raise ValueError("batch_size deve ser ≥ 1")
+        self.db = db
+        self.batch_size = batch_size
+        self._pending: List[Tuple[int, int, int, str]] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def append(self, media_id: int, season: int, episode: int,
+               watched_at: Optional[datetime] = None) -> bool:
+        """Guarda um evento; retorna ``True`` se o buffer encheu."""
+        event = (media_id, season, episode, utc_timestamp(watched_at))
+        with self._lock:
+            self._pending.append(event)
+            return len(self._pending) >= self.batch_size
+
+    def flush(self) -> Dict[str, Any]:
+        """Grava os eventos pendentes em uma única transação.
+
+        Eventos de séries inexistentes ou fora das temporadas/episódios
+        da série são descartados e devolvidos em ``errors`` como
+        ``(evento, mensagem)``; ``media_ids`` são as séries alteradas.
+        """
+        with self._lock:
+            events, self._pending = self._pending, []
+        if not events:
+            return {'inserted': 0, 'errors': [], 'media_ids': set()}
+
+        # Ordem cronológica: o trigger deixa o progresso no evento mais recente
+        events.sort(key=lambda event: event[3])
+
+        try:
+            with self.db.transaction() as conn:
+                ids = sorted({event[0] for event in events})
+                bounds = {}
+                for start in range(0, len(ids), 500):
+                    batch = ids[start:start + 500]
+                    placeholders = ', '.join('?' for _ in batch)
+                    bounds.update((media_id, (seasons, episodes)) for media_id, seasons, episodes
+                                  in conn.execute(f'''
+                                      SELECT media_id, total_seasons, total_episodes
+                                      FROM series WHERE media_id IN ({placeholders})
+                                  ''', batch))
+
+                valid, errors = [], []
+                for event in events:
+                    media_id, season, episode, _ = event
+                    if media_id not in bounds:
+                        errors.append((event, f"Série {media_id} não encontrada"))
+                    elif not (1 <= season <= bounds[media_id][0]
+                              and 1 <= episode <= bounds[media_id][1]):
+                        errors.append((event, f"Episódio fora da série: T{season}E{episode}"))
+                    else:
+                        valid.append(event)
+
+                conn.executemany(self.INSERT, valid)
+        except Exception:
+            # Devolve os eventos ao buffer para uma nova tentativa
+            with self._lock:
+                self._pending[:0] = events
+            raise
+
+        return {
+            'inserted': len(valid),
+            'errors': errors,
+            'media_ids': {event[0] for event in valid},
+        }
+
+    def compact(self, older_than_days: int) -> Dict[str, int]:
+        """Resume os eventos com mais de ``older_than_days`` dias.
+
+        Os eventos de cada série viram uma linha por dia em
+        ``watch_daily`` e são apagados de ``watch_events``. O corte cai no
+        início do dia, então um dia nunca fica dividido entre as tabelas.
+        Retorna quantos eventos foram compactados e em quantos dias.
+        """
+        if older_than_days < 0:
+            raise ValueError("older_than_days deve ser ≥ 0")
+        cutoff = days_ago(older_than_days)[:10] + " 00:00:00"
+
+        with self.db.transaction() as conn:
+            days = conn.execute('''
+                INSERT INTO watch_daily (media_id, day, episodes, last_season,
+                                         last_episode, last_watched_at)
+            ''' + self.DAILY_FROM_EVENTS + '''
+                WHERE watched_at < ?
+                GROUP BY media_id, date(watched_at)
+                ON CONFLICT (media_id, day) DO UPDATE SET
+                    episodes = episodes + excluded.episodes,
+                    last_season = CASE WHEN excluded.last_watched_at >= last_watched_at
+                                       THEN excluded.last_season ELSE last_season END,
+                    last_episode = CASE WHEN excluded.last_watched_at >= last_watched_at
+                                        THEN excluded.last_episode ELSE last_episode END,
+                    last_watched_at = MAX(last_watched_at, excluded.last_watched_at)
+            ''', (cutoff,)).rowcount
+            events = conn.execute(
+                "DELETE FROM watch_events WHERE watched_at < ?", (cutoff,)
+            ).rowcount
+        return {'events': events, 'days': days}
+
+    def _fetch_dicts(self, query: str, params=()) -> List[Dict[str, Any]]:
+        return [dict(row) for row in self.db.iter_rows(query, params,
+                                                       row_factory=sqlite3.Row)]
+
+    def recently_watched(self, days: int) -> List[Dict[str, Any]]:
+        """Séries assistidas nos últimos ``days`` dias, da mais recente à mais antiga.
+
+        Lê só a janela pelos índices de data das duas tabelas. Dias já
+        compactados entram inteiros, mesmo que a janela comece no meio
+        do dia.
+        """
+        since = days_ago(days)
+        return self._fetch_dicts('''
+            SELECT w.media_id, m.title, s.current_season, s.current_episode,
+                   SUM(w.episodes) AS episodes, MAX(w.last_watched_at) AS last_watched_at
+            FROM (
+                SELECT media_id, COUNT(*) AS episodes, MAX(watched_at) AS last_watched_at
+                FROM watch_events WHERE watched_at >= ?
+                GROUP BY media_id
+                UNION ALL
+                SELECT media_id, episodes, last_watched_at
+                FROM watch_daily WHERE day >= date(?)
+            ) w
+            JOIN media m ON m.id = w.media_id
+            JOIN series s ON s.media_id = w.media_id
+            GROUP BY w.media_id
+            ORDER BY last_watched_at DESC
+        ''', (since, since))
+
+    def daily_history(self, media_id: int, days: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Resumo por dia de uma série (eventos e dias compactados), do mais recente."""
+        since = days_ago(days) if days is not None else "0000-01-01 00:00:00"
+        return self._fetch_dicts('''
+            SELECT day, episodes, last_season, last_episode, last_watched_at
+            FROM watch_daily WHERE media_id = ? AND day >= date(?)
+            UNION ALL
+            SELECT day, episodes, last_season, last_episode, last_watched_at FROM (
+        ''' + self.DAILY_FROM_EVENTS + '''
+                WHERE media_id = ? AND watched_at >= ?
+                GROUP BY date(watched_at)
+            )
+            ORDER BY day DESC
+        ''', (media_id, since, media_id, since))
@@ -1,18 +1,49 @@
 # app/ui/cli.py
 import os
+from datetime import datetime
 from typing import Optional
 from app.services.media_service import MediaService
-from app.models.media import Movie, Series
+from app.services.query import MediaQuery
+from app.models.media import Movie, Series, MediaStatus
+from app.ui.formatting import format_minutes
 
 class CLI:
     """Interface de linha de comando."""
     
+    PAGE_SIZE = 20  # Mídias por página nas listagens
+    TOP_GENRES = 5  # Gêneros mostrados nas estatísticas detalhadas
+    
+    # Respostas do filtro de status e da ordenação das listagens
+    STATUS_CHOICES = {
+        "1": MediaStatus.WATCHING,
+        "2": MediaStatus.COMPLETED,
+        "3": MediaStatus.PLAN_TO_WATCH,
+    }
+    
+    ORDER_CHOICES = {
+        "t": ("title", False),
+        "a": ("year", True),
+        "n": ("rating", True),
+    }
+    
+    # Opções do menu de exportação
+    EXPORT_FORMATS = {
+        "1": ".csv",
+        "2": ".csv.gz",
+        "3": ".jsonl",
+        "4": ".jsonl.gz",
+    }
+    
     def __init__(self, media_service: MediaService):
         self.service = media_service
         self.running = True
     
     def clear_screen(self):
-        os.system('cls' if os.name == 'nt' else 'clear')
+        if os.name == 'nt':
+            os.system('cls')
+        else:
+            # Sequência ANSI: limpa sem abrir um shell a cada tela
+            print("\033[2J\033[H", end="", flush=True)
     
     def print_header(self, title: str):
         self.clear_screen()
@@ -134,57 +165,134 @@ class CLI:
         
         self.wait_for_enter()
     
+    def next_page(self) -> bool:
+        """Pergunta se deve carregar a próxima página."""
+        answer = input("\n👉 Enter para a próxima página, 0 para voltar: ").strip()
+        return answer != "0"
+    
+    def choose_query(self, media_type: str) -> MediaQuery:
+        """Pergunta status e ordenação da listagem e monta a consulta."""
+        query = MediaQuery(media_type)
+        
+        status = self.get_input("Status (1=Assistindo, 2=Concluído, 3=Planejado, Enter=todos)")
+        if status in self.STATUS_CHOICES:
+            query.with_status(self.STATUS_CHOICES[status])
+        
+        order = self.get_input("Ordenar por (t=título, a=ano, n=nota)", "t").lower()
+        order_by, descending = self.ORDER_CHOICES.get(order, self.ORDER_CHOICES["t"])
+        query.order_by(order_by, descending)
+        
+        return query
+    
     def list_movies(self):
-        """Lista todos os filmes."""
+        """Lista os filmes, página por página."""
         self.print_header("MEUS FILMES")
         
-        movies = self.service.get_all_movies()
+        total = self.service.get_statistics()['movies']
         
-        if not movies:
+        if not total:
             print("📭 Nenhum filme cadastrado")
             print("\nAdicione seu primeiro filme usando a opção 1!")
-        else:
-            print(f"🎬 Total: {len(movies)} filme(s)")
-            print("-" * 60)
+            self.wait_for_enter()
+            return
+        
+        print(f"🎬 Total: {total} filme(s)")
+        query = self.choose_query("movie")
+        print("-" * 60)
+        
+        i = 0
+        cursor = None
+        while True:
+            page = self.service.find_page(query, after=cursor, limit=self.PAGE_SIZE)
+            if not page['items'] and not cursor:
+                print("📭 Nenhum filme com esse status")
+            
+            for movie in page['items']:
+                i += 1
+                print(f"\n{i}. {movie.title} ({movie.year})")
+                if movie.rating > 0:
+                    print(f"   ⭐ Avaliação: {movie.rating}/5")
+                print(f"   📀 Duração: {movie.duration} min")
+                print(f"   🎭 Gêneros: {', '.join(movie.genres)}")
+                print(f"   📋 Status: {movie.status.value}")
+                if movie.director:
+                    print(f"   👨‍🎨 Diretor: {movie.director}")
             
-            for i, movie in enumerate(movies, 1):
-                print(f"\n{i}. {movie['title']} ({movie['year']})")
-                if movie['rating'] > 0:
-                    print(f"   ⭐ Avaliação: {movie['rating']}/5")
-                print(f"   📀 Duração: {movie['duration']} min")
-                print(f"   🎭 Gêneros: {movie['genres']}")
-                print(f"   📋 Status: {movie['status']}")
-                if movie['director']:
-                    print(f"   👨‍🎨 Diretor: {movie['director']}")
+            cursor = page['next']
+            if not cursor or not self.next_page():
+                break
         
-        self.wait_for_enter()
+        if not cursor:
+            self.wait_for_enter()
     
     def list_series(self):
-        """Lista todas as séries."""
+        """Lista as séries, página por página."""
         self.print_header("MINHAS SÉRIES")
         
-        series_list = self.service.get_all_series()
+        total = self.service.get_statistics()['series']
         
-        if not series_list:
+        if not total:
             print("📭 Nenhuma série cadastrada")
             print("\nAdicione sua primeira série usando a opção 2!")
+            self.wait_for_enter()
+            return
+        
+        print(f"📺 Total: {total} série(s)")
+        query = self.choose_query("series")
+        print("-" * 60)
+        
+        i = 0
+        cursor = None
+        while True:
+            page = self.service.find_page(query, after=cursor, limit=self.PAGE_SIZE)
+            if not page['items'] and not cursor:
+                print("📭 Nenhuma série com esse status")
+            
+            for series in page['items']:
+                i += 1
+                print(f"\n{i}. {series.title} ({series.year})")
+                if series.rating > 0:
+                    print(f"   ⭐ Avaliação: {series.rating}/5")
+                print(f"   📊 Progresso: T{series.current_season}E{series.current_episode}"
+                      f" ({series.progress_percentage:.1f}%)")
+                print(f"   🎭 Gêneros: {', '.join(series.genres)}")
+                print(f"   📋 Status: {series.status.value}")
+                print(f"   🕒 Temporadas: {series.total_seasons} × {series.total_episodes} episódios")
+            
+            cursor = page['next']
+            if not cursor or not self.next_page():
+                break
+        
+        if not cursor:
+            self.wait_for_enter()
+    
+    def search(self):
+        """Busca filmes e séries pelo índice de texto."""
+        self.print_header("BUSCAR")
+        
+        term = self.get_input("Termo de busca (título, diretor, gênero, comentário)")
+        if not term:
+            print("❌ Digite um termo para buscar!")
+            self.wait_for_enter()
+            return
+        
+        results = self.service.search(term, limit=50)
+        
+        if not results:
+            print(f"\n📭 Nenhum resultado para '{term}'")
         else:
-            print(f"📺 Total: {len(series_list)} série(s)")
+            print(f"\n🔍 {len(results)} resultado(s) para '{term}'")
             print("-" * 60)
             
-            for i, series in enumerate(series_list, 1):
-                # Calcular progresso
-                total_eps = series['total_seasons'] * series['total_episodes']
-                watched_eps = ((series['current_season'] - 1) * series['total_episodes']) + series['current_episode']
-                progress = (watched_eps / total_eps * 100) if total_eps > 0 else 0
-                
-                print(f"\n{i}. {series['title']} ({series['year']})")
-                if series['rating'] > 0:
-                    print(f"   ⭐ Avaliação: {series['rating']}/5")
-                print(f"   📊 Progresso: T{series['current_season']}E{series['current_episode']} ({progress:.1f}%)")
-                print(f"   🎭 Gêneros: {series['genres']}")
-                print(f"   📋 Status: {series['status']}")
-                print(f"   🕒 Temporadas: {series['total_seasons']} × {series['total_episodes']} episódios")
+            for i, item in enumerate(results, 1):
+                icon = "🎬" if isinstance(item, Movie) else "📺"
+                print(f"\n{i}. {icon} {item.title} ({item.year})")
+                if item.rating > 0:
+                    print(f"   ⭐ Avaliação: {item.rating}/5")
+                print(f"   🎭 Gêneros: {', '.join(item.genres)}")
+                print(f"   📋 Status: {item.status.value}")
+                if isinstance(item, Movie) and item.director:
+                    print(f"   👨‍🎨 Diretor: {item.director}")
         
         self.wait_for_enter()
     
@@ -208,6 +316,7 @@ class CLI:
         if stats['total'] > 0:
             completion_rate = (stats['concluido'] / stats['total']) * 100
             print(f"\n📈 TAXA DE CONCLUSÃO: {completion_rate:.1f}%")
+            self.print_detailed_statistics(self.service.get_detailed_statistics())
         
         print("\n" + "=" * 40)
         print("🎯 Metas de Conclusão:")
@@ -217,6 +326,87 @@ class CLI:
         
         self.wait_for_enter()
     
+    def export(self):
+        """Exporta o acervo para CSV ou JSON Lines."""
+        self.print_header("EXPORTAR")
+        
+        print("Formato: [1] CSV  [2] CSV compactado  [3] JSON Lines  [4] JSON Lines compactado")
+        extension = self.EXPORT_FORMATS.get(self.get_input("Formato", "1"), ".csv")
+        default = f"trackflix_export_{datetime.now().strftime('%Y%m%d')}{extension}"
+        filename = self.get_input("Arquivo", default)
+        
+        def report(done, total):
+            if total:
+                print(f"\r⏳ {done:,} de {total:,} mídias ({done / total * 100:.0f}%)",
+                      end="", flush=True)
+        
+        print("\n(Ctrl+C cancela)")
+        try:
+            count = self.service.export(filename, progress=report)
+            print(f"\n\n✅ {count} mídia(s) exportada(s) para {filename}")
+        except KeyboardInterrupt:
+            print("\n\n🚫 Exportação cancelada")
+        except Exception as e:
+            print(f"\n\n❌ Erro ao exportar: {e}")
+        
+        self.wait_for_enter()
+    
+    def show_query_report(self):
+        """Mostra o tempo gasto por consulta ao banco."""
+        self.print_header("RELATÓRIO DE CONSULTAS")
+        
+        db = self.service.db
+        if db.profiler is None:
+            print("⏱️  A medição das consultas está desligada.")
+            if self.get_input("Ligar agora? (s/n)", "s").lower().startswith("s"):
+                db.enable_profiling()
+                print("\n✅ Medição ligada. Use o app e volte aqui para ver o relatório.")
+            print("\n💡 Para ligar ao iniciar: TRACKFLIX_PROFILE=1 (ou o nome de um"
+                  " arquivo para gravar o relatório ao sair)")
+            self.wait_for_enter()
+            return
+        
+        print(db.profiler.report())
+        
+        filename = self.get_input("\nGravar em arquivo (Enter para pular)")
+        if filename:
+            db.profiler.write_report(filename)
+            print(f"✅ Relatório gravado em {filename}")
+        
+        self.wait_for_enter()
+    
+    def print_detailed_statistics(self, details):
+        """Mostra tempo assistido, notas, décadas e gêneros."""
+        watch = details['watch_time']
+        print("\n⏱️  TEMPO DE TELA")
+        print(f"• Assistido: {format_minutes(watch['watched_minutes'])}"
+              f" (filmes {format_minutes(watch['movie_minutes'])},"
+              f" séries {format_minutes(watch['series_minutes'])})")
+        print(f"• Restante: {format_minutes(watch['remaining_minutes'])}")
+        print(f"• Episódios: {watch['watched_episodes']}/{watch['episodes']}")
+        
+        ratings = details['ratings']
+        if ratings['rated']:
+            print(f"\n⭐ NOTAS ({ratings['rated']} avaliadas, média {ratings['average']},"
+                  f" mediana {ratings['median']})")
+            most = max(ratings['distribution'].values())
+            for stars, count in ratings['distribution'].items():
+                bar = "█" * round(count / most * 20) if most else ""
+                print(f"  {stars}★ {bar} {count}")
+        
+        if details['by_decade']:
+            print("\n📅 POR DÉCADA")
+            for decade in details['by_decade']:
+                print(f"• {decade['decade']}s: {decade['count']} mídia(s),"
+                      f" {decade['completion_rate'] * 100:.0f}% concluído")
+        
+        if details['by_genre']:
+            print("\n🎭 GÊNEROS MAIS FREQUENTES")
+            for genre in details['by_genre'][:self.TOP_GENRES]:
+                average = f", média ⭐ {genre['average_rating']}" if genre['average_rating'] else ""
+                print(f"• {genre['genre']}: {genre['count']} mídia(s),"
+                      f" {genre['completion_rate'] * 100:.0f}% concluído{average}")
+    
     def main_menu(self):
         """Menu principal."""
         while self.running:
@@ -227,11 +417,14 @@ class CLI:
             print("[3] 🎬 Meus Filmes")
             print("[4] 📺 Minhas Séries")
             print("[5] 📊 Estatísticas")
+            print("[6] 🔍 Buscar")
+            print("[7] 📤 Exportar")
+            print("[8] ⏱️  Relatório de consultas")
             print("[0] 🚪 Sair")
             print()
             
             try:
-                choice = self.get_int_input("Opção", min_val=0, max_val=5)
+                choice = self.get_int_input("Opção", min_val=0, max_val=8)
                 
                 if choice == 0:
                     self.running = False
@@ -246,6 +439,12 @@ class CLI:
                     self.list_series()
                 elif choice == 5:
                     self.show_statistics()
+                elif choice == 6:
+                    self.search()
+                elif choice == 7:
+                    self.export()
+                elif choice == 8:
+                    self.show_query_report()
                     
             except KeyboardInterrupt:
                 print("\n\n👋 Programa interrompido pelo usuário")
@@ -256,4 +455,7 @@ class CLI:
     
     def run(self):
         """Executa a aplicação."""
-        self.main_menu()
\ No newline at end of file
+        try:
+            self.main_menu()
+        finally:
+            self.service.flush_watch_events()
\ No newline at end of file
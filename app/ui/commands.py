@@ -0,0 +1,355 @@
+# app/ui/commands.py
+"""Comandos não interativos, para scripts, cron e laços no shell.
+
+    python -m app stats --json
+    python -m app add-movie "Duna" --year 2021 --duration 155 --genres "Ficção Científica"
+    python -m app list --type series --status Assistindo --order rating --desc
+    python -m app search matrix --json
+    python -m app search --fuzzy "senhor dos aneis"
+    python -m app import acervo.jsonl.gz
+
+Sem argumentos, ``app.main`` abre a escolha GUI/CLI como antes. A
+partida é enxuta: Tkinter só é importado em ``gui`` e NumPy só em
+``stats --detailed``; com o esquema já atualizado o banco não roda DDL.
+O resultado vai para a saída padrão e as mensagens do serviço para a
+de erros, então ``--json`` pode ir direto para outro programa.
+"""
+import argparse
+import json
+import os
+import sys
+from contextlib import redirect_stdout
+
+from app.models.media import Media, MediaStatus, Movie, Series
+from app.ui.formatting import format_minutes
+
+ORDERS = ('title', 'year', 'rating', 'id')
+
+
+def _status(text: str) -> MediaStatus:
+    """Aceita o valor (``Assistindo``) ou o nome (``watching``) do status."""
+    for status in MediaStatus:
+        if text.lower() in (status.value.lower(), status.name.lower()):
+            return status
+    choices = ', '.join(status.value for status in MediaStatus)
+    raise argparse.ArgumentTypeError(f"status inválido: {text} (use {choices})")
+
+
+def _rating(text: str) -> float:
+    value = float(text)
+    if not 0 <= value <= 5:
+        raise argparse.ArgumentTypeError("a avaliação deve ser entre 0 e 5")
+    return value
+
+
+def _genres(text: str) -> list:
+    return [genre.strip() for genre in text.split(',') if genre.strip()]
+
+
+def _json_default(value):
+    return value.to_dict() if isinstance(value, Media) else str(value)
+
+
+def _print_json(out, payload):
+    json.dump(payload, out, ensure_ascii=False, indent=2, default=_json_default)
+    out.write('\n')
+
+
+def _print_items(out, items):
+    """Uma linha por mídia: id, tipo, título, nota, status e progresso."""
+    for item in items:
+        icon = "📺" if isinstance(item, Series) else "🎬"
+        line = f"{item.id:>6}  {icon} {item.title} ({item.year})"
+        if item.rating:
+            line += f"  ⭐ {item.rating:.1f}"
+        line += f"  [{item.status.value}]"
+        if isinstance(item, Series):
+            line += f"  T{item.current_season}E{item.current_episode}"
+        out.write(line + '\n')
+
+
+def _fill_common(media, args):
+    media.rating = args.rating
+    media.comment = args.comment or ""
+    if args.status is not None:
+        media.status = args.status
+    return media
+
+
+# Comandos: cada um recebe (service, args, out) e retorna o código de saída
+
+def cmd_add_movie(service, args, out) -> int:
+    movie = _fill_common(Movie(args.title, args.year, args.genres, args.duration,
+                               args.director), args)
+    movie.validate()
+    if not service.add_movie(movie):
+        return 1
+    if args.json:
+        _print_json(out, service.get_media(movie.id))
+    else:
+        out.write(f"✅ Filme '{movie.title}' adicionado (id {movie.id})\n")
+    return 0
+
+
+def cmd_add_series(service, args, out) -> int:
+    series = _fill_common(Series(args.title, args.year, args.genres, args.seasons,
+                                 args.episodes, args.episode_duration), args)
+    series.validate()
+    if not service.add_series(series):
+        return 1
+    if args.json:
+        _print_json(out, service.get_media(series.id))
+    else:
+        out.write(f"✅ Série '{series.title}' adicionada (id {series.id})\n")
+    return 0
+
+
+def cmd_list(service, args, out) -> int:
+    from app.services.query import MediaQuery
+
+    query = MediaQuery(args.type).order_by(args.order, args.desc).limit(args.limit)
+    if args.status:
+        query.with_status(*args.status)
+    if args.genre:
+        query.with_genre(*args.genre)
+    if args.min_rating is not None:
+        query.rating_between(args.min_rating)
+    items = service.find(query)
+    if args.json:
+        _print_json(out, items)
+    else:
+        _print_items(out, items)
+    return 0
+
+
+def cmd_search(service, args, out) -> int:
+    search = service.fuzzy_search if args.fuzzy else service.search
+    items = search(' '.join(args.term), args.limit, args.type)
+    if args.json:
+        _print_json(out, items)
+    else:
+        _print_items(out, items)
+    return 0
+
+
+def cmd_stats(service, args, out) -> int:
+    stats = service.get_detailed_statistics() if args.detailed else service.get_statistics()
+    if args.json:
+        _print_json(out, stats)
+    elif args.detailed:
+        from app.ui.cli import CLI
+        with redirect_stdout(out):
+            CLI(service).print_detailed_statistics(stats)
+    else:
+        out.write(f"Total: {stats['total']} ({stats['movies']} filmes, {stats['series']} séries)\n"
+                  f"Concluídos: {stats['concluido']}  Assistindo: {stats['assistindo']}"
+                  f"  Planejados: {stats['planejado']}\n"
+                  f"Avaliação média: {stats['average_rating']} ({stats['rated']} avaliados)\n"
+                  f"Tempo total: {format_minutes(stats['total_minutes'])}\n")
+    return 0
+
+
+def cmd_rate(service, args, out) -> int:
+    media = service.get_media(args.id)
+    if media is None:
+        print(f"❌ Mídia {args.id} não encontrada")
+        return 1
+    if isinstance(media, Movie):
+        updated = service.update_movie_rating(args.id, args.rating, args.comment)
+    else:
+        updated = service.update_series_rating(args.id, args.rating, args.comment)
+    return 0 if updated else 1
+
+
+def cmd_progress(service, args, out) -> int:
+    return 0 if service.update_progress(args.id, args.season, args.episode) else 1
+
+
+def cmd_import(service, args, out) -> int:
+    """Importa um arquivo da exportação, lido uma única vez.
+
+    Cada linha vai para o lote de filmes ou de séries; um lote cheio é
+    gravado pela importação em lote do serviço. Linhas com problema
+    (JSON inválido, campos inválidos) são informadas pelo número da
+    linha no arquivo e não interrompem a importação.
+    """
+    import csv
+    from app.services.importer import media_from_record, read_records
+
+    writers = {'movie': service.add_movies_bulk, 'series': service.add_series_bulk}
+    batches = {'movie': [], 'series': []}  # (linha do arquivo, mídia)
+    inserted = 0
+    errors = []
+
+    def flush(media_type):
+        nonlocal inserted
+        batch = batches[media_type]
+        result = writers[media_type]([media for _, media in batch])
+        inserted += result['inserted']
+        errors.extend((batch[index][0], message) for index, message in result['errors'])
+        batch.clear()
+
+    records = read_records(args.file, args.format,
+                           on_error=lambda number, message: errors.append((number, message)))
+    line = 0
+    try:
+        for line, record in records:
+            try:
+                media = media_from_record(record)
+            except (ValueError, TypeError) as e:
+                errors.append((line, str(e)))
+                continue
+            media_type = 'series' if isinstance(media, Series) else 'movie'
+            batches[media_type].append((line, media))
+            if len(batches[media_type]) >= service.BULK_CHUNK_SIZE:
+                flush(media_type)
+    except (OSError, EOFError, csv.Error) as e:
+        if not line:
+            raise
+        # Arquivo truncado ou corrompido: grava o que já foi lido
+        errors.append((line + 1, f"Leitura interrompida: {e}"))
+
+    for media_type, batch in batches.items():
+        if batch:
+            flush(media_type)
+
+    errors.sort()
+    if args.json:
+        _print_json(out, {'inserted': inserted, 'errors': errors})
+    else:
+        out.write(f"✅ {inserted} mídias importadas\n")
+        for line, message in errors:
+            out.write(f"❌ Linha {line}: {message}\n")
+    return 1 if errors else 0
+
+
+def cmd_export(service, args, out) -> int:
+    count = service.export(args.file, args.format, media_type=args.type)
+    if args.json:
+        _print_json(out, {'exported': count, 'file': args.file})
+    else:
+        out.write(f"✅ {count} mídias exportadas para {args.file}\n")
+    return 0
+
+
+def cmd_gui(service, args, out) -> int:
+    from app.ui.gui import TrackFlixGUI
+    TrackFlixGUI(service).run()
+    return 0
+
+
+def cmd_menu(service, args, out) -> int:
+    from app.ui.cli import CLI
+    with redirect_stdout(out):
+        CLI(service).run()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app",
+                                     description="TrackFlix - filmes e séries")
+    parser.add_argument('--db', default="trackflix.db", help="arquivo do banco")
+    commands = parser.add_subparsers(dest='command', required=True, metavar='comando')
+
+    def command(name, func, help_text):
+        sub = commands.add_parser(name, help=help_text, description=help_text)
+        sub.set_defaults(func=func)
+        return sub
+
+    def add_media_arguments(sub):
+        sub.add_argument('title', help="título")
+        sub.add_argument('--year', type=int, required=True, help="ano de lançamento")
+        sub.add_argument('--genres', type=_genres, default=[], help="separados por vírgula")
+        sub.add_argument('--rating', type=_rating, default=0.0)
+        sub.add_argument('--status', type=_status)
+        sub.add_argument('--comment')
+        sub.add_argument('--json', action='store_true', help="mostra a mídia criada em JSON")
+
+    sub = command('add-movie', cmd_add_movie, "adiciona um filme")
+    add_media_arguments(sub)
+    sub.add_argument('--duration', type=int, required=True, help="minutos")
+    sub.add_argument('--director')
+
+    sub = command('add-series', cmd_add_series, "adiciona uma série")
+    add_media_arguments(sub)
+    sub.add_argument('--seasons', type=int, required=True)
+    sub.add_argument('--episodes', type=int, required=True, help="por temporada")
+    sub.add_argument('--episode-duration', type=int, help="minutos")
+
+    sub = command('list', cmd_list, "lista mídias com filtros")
+    sub.add_argument('--type', choices=('movie', 'series'))
+    sub.add_argument('--status', type=_status, action='append',
+                     help="pode repetir (qualquer um dos status)")
+    sub.add_argument('--genre', action='append', help="pode repetir (todos os gêneros)")
+    sub.add_argument('--min-rating', type=_rating)
+    sub.add_argument('--order', choices=ORDERS, default='title')
+    sub.add_argument('--desc', action='store_true', help="ordem decrescente")
+    sub.add_argument('--limit', type=int, help="máximo de mídias")
+    sub.add_argument('--json', action='store_true')
+
+    sub = command('search', cmd_search, "busca por título, diretor, gêneros e comentário")
+    sub.add_argument('term', nargs='+')
+    sub.add_argument('--type', choices=('movie', 'series'))
+    sub.add_argument('--limit', type=int, default=50)
+    sub.add_argument('--fuzzy', action='store_true',
+                     help="por trecho do título ou diretor, tolerando erros de digitação")
+    sub.add_argument('--json', action='store_true')
+
+    sub = command('stats', cmd_stats, "estatísticas do acervo")
+    sub.add_argument('--detailed', action='store_true', help="por ano, década e gênero")
+    sub.add_argument('--json', action='store_true')
+
+    sub = command('rate', cmd_rate, "avalia um filme ou série")
+    sub.add_argument('id', type=int)
+    sub.add_argument('rating', type=_rating)
+    sub.add_argument('--comment')
+
+    sub = command('progress', cmd_progress, "registra o episódio assistido de uma série")
+    sub.add_argument('id', type=int)
+    sub.add_argument('season', type=int)
+    sub.add_argument('episode', type=int)
+
+    sub = command('import', cmd_import, "importa um arquivo CSV ou JSON Lines da exportação")
+    sub.add_argument('file')
+    sub.add_argument('--format', choices=('csv', 'jsonl'), help="padrão: pela extensão")
+    sub.add_argument('--json', action='store_true')
+
+    sub = command('export', cmd_export, "exporta o acervo para CSV ou JSON Lines")
+    sub.add_argument('file', help=".csv, .jsonl ou .ndjson, com .gz opcional")
+    sub.add_argument('--format', choices=('csv', 'jsonl'), help="padrão: pela extensão")
+    sub.add_argument('--type', choices=('movie', 'series'))
+    sub.add_argument('--json', action='store_true')
+
+    command('gui', cmd_gui, "abre a interface gráfica")
+    command('menu', cmd_menu, "abre o menu interativo no terminal")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    out = sys.stdout
+
+    # Avisos e erros do banco/serviço (print) vão para a saída de erros
+    with redirect_stdout(sys.stderr):
+        from app.database.db import Database
+        from app.services.media_service import MediaService
+
+        db = Database(args.db)
+        try:
+            if os.environ.get('TRACKFLIX_PROFILE'):
+                from app.database.profiler import configure_from_env
+                configure_from_env(db)
+            service = MediaService(db)
+            try:
+                return args.func(service, args, out)
+            except (ValueError, OSError) as e:
+                print(f"❌ {e}")
+                return 1
+            except BrokenPipeError:
+                # Quem lia a saída (``| head``) fechou o pipe: descarta o resto
+                os.dup2(os.open(os.devnull, os.O_WRONLY), out.fileno())
+                return 1
+            finally:
+                service.flush_watch_events()
+        finally:
+            db.close()
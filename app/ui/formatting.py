@@ -0,0 +1,7 @@
+# app/ui/formatting.py
+"""Formatação de valores comum às interfaces (CLI, GUI e comandos)."""
+
+def format_minutes(minutes: int) -> str:
+    """Minutos como horas e minutos: 135 -> '2h15'."""
+    hours, minutes = divmod(int(minutes), 60)
+    return f"{hours}h{minutes:02d}"
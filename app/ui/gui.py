@@ -3,13 +3,34 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from typing import List, Dict, Any
 import os
+import threading
+import time
 from datetime import datetime
+from app.models.media import MediaStatus, MediaType
+from app.services.exporter import ExportCancelled
+from app.services.query import MediaQuery
+from app.ui.formatting import format_minutes
+from app.ui.worker import BackgroundRunner
 
 class TrackFlixGUI:
     """Interface gráfica principal do TrackFlix."""
     
-    def __init__(self, media_service):
+    PAGE_SIZE = 100  # Linhas buscadas por vez ao rolar a tabela
+    SEARCH_LIMIT = 200  # Resultados exibidos por busca
+    SEARCH_DEBOUNCE_MS = 150  # Pausa na digitação antes de buscar
+    TOP_GENRES = 10  # Gêneros mostrados nas estatísticas detalhadas
+    EXPORT_POLL_MS = 100  # Intervalo de atualização da barra de exportação
+    
+    # Opções do filtro de status
+    STATUS_FILTERS = {
+        "watching": MediaStatus.WATCHING,
+        "completed": MediaStatus.COMPLETED,
+        "planned": MediaStatus.PLAN_TO_WATCH,
+    }
+    
+    def __init__(self, media_service, search_debounce_ms: int = SEARCH_DEBOUNCE_MS):
         self.service = media_service
+        self.search_debounce_ms = search_debounce_ms
         self.root = tk.Tk()
         self.root.title("TrackFlix 🎬")
         self.root.geometry("1200x700")
@@ -23,6 +44,19 @@ class TrackFlixGUI:
         # Variáveis
         self.current_view = "movies"  # "movies" ou "series"
         self.filter_status = "all"    # "all", "watching", "completed", "planned"
+        self.next_cursor = None       # Continuação da listagem paginada
+        self.loaded_count = 0
+        self.loading_page = False
+        self.listing_filter = None    # Consulta da listagem carregada
+        self.search_after_id = None   # Busca agendada (debounce)
+        self.last_search = None       # (termo, resultados) da última busca completa
+        self.export_cancel = None     # Evento que cancela a exportação em andamento
+        
+        # Modelo das linhas exibidas: iid -> valores, na ordem da tabela.
+        # O iid identifica a mídia ("movie:12", "series:7"), o que permite
+        # atualizar só as linhas que mudaram.
+        self.table_rows = {}
+        self.table_order = []
         
         # Configurar tema
         self.setup_theme()
@@ -30,6 +64,9 @@ class TrackFlixGUI:
         # Criar interface
         self.setup_ui()
         
+        # Consultas ao banco rodam fora da thread do Tk
+        self.runner = BackgroundRunner(self.root, on_busy_change=self.set_busy)
+        
         # Carregar dados iniciais
         self.refresh_data()
     
@@ -177,6 +214,35 @@ class TrackFlixGUI:
                   command=self.clear_search,
                   width=3).pack(side=tk.LEFT)
         
+        # Filtros por ano, nota e diretor (aplicados no banco)
+        range_frame = ttk.Frame(content_frame)
+        range_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        self.year_from_var = tk.StringVar()
+        self.year_to_var = tk.StringVar()
+        self.min_rating_var = tk.StringVar(value="0")
+        self.director_var = tk.StringVar()
+        
+        range_fields = [
+            ("Ano de:", self.year_from_var, 6),
+            ("até:", self.year_to_var, 6),
+            ("Diretor:", self.director_var, 18)
+        ]
+        
+        for text, var, width in range_fields:
+            ttk.Label(range_frame, text=text).pack(side=tk.LEFT, padx=(0, 5))
+            entry = ttk.Entry(range_frame, textvariable=var, width=width)
+            entry.pack(side=tk.LEFT, padx=(0, 10))
+            entry.bind('<Return>', lambda event: self.apply_filters())
+        
+        ttk.Label(range_frame, text="Nota mínima:").pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Spinbox(range_frame, from_=0, to=5, increment=0.5,
+                   textvariable=self.min_rating_var, width=5,
+                   command=self.apply_filters).pack(side=tk.LEFT, padx=(0, 10))
+        
+        ttk.Button(range_frame, text="Aplicar",
+                  command=self.apply_filters).pack(side=tk.LEFT)
+        
         # ========== TABELA DE DADOS ==========
         table_frame = ttk.Frame(content_frame)
         table_frame.pack(fill=tk.BOTH, expand=True)
@@ -205,12 +271,12 @@ class TrackFlixGUI:
             self.tree.column(col, width=column_widths.get(col, 100))
         
         # Scrollbar
-        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.on_tree_scroll)
         
         # Posicionar
         self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
         
         # Configurar expansão
         table_frame.columnconfigure(0, weight=1)
@@ -226,6 +292,9 @@ class TrackFlixGUI:
         self.status_label = ttk.Label(status_frame, text="Pronto")
         self.status_label.pack(side=tk.LEFT)
         
+        # Indicador de atividade (visível só com consultas em andamento)
+        self.busy_bar = ttk.Progressbar(status_frame, mode='indeterminate', length=80)
+        
         # Botões de ação na barra de status
         btn_frame = ttk.Frame(status_frame)
         btn_frame.pack(side=tk.RIGHT)
@@ -243,29 +312,26 @@ class TrackFlixGUI:
                   command=self.rate_selected).pack(side=tk.LEFT, padx=2)
     
     def refresh_data(self):
-        """Atualiza todos os dados na interface."""
-        try:
-            # Atualizar estatísticas
-            self.update_stats()
-            
-            # Atualizar lista baseado na view atual
-            if self.current_view == "movies":
-                self.show_movies()
-            elif self.current_view == "series":
-                self.show_series()
-            elif self.current_view == "stats":
-                self.show_statistics()
-            
-            self.set_status("Dados atualizados com sucesso!")
-            
-        except Exception as e:
-            self.set_status(f"Erro ao atualizar: {e}", error=True)
+        """Atualiza todos os dados na interface.
+        
+        As consultas rodam em segundo plano; cada parte da tela é
+        atualizada quando o seu resultado chega.
+        """
+        # Os dados podem ter mudado: não refinar a partir da busca anterior
+        self.last_search = None
+        
+        # Atualizar estatísticas
+        self.update_stats()
+        
+        # Atualizar lista baseado na view atual
+        if self.current_view in ("movies", "series"):
+            self.reload_listing()
+        elif self.current_view == "stats":
+            self.show_statistics()
     
     def update_stats(self):
         """Atualiza as estatísticas no cabeçalho."""
-        try:
-            stats = self.service.get_statistics()
-            
+        def show(stats):
             stats_text = (
                 f"🎬 Filmes: {stats['movies']} | "
                 f"📺 Séries: {stats['series']} | "
@@ -274,102 +340,196 @@ class TrackFlixGUI:
             )
             
             self.stats_label.config(text=stats_text)
-            
-        except Exception as e:
+        
+        def failed(e):
             self.stats_label.config(text="Erro ao carregar estatísticas")
+        
+        self.runner.submit('stats', self.service.get_statistics, show, failed)
     
     def show_movies(self):
         """Mostra a lista de filmes."""
-        self.current_view = "movies"
-        self.clear_table()
-        
-        try:
-            movies = self.service.get_all_movies()
-            
-            if not movies:
-                self.set_status("Nenhum filme cadastrado")
-                return
-            
-            for movie in movies:
-                # Aplicar filtros
-                if not self.passes_filters(movie):
-                    continue
-                
-                # Formatar avaliação
-                rating = movie.get('rating', 0)
-                rating_text = f"⭐ {rating}" if rating > 0 else "Sem avaliação"
-                
-                # Detalhes
-                details = f"{movie.get('duration', 'N/A')}min"
-                if movie.get('director'):
-                    details += f" | {movie['director']}"
-                
-                # Adicionar à tabela
-                self.tree.insert('', tk.END, values=(
-                    movie['id'],
-                    movie['title'][:40],  # Limitar tamanho
-                    movie['year'],
-                    movie['status'],
-                    rating_text,
-                    details
-                ))
-            
-            self.set_status(f"{len(movies)} filmes encontrados")
-            
-        except Exception as e:
-            self.set_status(f"Erro ao carregar filmes: {e}", error=True)
+        self.show_listing("movies")
     
     def show_series(self):
         """Mostra a lista de séries."""
-        self.current_view = "series"
-        self.clear_table()
+        self.show_listing("series")
+    
+    def show_listing(self, view):
+        """Troca para a listagem de filmes ou séries."""
+        if self.current_view != view:
+            self.current_view = view
+            self.loaded_count = 0
+        self.reload_listing()
+    
+    def listing_source(self):
+        """Tipo de mídia e rótulos da listagem atual."""
+        if self.current_view == "movies":
+            return "movie", "filmes carregados", "Nenhum filme cadastrado"
+        return "series", "séries carregadas", "Nenhuma série cadastrada"
+    
+    def listing_query(self, media_type):
+        """Monta a consulta da listagem a partir dos filtros da tela.
+        
+        Retorna a consulta e se algum filtro está ativo. Lê os widgets,
+        então deve ser chamada na thread do Tk.
+        """
+        query = MediaQuery(media_type)
+        filtered = False
+        
+        status = self.STATUS_FILTERS.get(self.status_filter.get())
+        if status:
+            query.with_status(status)
+            filtered = True
+        
+        year_from = self.year_from_var.get().strip()
+        year_to = self.year_to_var.get().strip()
+        if year_from.isdigit() or year_to.isdigit():
+            query.year_between(int(year_from) if year_from.isdigit() else None,
+                               int(year_to) if year_to.isdigit() else None)
+            filtered = True
         
         try:
-            series_list = self.service.get_all_series()
-            
-            if not series_list:
-                self.set_status("Nenhuma série cadastrada")
-                return
-            
-            for series in series_list:
-                # Aplicar filtros
-                if not self.passes_filters(series):
-                    continue
-                
-                # Calcular progresso
-                total_eps = series['total_seasons'] * series['total_episodes']
-                watched_eps = ((series['current_season'] - 1) * series['total_episodes']) + series['current_episode']
-                progress = (watched_eps / total_eps * 100) if total_eps > 0 else 0
-                
-                # Formatar avaliação
-                rating = series.get('rating', 0)
-                rating_text = f"⭐ {rating}" if rating > 0 else "Sem avaliação"
-                
-                # Detalhes
-                details = f"T{series['current_season']}E{series['current_episode']} ({progress:.1f}%)"
-                
-                # Adicionar à tabela
-                self.tree.insert('', tk.END, values=(
-                    series['id'],
-                    series['title'][:40],  # Limitar tamanho
-                    series['year'],
-                    series['status'],
-                    rating_text,
-                    details
-                ))
+            min_rating = float(self.min_rating_var.get() or 0)
+        except ValueError:
+            min_rating = 0
+        if min_rating > 0:
+            query.rating_between(min_rating)
+            filtered = True
+        
+        director = self.director_var.get().strip()
+        if director:
+            query.directed_by(director)
+            filtered = True
+        
+        return query, filtered
+    
+    def fetch_rows(self, query, after, limit):
+        """Busca ``limit`` linhas de ``query`` a partir de ``after``.
+        
+        Os filtros são aplicados pelo banco; retorna as linhas formatadas
+        como (iid, valores) e o cursor para continuar depois delas.
+        """
+        row_values = self.movie_row_values if query.media_type == "movie" else self.series_row_values
+        page = self.service.find_page(query, after=after, limit=limit)
+        rows = [(f"{query.media_type}:{item.id}", row_values(item))
+                for item in page['items']]
+        return rows, page['next']
+    
+    def reload_listing(self):
+        """Recarrega a listagem atual alterando só as linhas que mudaram.
+        
+        Mantém carregadas tantas linhas quanto já estavam na tabela, para
+        preservar a rolagem e a seleção após uma edição. Substitui
+        qualquer carregamento da tabela ainda em andamento.
+        """
+        media_type, label, empty = self.listing_source()
+        query, filtered = self.listing_query(media_type)
+        if filtered:
+            empty = "Nenhum resultado para os filtros selecionados"
+        minimum = max(self.loaded_count, int(self.tree.cget('height')))
+        
+        def show(result):
+            self.loading_page = False
+            rows, self.next_cursor = result
+            self.sync_table(rows)
+            self.loaded_count = len(rows)
             
-            self.set_status(f"{len(series_list)} séries encontradas")
+            if not rows and not self.next_cursor:
+                self.set_status(empty)
+            else:
+                more = " (role para carregar mais)" if self.next_cursor else ""
+                self.set_status(f"{self.loaded_count} {label}{more}")
+        
+        self.loading_page = True
+        self.listing_filter = query
+        self.runner.submit('table', lambda: self.fetch_rows(query, None, minimum),
+                           show, self.on_table_error)
+    
+    def load_next_page(self):
+        """Busca a próxima página da view atual e a adiciona à tabela."""
+        if (self.loading_page or not self.next_cursor
+                or self.current_view not in ("movies", "series")):
+            return
+        
+        # Continua a mesma consulta que gerou o cursor
+        query = self.listing_filter
+        after = self.next_cursor
+        _, label, _ = self.listing_source()
+        
+        def show(result):
+            self.loading_page = False
+            rows, self.next_cursor = result
+            self.append_rows(rows)
+            self.loaded_count += len(rows)
             
-        except Exception as e:
-            self.set_status(f"Erro ao carregar séries: {e}", error=True)
+            more = " (role para carregar mais)" if self.next_cursor else ""
+            self.set_status(f"{self.loaded_count} {label}{more}")
+        
+        self.loading_page = True
+        self.runner.submit('table', lambda: self.fetch_rows(query, after, self.PAGE_SIZE),
+                           show, self.on_table_error)
+    
+    def on_table_error(self, error):
+        """Falha ao carregar o conteúdo da tabela."""
+        self.loading_page = False
+        self.set_status(f"Erro ao carregar dados: {error}", error=True)
+    
+    def on_tree_scroll(self, first, last):
+        """Atualiza a barra de rolagem e carrega mais linhas perto do fim."""
+        self.scrollbar.set(first, last)
+        if float(last) >= 0.95 and self.next_cursor and not self.loading_page:
+            self.root.after_idle(self.load_next_page)
+    
+    def movie_row_values(self, movie):
+        """Valores de uma linha de filme na tabela."""
+        # Formatar avaliação
+        rating_text = f"⭐ {movie.rating}" if movie.rating > 0 else "Sem avaliação"
+        
+        # Detalhes
+        details = f"{movie.duration or 'N/A'}min"
+        if movie.director:
+            details += f" | {movie.director}"
+        
+        return (
+            movie.id,
+            movie.title[:40],  # Limitar tamanho
+            movie.year,
+            movie.status.value,
+            rating_text,
+            details
+        )
+    
+    def series_row_values(self, series):
+        """Valores de uma linha de série na tabela."""
+        # Formatar avaliação
+        rating_text = f"⭐ {series.rating}" if series.rating > 0 else "Sem avaliação"
+        
+        # Detalhes
+        details = (f"T{series.current_season}E{series.current_episode}"
+                   f" ({series.progress_percentage:.1f}%)")
+        
+        return (
+            series.id,
+            series.title[:40],  # Limitar tamanho
+            series.year,
+            series.status.value,
+            rating_text,
+            details
+        )
     
     def show_statistics(self):
         """Mostra estatísticas detalhadas."""
         self.current_view = "stats"
-        self.clear_table()
+        self.next_cursor = None
+        self.loading_page = False
         
-        try:
+        def load():
             stats = self.service.get_statistics()
+            details = self.service.get_detailed_statistics() if stats['total'] else None
+            return stats, details
+        
+        def show(result):
+            stats, details = result
             
             # Criar uma visualização simples das estatísticas
             stat_items = [
@@ -381,62 +541,139 @@ class TrackFlixGUI:
                 ("📅 PLANEJADOS", stats['planejado'])
             ]
             
-            for label, value in stat_items:
-                self.tree.insert('', tk.END, values=(label, value, "", "", "", ""))
-            
             # Adicionar taxa de conclusão
             if stats['total'] > 0:
                 completion_rate = (stats['concluido'] / stats['total']) * 100
-                self.tree.insert('', tk.END, values=("📈 TAXA DE CONCLUSÃO", f"{completion_rate:.1f}%", "", "", "", ""))
+                stat_items.append(("📈 TAXA DE CONCLUSÃO", f"{completion_rate:.1f}%"))
             
-            self.set_status("Estatísticas carregadas")
+            if details:
+                stat_items.extend(self.detailed_stat_items(details))
             
-        except Exception as e:
+            self.sync_table([
+                (f"stat:{i}", (label, value, "", "", "", ""))
+                for i, (label, value) in enumerate(stat_items)
+            ])
+            
+            self.set_status("Estatísticas carregadas")
+        
+        def failed(e):
             self.set_status(f"Erro ao carregar estatísticas: {e}", error=True)
+        
+        self.runner.submit('table', load, show, failed)
+    
+    def detailed_stat_items(self, details):
+        """Linhas (rótulo, valor) das estatísticas detalhadas."""
+        watch = details['watch_time']
+        items = [
+            ("⏱️ TEMPO ASSISTIDO", format_minutes(watch['watched_minutes'])),
+            ("   🎬 Filmes", format_minutes(watch['movie_minutes'])),
+            ("   📺 Séries", format_minutes(watch['series_minutes'])),
+            ("⌛ TEMPO RESTANTE", format_minutes(watch['remaining_minutes'])),
+            ("📺 EPISÓDIOS", f"{watch['watched_episodes']}/{watch['episodes']}"),
+        ]
+        
+        ratings = details['ratings']
+        if ratings['rated']:
+            items.append(("⭐ NOTA MÉDIA", f"{ratings['average']} (mediana {ratings['median']})"))
+            items.extend((f"   {stars}★", count)
+                         for stars, count in ratings['distribution'].items())
+        
+        for decade in details['by_decade']:
+            items.append((f"📅 {decade['decade']}s",
+                          f"{decade['count']} ({decade['completion_rate'] * 100:.0f}% concluído)"))
+        
+        for genre in details['by_genre'][:self.TOP_GENRES]:
+            average = f", ⭐ {genre['average_rating']}" if genre['average_rating'] else ""
+            items.append((f"🎭 {genre['genre']}",
+                          f"{genre['count']} ({genre['completion_rate'] * 100:.0f}% concluído{average})"))
+        return items
     
     def show_search(self):
         """Mostra tela de busca."""
-        # Para simplificar, vamos usar um dialog
-        search_term = self.search_var.get()
+        search_term = self.search_var.get().strip()
         
         if not search_term:
             messagebox.showinfo("Busca", "Digite um termo para buscar")
             return
         
-        self.clear_table()
-        
-        try:
-            # Buscar em filmes
-            movies = self.service.get_all_movies()
-            series = self.service.get_all_series()
-            
-            results = []
-            for movie in movies:
-                if search_term.lower() in movie['title'].lower():
-                    results.append(('🎬', movie))
-            
-            for serie in series:
-                if search_term.lower() in serie['title'].lower():
-                    results.append(('📺', serie))
+        self.cancel_scheduled_search()
+        self.run_search(search_term)
+    
+    def run_search(self, search_term):
+        """Busca ``search_term`` e mostra os resultados na tabela.
+        
+        Se o termo só acrescenta letras à última busca e ela trouxe todos
+        os resultados (menos que ``SEARCH_LIMIT``), os novos resultados
+        são um subconjunto dos anteriores: basta filtrá-los, sem ir ao
+        banco. Sem nenhum resultado, mostra os títulos parecidos da busca
+        aproximada (``fuzzy_search``). O tempo de cada busca aparece na
+        barra de status.
+        """
+        self.search_after_id = None
+        self.next_cursor = None
+        self.loading_page = False
+        started = time.perf_counter()
+        
+        def show(results, narrowed=False, fuzzy=False):
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            # Os refinamentos filtram a busca exata, mesmo vazia, nunca a aproximada
+            if not fuzzy:
+                if len(results) < self.SEARCH_LIMIT:
+                    self.last_search = (search_term.casefold(), results)
+                else:
+                    self.last_search = None
             
-            if not results:
-                self.set_status(f"Nenhum resultado para '{search_term}'")
+            if not results and not fuzzy:
+                self.runner.submit('table', lambda: self.service.fuzzy_search(
+                    search_term, limit=self.SEARCH_LIMIT), lambda found: show(found, fuzzy=True),
+                    failed)
                 return
             
-            for media_type, item in results:
-                self.tree.insert('', tk.END, values=(
-                    media_type,
-                    item['title'][:40],
-                    item['year'],
-                    item['status'],
-                    f"⭐ {item.get('rating', 0)}" if item.get('rating', 0) > 0 else "Sem avaliação",
+            self.sync_table([
+                (f"{item.type.value}:{item.id}", (
+                    '🎬' if item.type is MediaType.MOVIE else '📺',
+                    item.title[:40],
+                    item.year,
+                    item.status.value,
+                    f"⭐ {item.rating}" if item.rating > 0 else "Sem avaliação",
                     "Clique para detalhes"
                 ))
+                for item in results
+            ])
             
-            self.set_status(f"{len(results)} resultados encontrados para '{search_term}'")
+            source = "aproximada" if fuzzy else "filtrado" if narrowed else "banco"
+            timing = f" ({elapsed_ms:.0f} ms, {source})"
             
-        except Exception as e:
+            if not results:
+                self.set_status(f"Nenhum resultado para '{search_term}'{timing}")
+                return
+            
+            if fuzzy:
+                self.set_status(f"Nenhum resultado exato para '{search_term}'; "
+                                f"{len(results)} títulos parecidos{timing}")
+                return
+            
+            self.set_status(f"{len(results)} resultados encontrados para '{search_term}'{timing}")
+        
+        def failed(e):
             self.set_status(f"Erro na busca: {e}", error=True)
+        
+        previous = self.last_search
+        if previous and search_term.casefold().startswith(previous[0]):
+            # Refinamento: a busca no banco em andamento fica obsoleta
+            self.runner.cancel('table')
+            show([item for item in previous[1]
+                  if self.service.matches_search(item, search_term)], narrowed=True)
+            return
+        
+        self.runner.submit('table', lambda: self.service.search(search_term, limit=self.SEARCH_LIMIT),
+                           show, failed)
+    
+    def cancel_scheduled_search(self):
+        """Cancela a busca agendada pela digitação, se houver."""
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+            self.search_after_id = None
     
     def add_movie_dialog(self):
         """Abre diálogo para adicionar filme."""
@@ -546,12 +783,16 @@ class TrackFlixGUI:
             movie.comment = comment
             
             # Salvar
-            if self.service.add_movie(movie):
-                messagebox.showinfo("Sucesso", f"Filme '{title}' adicionado!")
-                dialog.destroy()
-                self.refresh_data()
-            else:
-                messagebox.showerror("Erro", "Não foi possível salvar o filme.")
+            def saved(success):
+                if success:
+                    messagebox.showinfo("Sucesso", f"Filme '{title}' adicionado!")
+                    dialog.destroy()
+                    self.refresh_data()
+                else:
+                    messagebox.showerror("Erro", "Não foi possível salvar o filme.")
+            
+            self.runner.submit(None, lambda: self.service.add_movie(movie), saved,
+                               lambda e: messagebox.showerror("Erro", f"Erro ao salvar: {e}"))
         
         except ValueError as e:
             messagebox.showerror("Erro de Validação", f"Dados inválidos: {e}")
@@ -675,32 +916,49 @@ class TrackFlixGUI:
             series.comment = comment
             
             # Salvar
-            if self.service.add_series(series):
-                messagebox.showinfo("Sucesso", f"Série '{title}' adicionada!")
-                dialog.destroy()
-                self.refresh_data()
-            else:
-                messagebox.showerror("Erro", "Não foi possível salvar a série.")
+            def saved(success):
+                if success:
+                    messagebox.showinfo("Sucesso", f"Série '{title}' adicionada!")
+                    dialog.destroy()
+                    self.refresh_data()
+                else:
+                    messagebox.showerror("Erro", "Não foi possível salvar a série.")
+            
+            self.runner.submit(None, lambda: self.service.add_series(series), saved,
+                               lambda e: messagebox.showerror("Erro", f"Erro ao salvar: {e}"))
         
         except ValueError as e:
             messagebox.showerror("Erro de Validação", f"Dados inválidos: {e}")
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao salvar: {e}")
     
-    def edit_selected(self):
-        """Edita o item selecionado."""
+    def selected_media(self):
+        """Tipo, id e título da mídia selecionada (ou None).
+        
+        Lidos do iid da linha, o que funciona em qualquer view,
+        inclusive na busca, onde a primeira coluna mostra o tipo.
+        """
         selection = self.tree.selection()
         if not selection:
+            return None
+        
+        media_type, _, media_id = selection[0].partition(':')
+        if media_type not in ("movie", "series"):
+            return None
+        
+        return media_type, int(media_id), self.table_rows[selection[0]][1]
+    
+    def edit_selected(self):
+        """Edita o item selecionado."""
+        if not self.tree.selection():
             messagebox.showwarning("Aviso", "Selecione um item para editar.")
             return
         
-        item = self.tree.item(selection[0])
-        values = item['values']
-        
-        if not values or len(values) < 1:
+        selected = self.selected_media()
+        if not selected:
             return
         
-        item_id = values[0]
+        _, item_id, _ = selected
         
         # Aqui você implementaria a edição
         messagebox.showinfo("Editar", f"Editar item ID: {item_id}")
@@ -708,19 +966,15 @@ class TrackFlixGUI:
     
     def delete_selected(self):
         """Remove o item selecionado."""
-        selection = self.tree.selection()
-        if not selection:
+        if not self.tree.selection():
             messagebox.showwarning("Aviso", "Selecione um item para remover.")
             return
         
-        item = self.tree.item(selection[0])
-        values = item['values']
-        
-        if not values or len(values) < 2:
+        selected = self.selected_media()
+        if not selected:
             return
         
-        item_id = values[0]
-        item_name = values[1]
+        _, item_id, item_name = selected
         
         # Confirmar
         confirm = messagebox.askyesno(
@@ -729,31 +983,27 @@ class TrackFlixGUI:
         )
         
         if confirm:
-            try:
-                success = self.service.delete_media(item_id)
+            def removed(success):
                 if success:
-                    self.set_status(f"'{item_name}' removido com sucesso!")
                     self.refresh_data()
+                    self.set_status(f"'{item_name}' removido com sucesso!")
                 else:
                     messagebox.showerror("Erro", "Não foi possível remover o item.")
-            except Exception as e:
-                messagebox.showerror("Erro", f"Erro ao remover: {e}")
+            
+            self.runner.submit(None, lambda: self.service.delete_media(item_id), removed,
+                               lambda e: messagebox.showerror("Erro", f"Erro ao remover: {e}"))
     
     def rate_selected(self):
         """Avalia o item selecionado."""
-        selection = self.tree.selection()
-        if not selection:
+        if not self.tree.selection():
             messagebox.showwarning("Aviso", "Selecione um item para avaliar.")
             return
         
-        item = self.tree.item(selection[0])
-        values = item['values']
-        
-        if not values or len(values) < 1:
+        selected = self.selected_media()
+        if not selected:
             return
         
-        item_id = values[0]
-        item_name = values[1]
+        media_type, item_id, item_name = selected
         
         # Diálogo de avaliação
         dialog = tk.Toplevel(self.root)
@@ -789,23 +1039,27 @@ class TrackFlixGUI:
         ttk.Button(button_frame, text="Cancelar",
                   command=dialog.destroy).pack(side=tk.LEFT, padx=5)
         
+        def saved(success):
+            if success:
+                messagebox.showinfo("Sucesso", "Avaliação salva!")
+                dialog.destroy()
+                self.refresh_data()
+            else:
+                messagebox.showerror("Erro", "Não foi possível salvar a avaliação.")
+        
         def save_rating():
             try:
                 rating = rating_var.get()
                 comment = comment_text.get("1.0", tk.END).strip()
                 
                 # Determinar tipo
-                if self.current_view == "movies":
-                    success = self.service.update_movie_rating(item_id, rating, comment)
+                if media_type == "movie":
+                    update = self.service.update_movie_rating
                 else:
-                    success = self.service.update_series_rating(item_id, rating, comment)
+                    update = self.service.update_series_rating
                 
-                if success:
-                    messagebox.showinfo("Sucesso", "Avaliação salva!")
-                    dialog.destroy()
-                    self.refresh_data()
-                else:
-                    messagebox.showerror("Erro", "Não foi possível salvar a avaliação.")
+                self.runner.submit(None, lambda: update(item_id, rating, comment), saved,
+                                   lambda e: messagebox.showerror("Erro", f"Erro ao salvar: {e}"))
                     
             except Exception as e:
                 messagebox.showerror("Erro", f"Erro ao salvar: {e}")
@@ -829,63 +1083,170 @@ class TrackFlixGUI:
         """Aplica os filtros selecionados."""
         self.refresh_data()
     
-    def passes_filters(self, item):
-        """Verifica se o item passa pelos filtros."""
-        status = self.status_filter.get()
-        
-        if status == "all":
-            return True
-        
-        item_status = item.get('status', '').lower()
-        
-        if status == "watching" and "assistindo" in item_status:
-            return True
-        elif status == "completed" and "concluído" in item_status:
-            return True
-        elif status == "planned" and "planejado" in item_status:
-            return True
-        
-        return False
-    
     def on_search_changed(self, *args):
-        """Quando o texto da busca muda."""
+        """Quando o texto da busca muda.
+        
+        Espera ``search_debounce_ms`` sem digitação antes de buscar; cada
+        tecla reinicia a espera e descarta a busca em andamento, que já
+        não corresponde ao texto.
+        """
         search_term = self.search_var.get().strip()
         
+        self.cancel_scheduled_search()
+        
         if len(search_term) >= 2:  # Buscar apenas com 2+ caracteres
-            self.show_search()
+            self.runner.cancel('table')
+            self.search_after_id = self.root.after(
+                self.search_debounce_ms, lambda: self.run_search(search_term))
         elif not search_term:
             self.refresh_data()
     
     def clear_search(self):
         """Limpa a busca."""
+        self.cancel_scheduled_search()
         self.search_var.set("")
         self.refresh_data()
     
     def clear_table(self):
         """Limpa a tabela."""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.next_cursor = None
+        self.tree.delete(*self.tree.get_children())
+        self.table_rows = {}
+        self.table_order = []
+    
+    def sync_table(self, rows):
+        """Deixa a tabela igual a ``rows`` aplicando só as diferenças.
+        
+        ``rows`` é uma lista de (iid, valores) na ordem desejada. Linhas
+        que sumiram são removidas, as novas inseridas, as que mudaram de
+        posição movidas e só as com valores diferentes reescritas; as
+        demais não são tocadas, preservando rolagem e seleção.
+        """
+        wanted = {iid for iid, _ in rows}
+        stale = [iid for iid in self.table_order if iid not in wanted]
+        if stale:
+            self.tree.delete(*stale)
+            for iid in stale:
+                del self.table_rows[iid]
+        
+        order = [iid for iid in self.table_order if iid in wanted]
+        
+        for index, (iid, values) in enumerate(rows):
+            current = self.table_rows.get(iid)
+            
+            if current is None:
+                self.tree.insert('', index, iid=iid, values=values)
+                order.insert(index, iid)
+            else:
+                if current != values:
+                    self.tree.item(iid, values=values)
+                if order[index] != iid:
+                    self.tree.move(iid, '', index)
+                    order.remove(iid)
+                    order.insert(index, iid)
+            
+            self.table_rows[iid] = values
+        
+        self.table_order = order
+    
+    def append_rows(self, rows):
+        """Adiciona linhas ao fim da tabela (páginas seguintes)."""
+        for iid, values in rows:
+            if iid in self.table_rows:
+                continue
+            self.tree.insert('', tk.END, iid=iid, values=values)
+            self.table_rows[iid] = values
+            self.table_order.append(iid)
     
     def set_status(self, message, error=False):
         """Define mensagem na barra de status."""
         color = "red" if error else "black"
         self.status_label.config(text=message, foreground=color)
     
+    def set_busy(self, busy):
+        """Mostra ou esconde o indicador de consultas em andamento."""
+        if busy:
+            self.busy_bar.pack(side=tk.LEFT, padx=10)
+            self.busy_bar.start(15)
+        else:
+            self.busy_bar.stop()
+            self.busy_bar.pack_forget()
+    
     def export_data(self):
-        """Exporta dados para CSV."""
-        try:
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".csv",
-                filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
-                initialfile=f"trackflix_export_{datetime.now().strftime('%Y%m%d')}.csv"
-            )
-            
-            if filename:
-                # TODO: Implementar exportação
-                messagebox.showinfo("Exportar", f"Dados exportados para:\n{filename}")
-                
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao exportar: {e}")
+        """Exporta o acervo para CSV ou JSON Lines, com barra de progresso.
+        
+        A exportação roda fora da thread do Tk; o diálogo mostra o
+        andamento e permite cancelar (nenhum arquivo é criado nesse caso).
+        """
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"),
+                       ("CSV compactado", "*.csv.gz"),
+                       ("JSON Lines", "*.jsonl"),
+                       ("JSON Lines compactado", "*.jsonl.gz"),
+                       ("All files", "*.*")],
+            initialfile=f"trackflix_export_{datetime.now().strftime('%Y%m%d')}.csv"
+        )
+        if not filename:
+            return
+        
+        cancel = threading.Event()
+        self.export_cancel = cancel
+        progress = {'done': 0, 'total': None}  # Escrito pela thread da exportação
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("📤 Exportar")
+        dialog.geometry("420x150")
+        dialog.transient(self.root)
+        dialog.grab_set()
+        dialog.protocol("WM_DELETE_WINDOW", cancel.set)
+        
+        container = ttk.Frame(dialog, padding="20")
+        container.pack(fill=tk.BOTH, expand=True)
+        
+        label_var = tk.StringVar(value="Preparando exportação...")
+        ttk.Label(container, textvariable=label_var).pack(anchor=tk.W)
+        bar = ttk.Progressbar(container, mode='determinate', maximum=100)
+        bar.pack(fill=tk.X, pady=10)
+        cancel_button = ttk.Button(container, text="Cancelar", command=cancel.set)
+        cancel_button.pack()
+        
+        def report(done, total):
+            progress['done'] = done
+            progress['total'] = total
+        
+        def update_progress():
+            if not dialog.winfo_exists():
+                return
+            done, total = progress['done'], progress['total']
+            if cancel.is_set():
+                label_var.set("Cancelando...")
+                cancel_button.state(['disabled'])
+            elif total:
+                bar['value'] = min(done / total * 100, 100)
+                label_var.set(f"{done:,} de {total:,} mídias")
+            else:
+                label_var.set(f"{done:,} mídias")
+            dialog.after(self.EXPORT_POLL_MS, update_progress)
+        
+        def finished(count):
+            self.export_cancel = None
+            dialog.destroy()
+            self.set_status(f"{count} mídia(s) exportada(s) para {os.path.basename(filename)}")
+            messagebox.showinfo("Exportar", f"{count} mídia(s) exportada(s) para:\n{filename}")
+        
+        def failed(e):
+            self.export_cancel = None
+            dialog.destroy()
+            if isinstance(e, ExportCancelled):
+                self.set_status("Exportação cancelada")
+            else:
+                self.set_status(f"Erro ao exportar: {e}", error=True)
+                messagebox.showerror("Erro", f"Erro ao exportar: {e}")
+        
+        update_progress()
+        self.runner.submit('export', lambda: self.service.export(
+            filename, progress=report, cancelled=cancel.is_set), finished, failed)
     
     def show_settings(self):
         """Mostra configurações."""
@@ -894,4 +1255,10 @@ class TrackFlixGUI:
     
     def run(self):
         """Executa a interface gráfica."""
-        self.root.mainloop()
\ No newline at end of file
+        try:
+            self.root.mainloop()
+        finally:
+            if self.export_cancel is not None:
+                self.export_cancel.set()  # Não deixa arquivo pela metade
+            self.runner.shutdown()
+            self.service.flush_watch_events()
\ No newline at end of file
@@ -0,0 +1,104 @@
+# app/ui/worker.py
+import queue
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+class BackgroundRunner:
+    """Executa chamadas ao serviço fora da thread do Tk.
+
+    As funções rodam em um pool de threads; os resultados voltam por uma
+    fila lida na thread do Tk via ``root.after``, então os callbacks
+    podem mexer nos widgets com segurança.
+
+    Cada chamada pertence a um canal (``'listing'``, ``'search'``...).
+    Um novo envio no mesmo canal torna obsoletos os anteriores: os que
+    ainda não começaram nem chegam a rodar, e os que já estão rodando têm
+    o resultado descartado. Chamadas sem canal (escritas) nunca são
+    descartadas.
+    """
+
+    POLL_MS = 16  # ~60 quadros por segundo
+
+    def __init__(self, root, max_workers: int = 2,
+                 on_busy_change: Optional[Callable[[bool], None]] = None):
+        self.root = root
+        self.on_busy_change = on_busy_change
+        self.pending = 0
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="trackflix-db")
+        self._results = queue.SimpleQueue()
+        self._generations = {}
+        self._futures = {}  # canal -> última chamada enviada
+        self._polling = False
+
+    def submit(self, channel: Optional[str], func: Callable[[], Any],
+               on_success: Callable[[Any], None],
+               on_error: Optional[Callable[[Exception], None]] = None) -> int:
+        """Agenda ``func`` em segundo plano e retorna sua geração no canal."""
+        if channel is not None:
+            self.cancel(channel)  # Também avança a geração do canal
+        generation = self._generations.get(channel, 0)
+
+        self.pending += 1
+        if self.pending == 1 and self.on_busy_change:
+            self.on_busy_change(True)
+
+        future = self._executor.submit(func)
+        if channel is not None:
+            self._futures[channel] = future
+        future.add_done_callback(
+            lambda f: self._results.put((channel, generation, f, on_success, on_error))
+        )
+
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.POLL_MS, self._drain)
+        return generation
+
+    def cancel(self, channel: str):
+        """Cancela a chamada pendente do canal e descarta seu resultado."""
+        self._generations[channel] = self._generations.get(channel, 0) + 1
+        future = self._futures.pop(channel, None)
+        if future is not None:
+            future.cancel()  # Sem efeito se já estiver rodando
+
+    def is_current(self, channel: str, generation: int) -> bool:
+        """Indica se ``generation`` ainda é a chamada mais recente do canal."""
+        return self._generations.get(channel, 0) == generation
+
+    def _drain(self):
+        """Entrega na thread do Tk os resultados já prontos."""
+        while True:
+            try:
+                channel, generation, future, on_success, on_error = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            self.pending -= 1
+            if future.cancelled():
+                continue
+            if channel is not None and not self.is_current(channel, generation):
+                continue  # Resposta obsoleta: já existe uma mais nova
+
+            # Um callback com erro não pode interromper a entrega dos demais
+            try:
+                error = future.exception()
+                if error is None:
+                    on_success(future.result())
+                elif on_error:
+                    on_error(error)
+            except Exception:
+                traceback.print_exc()
+
+        if self.pending:
+            self.root.after(self.POLL_MS, self._drain)
+        else:
+            self._polling = False
+            if self.on_busy_change:
+                self.on_busy_change(False)
+
+    def shutdown(self):
+        """Encerra o pool sem esperar pelas chamadas em andamento."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
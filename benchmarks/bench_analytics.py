@@ -0,0 +1,53 @@
+"""Mede o tempo de ``get_detailed_statistics`` em um acervo grande.
+
+Separa a leitura das colunas do banco (``load_columns``) do cálculo
+vetorizado (``compute_statistics``).
+
+Uso:
+    python benchmarks/bench_analytics.py [quantidade]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.db import Database
+from app.services import analytics
+from app.services.media_service import MediaService
+from bench_bulk_import import generate_movies, generate_series
+
+# Meta para o cálculo completo (leitura + NumPy) com 1 milhão de linhas
+TARGET_SECONDS = 1.0
+
+
+def timed(label: str, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24} {elapsed:8.3f}s")
+    return result, elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with Database(os.path.join(tmp, "bench.db")) as db:
+            service = MediaService(db, cache_size=None)
+            service.add_movies_bulk(generate_movies(count // 2))
+            service.add_series_bulk(generate_series(count - count // 2))
+            print(f"{count} mídias\n")
+
+            columns, load_time = timed("leitura das colunas", lambda: analytics.load_columns(db))
+            _, compute_time = timed("cálculo (NumPy)", lambda: analytics.compute_statistics(columns))
+            _, total = timed("get_detailed_statistics", service.get_detailed_statistics)
+
+            target = TARGET_SECONDS * count / 1_000_000
+            status = "✅" if total <= target else "⚠️"
+            print(f"\n{status} meta: {target:.3f}s para {count} mídias")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Mede quantas leituras por segundo o servidor HTTP atende.
+
+Sobe o ``TrackFlixServer`` em uma porta livre sobre um acervo sintético
+e dispara requisições GET com vários clientes keep-alive em paralelo,
+com e sem ``If-None-Match``. Os clientes rodam no mesmo processo que o
+servidor, então o número medido é um limite inferior.
+
+Uso:
+    python benchmarks/bench_api.py [quantidade] [clientes] [segundos]
+"""
+import http.client
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.api.server import TrackFlixServer
+from app.database.db import Database
+from app.services.media_service import MediaService
+from dataset import populate
+
+PATHS = ("/api/movies?limit=50", "/api/series?limit=50&order=rating&desc=1",
+         "/api/stats", "/api/search?q=caminho", "/api/media/1")
+
+
+def client(port: int, deadline: float, conditional: bool, counts: list):
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    etags = {}
+    done = 0
+    while time.perf_counter() < deadline:
+        path = PATHS[done % len(PATHS)]
+        headers = {'Accept-Encoding': 'gzip'}
+        if conditional and path in etags:
+            headers['If-None-Match'] = etags[path]
+        conn.request('GET', path, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        etags[path] = response.getheader('ETag')
+        done += 1
+    conn.close()
+    counts.append(done)
+
+
+def run(port: int, clients: int, seconds: float, conditional: bool) -> float:
+    counts = []
+    deadline = time.perf_counter() + seconds
+    threads = [threading.Thread(target=client, args=(port, deadline, conditional, counts))
+               for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / seconds
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with Database(os.path.join(tmp, "bench_api.db")) as db:
+            service = MediaService(db)
+            populate(service, count)
+
+            server = TrackFlixServer(service, port=0, workers=clients)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            try:
+                for conditional in (False, True):
+                    rate = run(server.server_port, clients, seconds, conditional)
+                    label = "com If-None-Match" if conditional else "respostas completas"
+                    print(f"{label:<22} {clients} clientes: {rate:8.0f} req/s")
+            finally:
+                server.shutdown()
+                server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Mede o AsyncMediaService com 1, 8 e 64 chamadores concorrentes.
+
+Cada chamador é uma tarefa asyncio que repete uma mistura de leituras
+(página, busca, item, estatísticas) com uma escrita a cada
+``WRITE_EVERY`` operações, por ``segundos``. O cache de leituras fica
+desligado, para medir o banco. Também mede quanto o event loop atrasa
+um ``sleep(0)`` enquanto isso (o loop não deve travar).
+
+Uso:
+    python benchmarks/bench_async.py [quantidade] [segundos] [leitores]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.db import Database
+from app.services.async_service import AsyncMediaService
+from app.services.media_service import MediaService
+from dataset import populate
+
+CONCURRENCY = (1, 8, 64)
+WRITE_EVERY = 10
+
+
+async def caller(service: AsyncMediaService, index: int, deadline: float,
+                 max_id: int, latencies: list):
+    step = index
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        kind = step % WRITE_EVERY
+        if kind == 0:
+            await service.update_movie_rating(1 + step * 7919 % max_id, step % 11 / 2)
+        elif kind % 3 == 0:
+            await service.list_movies_page(limit=50, order_by='rating', descending=True)
+        elif kind % 3 == 1:
+            await service.search("caminho", limit=20)
+        elif kind == 5:
+            await service.get_statistics()
+        else:
+            await service.get_media(1 + step * 104729 % max_id)
+        latencies.append(time.perf_counter() - start)
+        step += 1
+
+
+async def loop_lag(deadline: float, lags: list):
+    """Atraso do event loop: quanto um sleep(0) demora a voltar."""
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await asyncio.sleep(0)
+        lags.append(time.perf_counter() - start)
+        await asyncio.sleep(0.01)
+
+
+async def run(service: AsyncMediaService, callers: int, seconds: float, max_id: int):
+    latencies, lags = [], []
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(loop_lag(deadline, lags),
+                         *(caller(service, i, deadline, max_id, latencies)
+                           for i in range(callers)))
+    latencies.sort()
+    return {
+        'ops_per_s': len(latencies) / seconds,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p99_ms': latencies[int(len(latencies) * 0.99)] * 1000,
+        'loop_lag_ms': statistics.mean(lags) * 1000,
+    }
+
+
+async def main_async(count: int, seconds: float, readers: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        with Database(os.path.join(tmp, "bench_async.db")) as db:
+            service = MediaService(db, cache_size=None)
+            populate(service, count)
+            async with AsyncMediaService(service, readers) as async_service:
+                for callers in CONCURRENCY:
+                    result = await run(async_service, callers, seconds, count // 2)
+                    print(f"{callers:>3} chamadores: {result['ops_per_s']:8.0f} ops/s  "
+                          f"p50 {result['p50_ms']:7.2f} ms  p99 {result['p99_ms']:7.2f} ms  "
+                          f"atraso do loop {result['loop_lag_ms']:.2f} ms")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+    readers = int(sys.argv[3]) if len(sys.argv) > 3 else AsyncMediaService.READERS
+    asyncio.run(main_async(count, seconds, readers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# benchmarks/bench_bulk_import.py
+"""Mede a vazão (linhas/s) da importação em lote de filmes e séries.
+
+Uso:
+    python benchmarks/bench_bulk_import.py [quantidade] [chunk_size]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.db import Database
+from app.models.media import Movie, Series
+from app.services.media_service import MediaService
+
+# Meta de vazão para a importação em lote (linhas por segundo), já
+# incluindo a manutenção do índice de busca FTS5 e da tabela de gêneros
+TARGET_ROWS_PER_SEC = 15_000
+
+
+def generate_movies(count: int):
+    for i in range(count):
+        yield Movie(f"Filme {i}", 1950 + i % 70, ["Drama", "Ação"], 90 + i % 60,
+                    f"Diretor {i % 500}")
+
+
+def generate_series(count: int):
+    for i in range(count):
+        yield Series(f"Série {i}", 1990 + i % 30, ["Comédia"], 1 + i % 8, 10, 45)
+
+
+def timed(label: str, count: int, func) -> float:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed else float('inf')
+    print(f"{label:<28} {count:>8} linhas  {elapsed:8.3f}s  {rate:>10,.0f} linhas/s")
+    return rate
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else MediaService.BULK_CHUNK_SIZE
+    single_count = min(count, 5_000)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with Database(os.path.join(tmp, "bench.db")) as db:
+            service = MediaService(db)
+
+            timed("add_movie (um a um)", single_count,
+                  lambda: [service.add_movie(m) for m in generate_movies(single_count)])
+            movie_rate = timed("add_movies_bulk", count,
+                               lambda: service.add_movies_bulk(generate_movies(count), chunk_size))
+            series_rate = timed("add_series_bulk", count,
+                                lambda: service.add_series_bulk(generate_series(count), chunk_size))
+
+    worst = min(movie_rate, series_rate)
+    status = "OK" if worst >= TARGET_ROWS_PER_SEC else "ABAIXO DA META"
+    print(f"\nMeta: {TARGET_ROWS_PER_SEC:,} linhas/s -> {status}")
+    return 0 if worst >= TARGET_ROWS_PER_SEC else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""Mede a busca aproximada (``fuzzy_search``) sobre um acervo existente.
+
+Roda termos exatos, trechos e termos com erros de digitação contra um
+banco (gere um com ``dataset.py``), sem o cache de leituras, e mostra
+a mediana e o pior tempo de cada um e o melhor resultado encontrado.
+
+Uso:
+    python benchmarks/bench_fuzzy.py acervo.db [repetições]
+"""
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.db import Database
+from app.services.media_service import MediaService
+
+TERMS = [
+    "Labirinto",             # Palavra comum: muitos candidatos exatos
+    "Labirnto Selvagem",     # Letra faltando
+    "Tempestdae de Fogo",    # Letras trocadas
+    "meia-noite",            # Trecho no meio do título
+    "Horizonte Imortal",
+    "Gabriela Queiroz",      # Diretor
+    "Gabriella Keiroz",      # Diretor com erros
+    "#12345",                # Trecho raro
+    "zzzz",                  # Sem resultados
+]
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return 2
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with Database(sys.argv[1]) as db:
+        service = MediaService(db, cache_size=0)
+        total = db.fetch_one("SELECT COUNT(*) FROM media")[0]
+        print(f"{total} mídias, {repeat} repetições por termo\n")
+        print(f"{'termo':<22} {'mediana':>9} {'pior':>9}  melhor resultado")
+        for term in TERMS:
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                results = service.fuzzy_search(term, limit=20)
+                times.append((time.perf_counter() - start) * 1000)
+            best = results[0].title if results else "-"
+            print(f"{term:<22} {statistics.median(times):>7.1f}ms {max(times):>7.1f}ms  {best}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
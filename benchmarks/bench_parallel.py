@@ -0,0 +1,59 @@
+"""Mede as leituras paralelas (estatísticas e exportação) por número de processos.
+
+Roda as estatísticas detalhadas e a exportação JSON Lines sobre um
+banco existente (gere um com ``dataset.py``) com 1 processo (leitura
+serial) e com 2, 4... até o número de núcleos, e mostra o ganho.
+
+Uso:
+    python benchmarks/bench_parallel.py acervo.db [processos,...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.db import Database
+from app.services import analytics, exporter, parallel
+
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return 2
+    path = sys.argv[1]
+    if len(sys.argv) > 2:
+        counts = [int(count) for count in sys.argv[2].split(',')]
+    else:
+        counts, workers = [1], 2
+        while workers <= parallel.default_workers():
+            counts.append(workers)
+            workers *= 2
+
+    with Database(path) as db, tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "export.jsonl")
+        print(f"{'processos':>9} {'estatísticas':>13} {'ganho':>6} {'exportação':>11} {'ganho':>6}")
+        base = None
+        for workers in counts:
+            if workers == 1:
+                stats = timed(lambda: analytics.detailed_statistics(db))
+                export = timed(lambda: exporter.export_media(db, output))
+                base = (stats, export)
+            else:
+                stats = timed(lambda: parallel.detailed_statistics(db, workers))
+                export = timed(lambda: parallel.export_media(db, output, workers=workers))
+            base = base or (stats, export)
+            print(f"{workers:>9} {stats:>12.2f}s {base[0] / stats:>5.1f}x "
+                  f"{export:>10.2f}s {base[1] / export:>5.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
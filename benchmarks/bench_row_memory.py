@@ -0,0 +1,68 @@
+# benchmarks/bench_row_memory.py
+"""Compara a memória por linha das listagens: dicts x modelos com __slots__.
+
+"dicts" é o formato antigo de ``get_all_movies``/``get_all_series``
+(um dict por linha); "modelos" é o atual (``Movie``/``Series`` criados
+pelo row factory). Mede a memória retida pela lista com tracemalloc.
+
+Uso:
+    python benchmarks/bench_row_memory.py [quantidade]
+"""
+import gc
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.db import Database
+from app.services.media_service import MediaService
+from bench_bulk_import import generate_movies, generate_series
+
+
+def measure(label: str, load):
+    """Carrega a lista e mostra bytes por linha e tempo de carga."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = load()
+    elapsed = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    per_row = retained / len(rows) if rows else 0
+    print(f"{label:<24} {len(rows):>8} linhas  {per_row:8.0f} bytes/linha  "
+          f"{retained / 1024 / 1024:8.1f} MiB  {elapsed:7.3f}s")
+    del rows
+    return per_row
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with Database(os.path.join(tmp, "bench.db")) as db:
+            service = MediaService(db)
+            service.add_movies_bulk(generate_movies(count))
+            service.add_series_bulk(generate_series(count))
+
+            def as_dicts(select):
+                query = select + " ORDER BY m.title, m.id"
+                return lambda: [dict(row) for row in
+                                db.iter_rows(query, row_factory=sqlite3.Row)]
+
+            for kind, select, models in (
+                ("filmes", service.MOVIE_SELECT, service.get_all_movies),
+                ("séries", service.SERIES_SELECT, service.get_all_series),
+            ):
+                before = measure(f"{kind}: dicts", as_dicts(select))
+                after = measure(f"{kind}: modelos", models)
+                if before:
+                    print(f"{'':<24} redução de {1 - after / before:.0%}\n")
+
+
+if __name__ == "__main__":
+    main()
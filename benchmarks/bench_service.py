@@ -0,0 +1,147 @@
+"""Mede as operações do MediaService em acervos de vários tamanhos.
+
+Para cada tamanho, gera um banco com ``dataset.populate`` e cronometra
+listagens, estatísticas, busca e inserções (com o cache de leituras
+desligado, para medir o banco). O resultado vai para um JSON que pode
+ser comparado com o de uma execução anterior: operações mais lentas
+que a referência além da tolerância fazem o script sair com código 1.
+
+Uso:
+    python benchmarks/bench_service.py [--sizes 10000,100000] [--seed 42]
+        [--output resultado.json] [--compare referencia.json] [--tolerance 0.25]
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import deque
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.db import Database
+from app.services.media_service import MediaService
+from dataset import DEFAULT_SEED, generate_movies, generate_series, populate
+
+DEFAULT_SIZES = (10_000, 100_000)
+
+# Acima deste tamanho as listagens completas são percorridas com
+# iter_movies/iter_series, sem montar a lista inteira na memória
+MAX_LISTING = 1_000_000
+
+SEARCH_TERMS = ("caminho", "noite perdido", "tempes", "drama", "xyzzy")
+
+SINGLE_INSERTS = 200
+STATISTICS_REPEAT = 1000
+
+
+def measure(func, repeat: int = 1) -> dict:
+    """Roda ``func`` ``repeat`` vezes e devolve o tempo total e por operação."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = time.perf_counter() - start
+    return {'ops': repeat, 'seconds': round(elapsed, 6),
+            'per_op_ms': round(elapsed / repeat * 1000, 4)}
+
+
+def bench_size(size: int, seed: int, directory: str) -> dict:
+    """Gera um acervo de ``size`` mídias e mede cada operação."""
+    path = os.path.join(directory, f"bench_{size}.db")
+    results = {}
+
+    with Database(path) as db:
+        service = MediaService(db, cache_size=None)
+        results['populate'] = measure(lambda: populate(service, size, seed))
+
+        if size <= MAX_LISTING:
+            results['get_all_movies'] = measure(service.get_all_movies)
+            results['get_all_series'] = measure(service.get_all_series)
+        else:
+            results['iter_movies'] = measure(lambda: deque(service.iter_movies(), maxlen=0))
+            results['iter_series'] = measure(lambda: deque(service.iter_series(), maxlen=0))
+
+        results['get_statistics'] = measure(service.get_statistics, STATISTICS_REPEAT)
+
+        for term in SEARCH_TERMS:
+            results[f'search:{term}'] = measure(lambda: service.search(term), 20)
+
+        # Inserções por último, para não mudar o acervo das leituras
+        movies = list(generate_movies(SINGLE_INSERTS, seed + 1))
+        series = list(generate_series(SINGLE_INSERTS, seed + 1))
+        results['add_movie'] = measure(lambda: service.add_movie(movies.pop()), SINGLE_INSERTS)
+        results['add_series'] = measure(lambda: service.add_series(series.pop()), SINGLE_INSERTS)
+
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return results
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    """Operações mais lentas que ``baseline`` além de ``tolerance`` (0.25 = 25%)."""
+    regressions = []
+    for size, operations in current['results'].items():
+        for name, result in operations.items():
+            reference = baseline.get('results', {}).get(size, {}).get(name)
+            if not reference or not reference['per_op_ms']:
+                continue
+            ratio = result['per_op_ms'] / reference['per_op_ms']
+            if ratio > 1 + tolerance:
+                regressions.append((size, name, reference['per_op_ms'],
+                                    result['per_op_ms'], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help="tamanhos do acervo separados por vírgula")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--output', help="arquivo JSON do resultado")
+    parser.add_argument('--compare', help="JSON de uma execução anterior")
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    sizes = [int(size.replace('_', '')) for size in args.sizes.split(',')]
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'seed': args.seed,
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'results': {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            print(f"\n== {size:,} mídias ==")
+            results = bench_size(size, args.seed, tmp)
+            report['results'][str(size)] = results
+            for name, result in results.items():
+                print(f"{name:<24} {result['ops']:>6} ops  {result['seconds']:9.3f}s"
+                      f"  {result['per_op_ms']:10.3f} ms/op")
+
+    output = args.output or f"bench_service_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nResultado gravado em {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\nRegressões (tolerância de {args.tolerance:.0%}):")
+            for size, name, before, after, ratio in regressions:
+                print(f"  {size:>10} {name:<24} {before:10.3f} -> {after:10.3f} ms/op ({ratio:.2f}x)")
+            return 1
+        print("\nSem regressões em relação à referência")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""Gera um acervo sintético e determinístico de filmes e séries.
+
+Títulos, gêneros, anos, notas e status seguem distribuições parecidas
+com as de um acervo real: muitos títulos recentes, alguns gêneros bem
+mais comuns que outros, boa parte sem nota e notas concentradas entre
+3 e 4. A mesma semente gera sempre os mesmos dados.
+
+Uso:
+    python benchmarks/dataset.py quantidade arquivo.db [semente]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.db import Database
+from app.models.media import MediaStatus, Movie, Series
+from app.services.media_service import MediaService
+
+DEFAULT_SEED = 42
+
+# Pesos aproximados da frequência de cada gênero
+GENRES = {
+    "Drama": 30, "Comédia": 22, "Ação": 18, "Suspense": 12, "Romance": 10,
+    "Aventura": 9, "Terror": 8, "Ficção Científica": 7, "Crime": 7,
+    "Animação": 6, "Fantasia": 5, "Documentário": 4, "Mistério": 4,
+    "Família": 3, "Guerra": 2, "Musical": 2, "Faroeste": 1, "Biografia": 1,
+}
+
+STATUS_WEIGHTS = {
+    MediaStatus.PLAN_TO_WATCH: 50,
+    MediaStatus.WATCHING: 15,
+    MediaStatus.COMPLETED: 35,
+}
+
+NOUNS = ["O Caminho", "O Segredo", "A Noite", "A Cidade", "A Guerra", "A Casa",
+         "A Viagem", "A Sombra", "A Herança", "A Promessa", "A Ilha", "A Estrada",
+         "A Fronteira", "A Memória", "A Tempestade", "O Jogo", "O Espelho",
+         "O Destino", "O Silêncio", "O Labirinto", "O Coração", "O Império",
+         "O Horizonte", "A Chave", "O Sinal"]
+# Complementos que servem para substantivos masculinos e femininos
+QUALIFIERS = ["Final", "do Norte", "da Meia-Noite", "de Fogo", "sem Volta",
+              "das Águas", "de Prata", "do Amanhã", "Invisível", "Selvagem",
+              "Imortal", "de Papel", "em Chamas", "Sem Nome", ""]
+FIRST_NAMES = ["Ana", "Bruno", "Carla", "Diego", "Elisa", "Fábio", "Gabriela",
+               "Hugo", "Isabel", "João", "Karen", "Lucas", "Marina", "Nuno",
+               "Olívia", "Paulo", "Renata", "Sérgio", "Tânia", "Vítor"]
+LAST_NAMES = ["Almeida", "Barros", "Cardoso", "Duarte", "Esteves", "Ferraz",
+              "Gomes", "Henriques", "Lacerda", "Moura", "Nogueira", "Pacheco",
+              "Queiroz", "Ramos", "Siqueira", "Teixeira", "Valente", "Xavier"]
+
+_GENRE_NAMES = list(GENRES)
+_GENRE_WEIGHTS = list(GENRES.values())
+_STATUSES = list(STATUS_WEIGHTS)
+_STATUS_WEIGHTS = list(STATUS_WEIGHTS.values())
+
+
+def _title(rng: random.Random, index: int) -> str:
+    noun = rng.choice(NOUNS)
+    if rng.random() < 0.3:
+        noun = noun.split(" ", 1)[1]  # Sem artigo
+    title = f"{noun} {rng.choice(QUALIFIERS)}".strip()
+    # Algumas continuações ("... 2") e um sufixo que mantém o título único
+    if rng.random() < 0.08:
+        title += f" {rng.randint(2, 4)}"
+    return f"{title} #{index}"
+
+
+def _genres(rng: random.Random) -> list:
+    count = rng.choices((1, 2, 3), weights=(50, 35, 15))[0]
+    return list(dict.fromkeys(rng.choices(_GENRE_NAMES, weights=_GENRE_WEIGHTS, k=count)))
+
+
+def _year(rng: random.Random, newest: int = 2025) -> int:
+    # Mais títulos recentes: a idade segue uma exponencial (média de 15 anos)
+    return max(1920, newest - int(rng.expovariate(1 / 15)))
+
+
+def _rating(rng: random.Random) -> float:
+    if rng.random() < 0.4:
+        return 0.0  # Sem avaliação
+    return min(5.0, max(0.5, round(rng.gauss(3.6, 0.8) * 2) / 2))
+
+
+def _common(rng: random.Random, media):
+    media.rating = _rating(rng)
+    media.status = rng.choices(_STATUSES, weights=_STATUS_WEIGHTS)[0]
+    if rng.random() < 0.1:
+        media.comment = rng.choice(["Recomendo", "Rever um dia", "Final fraco",
+                                    "Trilha sonora excelente", "Muito longo"])
+    return media
+
+
+def generate_movies(count: int, seed: int = DEFAULT_SEED):
+    """Gera ``count`` filmes; mesma semente, mesmos filmes."""
+    rng = random.Random(f"{seed}:movies")
+    directors = max(1, count // 20)
+    for i in range(count):
+        # Poucos diretores com muitos filmes e uma cauda longa com poucos
+        director_id = int(directors * rng.random() ** 3)
+        director = (f"{FIRST_NAMES[director_id % len(FIRST_NAMES)]} "
+                    f"{LAST_NAMES[director_id // len(FIRST_NAMES) % len(LAST_NAMES)]}")
+        if director_id >= len(FIRST_NAMES) * len(LAST_NAMES):
+            director += f" {director_id // (len(FIRST_NAMES) * len(LAST_NAMES)) + 1}"
+        duration = int(min(240, max(60, rng.gauss(110, 20))))
+        movie = Movie(_title(rng, i), _year(rng), _genres(rng), duration, director)
+        yield _common(rng, movie)
+
+
+def generate_series(count: int, seed: int = DEFAULT_SEED):
+    """Gera ``count`` séries com progresso coerente com o status."""
+    rng = random.Random(f"{seed}:series")
+    for i in range(count):
+        seasons = min(15, 1 + int(rng.expovariate(1 / 2.5)))
+        episodes = rng.choice((6, 8, 10, 10, 13, 22, 24))
+        duration = rng.choice((22, 30, 45, 45, 60))
+        series = _common(rng, Series(_title(rng, i), _year(rng), _genres(rng),
+                                     seasons, episodes, duration))
+        if series.status == MediaStatus.COMPLETED:
+            series.current_season, series.current_episode = seasons, episodes
+        elif series.status == MediaStatus.WATCHING:
+            series.current_season = rng.randint(1, seasons)
+            series.current_episode = rng.randint(1, episodes)
+        yield series
+
+
+def populate(service: MediaService, count: int, seed: int = DEFAULT_SEED) -> dict:
+    """Grava ``count`` mídias (metade filmes, metade séries) com importação em lote."""
+    movies = count // 2
+    result = service.add_movies_bulk(generate_movies(movies, seed))
+    inserted = result['inserted']
+    result = service.add_series_bulk(generate_series(count - movies, seed))
+    inserted += result['inserted']
+    return {'movies': movies, 'series': count - movies, 'inserted': inserted}
+
+
+def main():
+    if len(sys.argv) < 3:
+        print(__doc__)
+        return 2
+    count = int(sys.argv[1])
+    path = sys.argv[2]
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_SEED
+
+    with Database(path) as db:
+        start = time.perf_counter()
+        result = populate(MediaService(db, cache_size=None), count, seed)
+        elapsed = time.perf_counter() - start
+    print(f"{result['inserted']} mídias gravadas em {path} ({elapsed:.1f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,33 +5,43 @@ import os
 # Adicionar o diretório atual ao path do Python
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-print("🚀 Iniciando TrackFlix...")
+def main():
+    if len(sys.argv) > 1:
+        # Comando direto (python run.py stats --json): sem banners nem menu
+        from app.main import main as run_app
+        sys.exit(run_app(sys.argv[1:]))
+    
+    print("🚀 Iniciando TrackFlix...")
 
-try:
-    from app.main import main
-    print("✅ Módulos carregados com sucesso!")
-    print("=" * 70)
-    main()
-except ImportError as e:
-    print(f"❌ Erro de importação: {e}")
-    print("\n📁 Verificando estrutura...")
+    try:
+        from app.main import main as run_app
+        print("✅ Módulos carregados com sucesso!")
+        print("=" * 70)
+        run_app()
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        print("\n📁 Verificando estrutura...")
     
-    # Verificar arquivos
-    if not os.path.exists('app'):
-        print("❌ Pasta 'app' não encontrada!")
-    else:
-        print("📁 Conteúdo de 'app':")
-        for item in os.listdir('app'):
-            print(f"  - {item}")
+        # Verificar arquivos
+        if not os.path.exists('app'):
+            print("❌ Pasta 'app' não encontrada!")
+        else:
+            print("📁 Conteúdo de 'app':")
+            for item in os.listdir('app'):
+                print(f"  - {item}")
             
-            if os.path.isdir(os.path.join('app', item)):
-                subpath = os.path.join('app', item)
-                for subitem in os.listdir(subpath):
-                    print(f"    - {subitem}")
+                if os.path.isdir(os.path.join('app', item)):
+                    subpath = os.path.join('app', item)
+                    for subitem in os.listdir(subpath):
+                        print(f"    - {subitem}")
     
-    input("\n👆 Pressione Enter para sair...")
-except Exception as e:
-    print(f"❌ Erro: {e}")
-    import traceback
-    traceback.print_exc()
-    input("\n👆 Pressione Enter para sair...")
\ No newline at end of file
+        input("\n👆 Pressione Enter para sair...")
+    except Exception as e:
+        print(f"❌ Erro: {e}")
+        import traceback
+        traceback.print_exc()
+        input("\n👆 Pressione Enter para sair...")
+
+# Os processos de leitura paralela importam este arquivo de novo
+if __name__ == "__main__":
+    main()
@@ -4,20 +4,27 @@ import os
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-print("🚀 Iniciando TrackFlix GUI...")
+def main():
+    print("🚀 Iniciando TrackFlix GUI...")
 
-try:
-    from app.database.db import Database
-    from app.services.media_service import MediaService
-    from app.ui.gui import TrackFlixGUI
+    try:
+        from app.database.db import Database
+        from app.database.profiler import configure_from_env
+        from app.services.media_service import MediaService
+        from app.ui.gui import TrackFlixGUI
     
-    db = Database()
-    service = MediaService(db)
-    app = TrackFlixGUI(service)
-    app.run()
+        db = Database()
+        configure_from_env(db)
+        service = MediaService(db)
+        app = TrackFlixGUI(service)
+        app.run()
     
-except Exception as e:
-    print(f"❌ Erro: {e}")
-    import traceback
-    traceback.print_exc()
-    input("\nPressione Enter para sair...")
\ No newline at end of file
+    except Exception as e:
+        print(f"❌ Erro: {e}")
+        import traceback
+        traceback.print_exc()
+        input("\nPressione Enter para sair...")
+
+# Os processos de leitura paralela importam este arquivo de novo
+if __name__ == "__main__":
+    main()
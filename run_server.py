@@ -0,0 +1,39 @@
+# run_server.py (servidor HTTP/JSON local, sem interface)
+import argparse
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.api.server import DEFAULT_HOST, DEFAULT_PORT, DEFAULT_WORKERS, TrackFlixServer
+from app.database.db import Database
+from app.database.profiler import configure_from_env
+from app.services.media_service import MediaService
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor HTTP/JSON do TrackFlix")
+    parser.add_argument('--host', default=DEFAULT_HOST,
+                        help="endereço de escuta (padrão: só esta máquina)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--db', default="trackflix.db", help="arquivo do banco")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help="threads (e conexões com o banco) do pool")
+    parser.add_argument('--verbose', action='store_true', help="loga cada requisição")
+    args = parser.parse_args()
+    
+    db = Database(args.db)
+    configure_from_env(db)
+    server = TrackFlixServer(MediaService(db), args.host, args.port,
+                             args.workers, args.verbose)
+    print(f"🚀 TrackFlix API em http://{args.host}:{server.server_port}/api/ "
+          "(Ctrl+C para sair)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Encerrando...")
+    finally:
+        server.server_close()
+        db.close()
+
+if __name__ == "__main__":
+    main()
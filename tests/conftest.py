@@ -0,0 +1,39 @@
+# tests/conftest.py
+"""Fixtures comuns: cada teste usa um banco novo em um arquivo temporário."""
+import pytest
+
+from app.database.db import Database
+from app.models.media import Movie, Series
+from app.services.media_service import MediaService
+
+
+def make_movie(title: str, year: int = 2000, genres=("Drama",), duration: int = 100,
+               director=None, rating: float = 0.0) -> Movie:
+    movie = Movie(title, year, list(genres), duration, director)
+    movie.rating = rating
+    return movie
+
+
+def make_series(title: str, year: int = 2010, genres=("Drama",), seasons: int = 2,
+                episodes: int = 10, episode_duration=None, rating: float = 0.0) -> Series:
+    series = Series(title, year, list(genres), seasons, episodes, episode_duration)
+    series.rating = rating
+    return series
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "trackflix.db")
+
+
+@pytest.fixture
+def db(db_path):
+    database = Database(db_path)
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def service(db):
+    # Leitura serial: os testes não dependem de NumPy nem de processos
+    return MediaService(db, parallel_workers=1)
@@ -0,0 +1,117 @@
+# tests/test_api.py
+import gzip
+import http.client
+import json
+import threading
+
+import pytest
+
+from app.api.server import TrackFlixServer
+from app.database.db import Database
+from app.services.media_service import MediaService
+from tests.conftest import make_movie, make_series
+
+
+@pytest.fixture
+def server(service):
+    service.add_movie(make_movie("Interestelar", 2014, ("Ficção Científica",), 169))
+    service.add_series(make_series("Dark", 2017, ("Ficção Científica",), 3, 8, 50))
+    server = TrackFlixServer(service, port=0, workers=2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+@pytest.fixture
+def client(server):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=5)
+    yield connection
+    connection.close()
+
+
+def request(client, method, path, body=None, headers=()):
+    headers = dict(headers)
+    if body is not None:
+        body = json.dumps(body)
+        headers['Content-Type'] = 'application/json'
+    client.request(method, path, body, headers)
+    response = client.getresponse()
+    return response, response.read()
+
+
+def test_get_returns_etag_and_json(client):
+    response, body = request(client, 'GET', '/api/movies')
+
+    assert response.status == 200
+    assert response.getheader('ETag')
+    assert response.getheader('Cache-Control') == 'no-cache'
+    assert [item['title'] for item in json.loads(body)['items']] == ["Interestelar"]
+
+
+def test_matching_etag_gets_304(client):
+    response, _ = request(client, 'GET', '/api/stats')
+    etag = response.getheader('ETag')
+
+    response, body = request(client, 'GET', '/api/stats', headers={'If-None-Match': etag})
+    assert response.status == 304
+    assert body == b''
+    assert response.getheader('ETag') == etag
+
+    response, _ = request(client, 'GET', '/api/stats', headers={'If-None-Match': '"outro"'})
+    assert response.status == 200
+
+
+def test_write_changes_etag(client):
+    response, _ = request(client, 'GET', '/api/stats')
+    etag = response.getheader('ETag')
+
+    response, _ = request(client, 'POST', '/api/movies',
+                          {'title': "Duna", 'year': 2021, 'duration': 155})
+    assert response.status == 201
+
+    response, body = request(client, 'GET', '/api/stats', headers={'If-None-Match': etag})
+    assert response.status == 200
+    assert response.getheader('ETag') != etag
+    assert json.loads(body)['movies'] == 2
+
+
+def test_write_from_other_process_changes_etag(client, db_path):
+    response, _ = request(client, 'GET', '/api/stats')
+    etag = response.getheader('ETag')
+
+    with Database(db_path) as other:
+        MediaService(other, cache_size=None).add_movie(make_movie("Duna", 2021))
+
+    response, body = request(client, 'GET', '/api/stats', headers={'If-None-Match': etag})
+    assert response.status == 200
+    assert json.loads(body)['movies'] == 2
+
+
+def test_gzip_has_its_own_etag(client, service):
+    service.add_movies_bulk(make_movie(f"Filme {index}") for index in range(30))
+    response, plain = request(client, 'GET', '/api/movies')
+    etag = response.getheader('ETag')
+
+    response, body = request(client, 'GET', '/api/movies',
+                             headers={'Accept-Encoding': 'gzip'})
+    gzip_etag = response.getheader('ETag')
+    assert response.getheader('Content-Encoding') == 'gzip'
+    assert gzip.decompress(body) == plain
+    assert gzip_etag != etag
+
+    response, _ = request(client, 'GET', '/api/movies', headers={
+        'Accept-Encoding': 'gzip', 'If-None-Match': gzip_etag})
+    assert response.status == 304
+
+
+def test_errors_have_no_etag(client):
+    response, body = request(client, 'GET', '/api/media/999')
+    assert response.status == 404
+    assert response.getheader('ETag') is None
+    assert 'error' in json.loads(body)
+
+    response, _ = request(client, 'GET', '/api/movies?after=invalido')
+    assert response.status == 400
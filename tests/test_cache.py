@@ -0,0 +1,98 @@
+# tests/test_cache.py
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.database.db import Database
+from app.services.cache import LRUCache
+from app.services.media_service import MediaService
+from tests.conftest import make_movie
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_size=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1  # 'b' passa a ser o menos usado
+    cache.put('c', 3)
+
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.stats()['evictions'] == 1
+
+
+def test_invalidate_drops_only_tagged_entries():
+    cache = LRUCache()
+    cache.put('movies', 1, tags=('movie',))
+    cache.put('both', 2, tags=('movie', 'series'))
+    cache.put('series', 3, tags=('series',))
+    cache.invalidate('movie')
+
+    assert len(cache) == 1
+    assert cache.get('series') == 3
+
+
+def test_put_skips_value_loaded_before_invalidation():
+    cache = LRUCache()
+    generation = cache.generation
+    cache.invalidate('movie')
+    cache.put('stale', 1, tags=('movie',), generation=generation)
+
+    assert cache.get('stale') is None
+
+
+def test_max_size_must_be_positive():
+    with pytest.raises(ValueError):
+        LRUCache(max_size=0)
+
+
+def test_service_reads_hit_cache_until_own_write(service):
+    service.add_movie(make_movie("A"))
+    first = service.get_statistics()
+    assert service.get_statistics() is first
+    assert service.cache_stats()['hits'] == 1
+
+    service.add_movie(make_movie("B"))
+    assert service.get_statistics()['movies'] == 2
+
+
+def test_own_write_keeps_unrelated_entries(service):
+    movie = make_movie("A")
+    service.add_movie(movie)
+    item = service.get_media(movie.id)
+
+    service.add_movie(make_movie("B"))
+    assert service.get_media(movie.id) is item
+
+
+def test_write_from_other_connection_clears_cache(service, db_path):
+    service.add_movie(make_movie("A"))
+    assert service.get_statistics()['movies'] == 1
+
+    with Database(db_path) as other:
+        MediaService(other, cache_size=None).add_movie(make_movie("B"))
+
+    # Escrita de outro processo: só ``data_version`` a denuncia
+    assert service.get_statistics()['movies'] == 2
+
+
+def test_own_write_from_other_thread_keeps_cache(service):
+    movie = make_movie("A")
+    service.add_movie(movie)
+    with ThreadPoolExecutor(max_workers=1) as worker:
+        # A primeira leitura de uma conexão nova esvazia o cache
+        worker.submit(service.get_statistics).result()
+        item = service.get_media(movie.id)
+
+        worker.submit(service.add_movie, make_movie("B")).result()
+
+    assert service.get_media(movie.id) is item
+    assert service.get_statistics()['movies'] == 2
+
+
+def test_cache_can_be_disabled(db):
+    service = MediaService(db, cache_size=None)
+    service.add_movie(make_movie("A"))
+
+    assert service.get_statistics() is not service.get_statistics()
+    assert service.cache_stats() == {}
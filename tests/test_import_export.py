@@ -0,0 +1,129 @@
+# tests/test_import_export.py
+import gzip
+import io
+import json
+
+import pytest
+
+from app.database.db import Database
+from app.models.media import MediaStatus
+from app.services import exporter
+from app.services.importer import read_records
+from app.services.media_service import MediaService
+from app.services.query import MediaQuery
+from app.ui.commands import build_parser, cmd_import
+from tests.conftest import make_movie, make_series
+
+
+def run_import(service, *argv):
+    args = build_parser().parse_args(['import', *argv, '--json'])
+    out = io.StringIO()
+    code = cmd_import(service, args, out)
+    return code, json.loads(out.getvalue())
+
+
+def comparable(items):
+    return sorted((dict(item.to_dict(), id=None, created_at=None) for item in items),
+                  key=lambda data: data['title'])
+
+
+@pytest.fixture
+def catalog(service):
+    movie = make_movie("Cidade de Deus", 2002, ("Crime", "Drama"), 130, "Fernando Meirelles", 5)
+    movie.comment = 'Vírgula, "aspas" e\nquebra de linha'
+    movie.mark_as_watched()
+    series = make_series("Dark", 2017, ("Ficção Científica",), 3, 8, 50, 4.5)
+    service.add_movie(movie)
+    service.add_movie(make_movie("Sem gênero", 1999, (), 95))
+    service.add_series(series)
+    service.update_progress(series.id, 2, 3)
+    return service
+
+
+def test_bulk_import_reports_invalid_items_by_position(service):
+    movies = [make_movie("A"), make_movie("", 2000), make_movie("C"),
+              make_movie("D", year=1500), make_movie("E", rating=9)]
+    result = service.add_movies_bulk(movies, chunk_size=2)
+
+    assert result['inserted'] == 2
+    assert [index for index, _ in result['errors']] == [1, 3, 4]
+    assert [item.title for item in service.get_all_movies()] == ["A", "C"]
+
+
+def test_bulk_import_rejects_bad_chunk_size(service):
+    with pytest.raises(ValueError):
+        service.add_movies_bulk([make_movie("A")], chunk_size=0)
+
+
+@pytest.mark.parametrize('name', ['acervo.csv', 'acervo.csv.gz', 'acervo.jsonl', 'acervo.jsonl.gz'])
+def test_export_import_round_trip(catalog, tmp_path, name):
+    path = str(tmp_path / name)
+    assert catalog.export(path) == 3
+
+    with Database(str(tmp_path / "copia.db")) as db:
+        copy = MediaService(db, parallel_workers=1)
+        code, result = run_import(copy, path)
+
+        assert (code, result) == (0, {'inserted': 3, 'errors': []})
+        query = MediaQuery().order_by('title')
+        assert comparable(copy.find(query)) == comparable(catalog.find(query))
+        assert copy.get_statistics() == catalog.get_statistics()
+
+
+def test_export_by_type(catalog, tmp_path):
+    path = str(tmp_path / "series.jsonl")
+    assert catalog.export(path, media_type='series') == 1
+
+    [(line, record)] = list(read_records(path))
+    assert (line, record['title'], record['current_episode']) == (1, "Dark", 3)
+    assert record['status'] == MediaStatus.WATCHING.value
+
+
+def test_cancelled_export_leaves_no_file(catalog, tmp_path):
+    path = tmp_path / "acervo.csv"
+    with pytest.raises(exporter.ExportCancelled):
+        catalog.export(str(path), cancelled=lambda: True)
+
+    assert not path.exists()
+    assert not (tmp_path / "acervo.csv.part").exists()
+
+
+def test_csv_errors_use_file_line_numbers(service, tmp_path):
+    path = tmp_path / "acervo.csv"
+    path.write_text(
+        "title,year,media_type,comment\n"
+        "Bom,2001,movie,\n"
+        "Sem ano,,movie,\n"
+        'Comentário,2002,movie,"duas\nlinhas"\n'
+        "Ano ruim,1200,movie,\n", encoding='utf-8')
+
+    code, result = run_import(service, str(path))
+    assert code == 1
+    assert result['inserted'] == 2
+    assert [line for line, _ in result['errors']] == [3, 6]
+
+
+def test_malformed_json_lines_are_skipped(service, tmp_path):
+    path = tmp_path / "acervo.jsonl.gz"
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        f.write('{"title": "Bom", "year": 2001, "media_type": "movie"}\n'
+                '{"title": "Cortado", "ye\n'
+                '\n'
+                '{"title": "Série", "year": 2005, "media_type": "series", "status": "Nada"}\n'
+                '{"title": "Outro", "year": 2003, "media_type": "series"}\n')
+
+    code, result = run_import(service, str(path))
+    assert code == 1
+    assert result['inserted'] == 2
+    assert [line for line, _ in result['errors']] == [2, 4]
+    assert result['errors'][0][1].startswith("JSON inválido")
+
+
+def test_read_records_raises_without_error_callback(tmp_path):
+    path = tmp_path / "acervo.jsonl"
+    path.write_text('{"title": "Bom"}\nnão é json\n', encoding='utf-8')
+
+    records = read_records(str(path))
+    assert next(records) == (1, {'title': "Bom"})
+    with pytest.raises(ValueError, match="Linha 2"):
+        next(records)
@@ -0,0 +1,62 @@
+# tests/test_migrations.py
+import pytest
+
+from app.database import migrations
+from app.database.db import Database
+from app.database.migrations import LATEST_VERSION, get_version, run_migrations
+from app.services.media_service import MediaService
+from tests.conftest import make_movie, make_series
+
+
+def test_new_database_reaches_latest_version(db):
+    assert get_version(db.get_connection()) == LATEST_VERSION
+
+
+def test_up_to_date_database_runs_no_migration(db, db_path):
+    assert run_migrations(db) == []
+
+    with Database(db_path) as reopened:
+        assert run_migrations(reopened) == []
+        assert get_version(reopened.get_connection()) == LATEST_VERSION
+
+
+def test_upgrade_keeps_and_indexes_existing_rows(db_path, monkeypatch):
+    # Banco parado na versão 5, antes das estatísticas e dos trigramas
+    monkeypatch.setattr(migrations, 'MIGRATIONS', migrations.MIGRATIONS[:5])
+    monkeypatch.setattr(migrations, 'LATEST_VERSION', 5)
+    with Database(db_path) as old:
+        service = MediaService(old, cache_size=None)
+        assert service.add_movie(make_movie("Interestelar", 2014, duration=169, rating=5))
+        assert service.add_series(make_series("Dark", 2017, seasons=3, episodes=8,
+                                              episode_duration=50))
+        assert get_version(old.get_connection()) == 5
+    monkeypatch.undo()
+
+    with Database(db_path) as db:
+        assert get_version(db.get_connection()) == LATEST_VERSION
+        service = MediaService(db, cache_size=None)
+
+        stats = service.get_statistics()
+        assert (stats['movies'], stats['series'], stats['rated']) == (1, 1, 1)
+        assert stats['total_minutes'] == 169 + 3 * 8 * 50
+        assert [item.title for item in service.fuzzy_search("interestel")] == ["Interestelar"]
+
+        trigger = db.fetch_one("SELECT sql FROM sqlite_master WHERE name = 'watch_events_progress'")
+        assert 'watch_daily' in trigger[0]
+
+
+def test_failed_migration_is_rolled_back(db_path, monkeypatch):
+    def broken(cursor):
+        cursor.execute("CREATE TABLE half_done (id INTEGER)")
+        raise RuntimeError("falhou no meio")
+
+    monkeypatch.setattr(migrations, 'MIGRATIONS', migrations.MIGRATIONS[:2] + [
+        migrations.Migration(3, "Migração com erro", broken)])
+    monkeypatch.setattr(migrations, 'LATEST_VERSION', 3)
+    with pytest.raises(RuntimeError):
+        Database(db_path)
+    monkeypatch.undo()
+
+    with Database(db_path) as db:
+        assert db.fetch_one("SELECT name FROM sqlite_master WHERE name = 'half_done'") is None
+        assert get_version(db.get_connection()) == LATEST_VERSION
@@ -0,0 +1,86 @@
+# tests/test_pagination.py
+import pytest
+
+from app.models.media import MediaStatus, Movie
+from app.services.query import MediaQuery
+from tests.conftest import make_movie, make_series
+
+
+@pytest.fixture
+def movies(service):
+    # Anos, notas e títulos repetidos: o desempate pelo id precisa valer
+    items = [make_movie(f"Filme {index % 7}", 1990 + index % 4, rating=(index % 6) * 0.5)
+             for index in range(23)]
+    assert service.add_movies_bulk(items)['inserted'] == 23
+    service.add_series(make_series("Série de fora"))
+    return items
+
+
+def walk(load, **kwargs):
+    pages, after = [], None
+    while True:
+        page = load(after=after, **kwargs)
+        pages.append(page['items'])
+        after = page['next']
+        if after is None:
+            return pages
+
+
+@pytest.mark.parametrize('order_by', ['title', 'year', 'rating', 'id'])
+@pytest.mark.parametrize('descending', [False, True])
+def test_pages_follow_full_ordering(service, movies, order_by, descending):
+    pages = walk(service.list_movies_page, limit=5, order_by=order_by, descending=descending)
+
+    expected = service.find(MediaQuery('movie').order_by(order_by, descending))
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+    assert [item.id for page in pages for item in page] == [item.id for item in expected]
+    assert all(isinstance(item, Movie) for page in pages for item in page)
+
+
+def test_find_page_keeps_filters(service, movies):
+    query = MediaQuery('movie').year_between(1991, 1992).order_by('rating', True)
+    pages = walk(lambda after: service.find_page(query, after, limit=4))
+
+    ids = [item.id for page in pages for item in page]
+    assert ids == [item.id for item in service.find(query)]
+    assert len(ids) == sum(1991 <= movie.year <= 1992 for movie in movies)
+
+
+def test_last_page_has_no_cursor(service, movies):
+    page = service.list_movies_page(limit=50)
+    assert len(page['items']) == 23
+    assert page['next'] is None
+
+
+def test_cursor_survives_insert_before_position(service, movies):
+    first = service.list_movies_page(limit=5, order_by='id')
+    service.add_movie(make_movie("Novo"))
+    second = service.list_movies_page(after=first['next'], limit=5, order_by='id')
+
+    assert second['items'][0].id == first['items'][-1].id + 1
+
+
+def test_invalid_cursor_is_rejected(service, movies):
+    with pytest.raises(ValueError):
+        service.list_movies_page(after="não é um cursor")
+
+    cursor = service.list_movies_page(limit=5, order_by='year')['next']
+    with pytest.raises(ValueError):
+        service.list_movies_page(after=cursor, order_by='title')
+    with pytest.raises(ValueError):
+        service.list_movies_page(after=cursor, order_by='year', descending=True)
+
+
+def test_limit_must_be_positive(service, movies):
+    with pytest.raises(ValueError):
+        service.find_page(MediaQuery('movie'), limit=0)
+
+
+def test_pages_mix_movies_and_series(service, movies):
+    query = MediaQuery().with_status(MediaStatus.PLAN_TO_WATCH).order_by('title')
+    pages = walk(lambda after: service.find_page(query, after, limit=10))
+
+    titles = [item.title for page in pages for item in page]
+    assert len(titles) == 24
+    assert titles == sorted(titles)
+    assert "Série de fora" in titles
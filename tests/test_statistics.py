@@ -0,0 +1,54 @@
+# tests/test_statistics.py
+from app.models.media import MediaStatus
+from tests.conftest import make_movie, make_series
+
+
+def test_empty_database(service):
+    stats = service.get_statistics()
+    assert stats['total'] == 0
+    assert stats['average_rating'] == 0
+    assert stats['total_minutes'] == 0
+
+
+def test_triggers_follow_inserts(service):
+    service.add_movie(make_movie("A", duration=120, rating=4))
+    service.add_movies_bulk([make_movie("B", duration=90), make_movie("C", duration=30, rating=3)])
+    service.add_series(make_series("D", seasons=2, episodes=10, episode_duration=45))
+
+    stats = service.get_statistics()
+    assert (stats['movies'], stats['series'], stats['total']) == (3, 1, 4)
+    assert stats['planejado'] == 4
+    assert (stats['rated'], stats['average_rating']) == (2, 3.5)
+    assert stats['total_minutes'] == 120 + 90 + 30 + 2 * 10 * 45
+
+
+def test_triggers_match_rebuild_after_changes(service, db):
+    movie = make_movie("A", duration=120)
+    series = make_series("B", seasons=1, episodes=3, episode_duration=20)
+    other = make_movie("C", duration=60, rating=2)
+    service.add_movie(movie)
+    service.add_series(series)
+    service.add_movie(other)
+
+    service.update_movie_rating(movie.id, 5)
+    service.update_movie_rating(movie.id, 4.5)
+    assert service.update_progress(series.id, 1, 3)  # Último episódio: Concluído
+    service.delete_media(other.id)
+    db.execute_query("UPDATE movies SET duration = 150 WHERE media_id = ?", (movie.id,))
+    db.execute_query("UPDATE media SET status = ? WHERE id = ?",
+                     (MediaStatus.WATCHING.value, movie.id))
+
+    stats = service.get_statistics()
+    assert stats == service.rebuild_statistics()
+    assert (stats['total'], stats['concluido'], stats['assistindo']) == (2, 1, 1)
+    assert (stats['rated'], stats['average_rating']) == (1, 4.5)
+    assert stats['total_minutes'] == 150 + 3 * 20
+
+
+def test_rebuild_repairs_drifted_counters(service, db):
+    service.add_movie(make_movie("A", duration=100))
+    db.execute_query("UPDATE media_stats SET movies = 42, total_minutes = 0")
+    assert service.get_statistics()['movies'] == 42
+
+    stats = service.rebuild_statistics()
+    assert (stats['movies'], stats['total_minutes']) == (1, 100)
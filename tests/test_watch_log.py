@@ -0,0 +1,93 @@
+# tests/test_watch_log.py
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.media import MediaStatus
+from tests.conftest import make_series
+
+
+def days_ago(days: int, hour: int = 20) -> datetime:
+    moment = datetime.now(timezone.utc) - timedelta(days=days)
+    return moment.replace(hour=hour, minute=0, second=0, microsecond=0)
+
+
+@pytest.fixture
+def series(service):
+    series = make_series("Dark", seasons=3, episodes=8, episode_duration=50)
+    service.add_series(series)
+    return series
+
+
+def progress(service, media_id):
+    item = service.get_media(media_id)
+    return item.current_season, item.current_episode, item.status
+
+
+def test_latest_event_sets_progress(service, series):
+    service.record_watch(series.id, 1, 3, days_ago(2))
+    service.record_watch(series.id, 1, 1, days_ago(5))  # Fora de ordem: não volta
+    service.flush_watch_events()
+
+    assert progress(service, series.id) == (1, 3, MediaStatus.WATCHING)
+
+
+def test_last_episode_completes_series(service, series):
+    assert service.update_progress(series.id, 3, 8)
+    assert progress(service, series.id) == (3, 8, MediaStatus.COMPLETED)
+
+
+def test_invalid_events_are_rejected(service, series):
+    service.record_watch(series.id, 4, 1)
+    service.record_watch(series.id + 1, 1, 1)
+    result = service.flush_watch_events()
+
+    assert result['inserted'] == 0
+    assert len(result['errors']) == 2
+    assert not service.update_progress(series.id, 1, 9)
+
+
+def test_compaction_summarizes_old_days(service, series, db):
+    service.record_watch(series.id, 1, 1, days_ago(40, hour=10))
+    service.record_watch(series.id, 1, 2, days_ago(40, hour=11))
+    service.record_watch(series.id, 1, 3, days_ago(39))
+    service.record_watch(series.id, 2, 1, days_ago(1))
+    before = service.get_watch_history(series.id)
+
+    assert service.compact_watch_events(older_than_days=30) == {'events': 3, 'days': 2}
+    assert db.fetch_one("SELECT COUNT(*) FROM watch_events")[0] == 1
+
+    history = service.get_watch_history(series.id)
+    assert history == before
+    assert [(day['episodes'], day['last_episode']) for day in history] == [(1, 1), (1, 3), (2, 2)]
+    assert service.get_recently_watched(7)[0]['episodes'] == 1
+
+
+def test_compaction_merges_into_existing_day(service, series):
+    service.record_watch(series.id, 1, 1, days_ago(40, hour=10))
+    service.compact_watch_events(older_than_days=30)
+    service.record_watch(series.id, 1, 2, days_ago(40, hour=12))
+    service.compact_watch_events(older_than_days=30)
+
+    [day] = service.get_watch_history(series.id)
+    assert (day['episodes'], day['last_season'], day['last_episode']) == (2, 1, 2)
+
+
+def test_compacted_history_keeps_progress(service, series):
+    service.record_watch(series.id, 2, 5, days_ago(40, hour=22))
+    service.compact_watch_events(older_than_days=30)
+
+    # Evento retroativo, anterior ao compactado: o progresso não volta
+    service.record_watch(series.id, 1, 2, days_ago(40, hour=8))
+    service.record_watch(series.id, 1, 1, days_ago(45))
+    service.flush_watch_events()
+    assert progress(service, series.id) == (2, 5, MediaStatus.WATCHING)
+
+    service.record_watch(series.id, 2, 6, days_ago(40, hour=23))
+    service.flush_watch_events()
+    assert progress(service, series.id)[:2] == (2, 6)
+
+
+def test_compaction_rejects_negative_age(service):
+    with pytest.raises(ValueError):
+        service.compact_watch_events(older_than_days=-1)